@@ -36,9 +36,11 @@ class TaskAdmin(ModelView, model=Task):
         Task.creator_id,
         Task.assignee_id,
         Task.deadline,
+        Task.comment_count,
+        Task.score,
     ]
     column_filters = [Task.status]
-    form_excluded_columns = ["comments", "evaluations"]
+    form_excluded_columns = ["comments", "evaluations", "comment_count", "has_evaluation", "score"]
 
 
 class CommentAdmin(ModelView, model=Comment):
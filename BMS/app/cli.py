@@ -0,0 +1,44 @@
+"""
+Служебные команды обслуживания БД.
+
+Запуск из каталога BMS:
+    python -m app.cli rebuild-evaluation-daily
+    python -m app.cli rebuild-task-counters
+"""
+import argparse
+import asyncio
+
+from app.core.database import AsyncSessionLocal
+from app.utils.services import rebuild_evaluation_daily, rebuild_task_counters
+
+
+COMMANDS = {
+    "rebuild-evaluation-daily": (
+        rebuild_evaluation_daily,
+        "Перестроить дневную сводку оценок evaluation_daily из evaluations и tasks",
+    ),
+    "rebuild-task-counters": (
+        rebuild_task_counters,
+        "Пересчитать число комментариев и оценку в строках tasks",
+    ),
+}
+
+
+async def run(name: str) -> None:
+    command, _ = COMMANDS[name]
+    async with AsyncSessionLocal() as db:
+        rows = await command(db)
+        await db.commit()
+    print(f"{name}: {rows} строк")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Служебные команды BMS")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        commands.add_parser(name, help=help_text)
+    asyncio.run(run(parser.parse_args().command))
+
+
+if __name__ == "__main__":
+    main()
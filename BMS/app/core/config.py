@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Any, Dict, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,6 +10,47 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 ROOT_DIR = Path(__file__).resolve().parents[2]
 
 
+# -------------------------------------------------------------------
+# Пресеты движка БД для каждого MODE
+# -------------------------------------------------------------------
+
+ENGINE_PRESETS: Dict[str, Dict[str, Any]] = {
+    "DEV": {
+        "pool_size": 5,
+        "max_overflow": 5,
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "statement_cache_size": 100,
+        "statement_timeout_ms": 0,       # 0 — без ограничения
+        "echo": False,
+        "echo_sample_rate": 0.0,
+    },
+    "TEST": {
+        "pool_size": 2,
+        "max_overflow": 0,
+        "pool_timeout": 10,
+        "pool_recycle": -1,              # -1 — не пересоздавать
+        "pool_pre_ping": False,
+        "statement_cache_size": 100,
+        "statement_timeout_ms": 10_000,
+        "echo": False,
+        "echo_sample_rate": 0.0,
+    },
+    "PROD": {
+        "pool_size": 20,
+        "max_overflow": 10,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "statement_cache_size": 500,
+        "statement_timeout_ms": 15_000,
+        "echo": False,
+        "echo_sample_rate": 0.0,
+    },
+}
+
+
 # -------------------------------------------------------------------
 # Настройки окружения
 # -------------------------------------------------------------------
@@ -23,6 +65,30 @@ class Settings(BaseSettings):
     DB_HOST: str
     DB_PORT: int
 
+    # --- Движок и пул соединений (None — значение из пресета MODE) ---
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: Optional[float] = None
+    DB_POOL_RECYCLE: Optional[int] = None
+    DB_POOL_PRE_PING: Optional[bool] = None
+    DB_STATEMENT_CACHE_SIZE: Optional[int] = None
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None
+    DB_ECHO: Optional[bool] = None
+    DB_ECHO_SAMPLE_RATE: Optional[float] = None
+
+    # --- Реплика для чтения (необязательно; логин, пароль и имя БД — как у основной) ---
+    DB_READ_HOST: Optional[str] = None
+    DB_READ_PORT: Optional[int] = None
+    DB_READ_STICKY_SECONDS: int = 5  # окно чтения с основной БД после записи клиента
+
+    # --- Кэш календаря в памяти процесса (0 записей — кэш выключен) ---
+    CALENDAR_CACHE_SIZE: int = 10_000
+    CALENDAR_CACHE_TTL_SECONDS: float = 300
+
+    # --- Кэш рейтинга команд: запись на (команда, период) ---
+    LEADERBOARD_CACHE_SIZE: int = 1_000
+    LEADERBOARD_CACHE_TTL_SECONDS: float = 600
+
     # --- Общие ---
     MODE: str
     SECRET_KEY: str
@@ -36,6 +102,55 @@ class Settings(BaseSettings):
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+    @property
+    def DATABASE_URL_read(self) -> Optional[str]:
+        """URL реплики для чтения или None, если реплика не настроена."""
+        if not self.DB_READ_HOST:
+            return None
+        return (
+            f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}"
+            f"@{self.DB_READ_HOST}:{self.DB_READ_PORT or self.DB_PORT}/{self.DB_NAME}"
+        )
+
+    @property
+    def engine_profile(self) -> Dict[str, Any]:
+        """Пресет текущего MODE с переопределениями из переменных DB_*."""
+        profile = dict(ENGINE_PRESETS.get(self.MODE.upper(), ENGINE_PRESETS["DEV"]))
+        overrides = {
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+            "statement_cache_size": self.DB_STATEMENT_CACHE_SIZE,
+            "statement_timeout_ms": self.DB_STATEMENT_TIMEOUT_MS,
+            "echo": self.DB_ECHO,
+            "echo_sample_rate": self.DB_ECHO_SAMPLE_RATE,
+        }
+        profile.update({k: v for k, v in overrides.items() if v is not None})
+        return profile
+
+    @property
+    def engine_options(self) -> Dict[str, Any]:
+        """Аргументы create_async_engine для asyncpg."""
+        profile = self.engine_profile
+        connect_args: Dict[str, Any] = {
+            "prepared_statement_cache_size": profile["statement_cache_size"],
+        }
+        if profile["statement_timeout_ms"]:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(profile["statement_timeout_ms"]),
+            }
+        return {
+            "echo": profile["echo"],
+            "pool_size": profile["pool_size"],
+            "max_overflow": profile["max_overflow"],
+            "pool_timeout": profile["pool_timeout"],
+            "pool_recycle": profile["pool_recycle"],
+            "pool_pre_ping": profile["pool_pre_ping"],
+            "connect_args": connect_args,
+        }
+
     model_config = SettingsConfigDict(env_file=".env")
 
 
@@ -1,26 +1,153 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
 
+logger = logging.getLogger("app.sql")
+
+
+# -------------------------------------------------------------------
+# Учёт SQL-запросов в рамках HTTP-запроса
+# -------------------------------------------------------------------
+
+@dataclass
+class QueryStats:
+    """Количество SQL-выражений и суммарное время БД за один HTTP-запрос."""
+    queries: int = 0
+    duration: float = 0.0  # секунды
+    pool_wait: float = 0.0  # секунды ожидания соединения из пула
+
+
+# Заполняется SQLMetricsMiddleware; вне HTTP-запроса — None
+query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats.get()
+    if stats is not None:
+        stats.queries += 1
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = query_stats.get()
+    if stats is not None:
+        stats.duration += time.perf_counter() - context._query_started
+
+
+def _make_echo_sampler(rate: float):
+    """Логировать примерно долю rate всех SQL-выражений вместо полного echo."""
+    def _echo_sample(conn, cursor, statement, parameters, context, executemany):
+        if random.random() < rate:
+            logger.info("sql sample statement=%r", statement)
+    return _echo_sample
+
+
+def instrument_engine(async_engine: AsyncEngine, echo_sample_rate: float = 0.0) -> None:
+    """Подключить счётчики запросов к движку (в т.ч. к тестовому)."""
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    if echo_sample_rate > 0:
+        event.listen(
+            async_engine.sync_engine, "before_cursor_execute", _make_echo_sampler(echo_sample_rate)
+        )
+
+
+# -------------------------------------------------------------------
+# Ожидание соединения из пула
+# -------------------------------------------------------------------
+
+class PoolMetrics:
+    """Накопительные метрики выдачи соединений из пула за время жизни процесса."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def observe(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_avg_ms": round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Пул, замеряющий время ожидания (и открытия) соединения при checkout."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            pool_metrics.observe(waited)
+            stats = query_stats.get()
+            if stats is not None:
+                stats.pool_wait += waited
+
+
 # -------------------------------------------------------------------
 # Инициализация SQLAlchemy
 # -------------------------------------------------------------------
 
-# --- Движок PostgreSQL ---
+# --- Движок PostgreSQL (пул, таймауты и echo — из профиля MODE) ---
 engine = create_async_engine(
     settings.DATABASE_URL_asyncpg,
-    echo=True,
+    poolclass=TimedAsyncQueuePool,
     future=True,  # Совместимость с SQLAlchemy 2.x
+    **settings.engine_options,
 )
+instrument_engine(engine, echo_sample_rate=settings.engine_profile["echo_sample_rate"])
+
+# --- Движок реплики для чтения (без реплики — тот же основной движок) ---
+if settings.DATABASE_URL_read:
+    read_engine = create_async_engine(
+        settings.DATABASE_URL_read,
+        poolclass=TimedAsyncQueuePool,
+        future=True,
+        **settings.engine_options,
+    )
+    instrument_engine(read_engine, echo_sample_rate=settings.engine_profile["echo_sample_rate"])
+else:
+    read_engine = engine
 
-# --- Фабрика асинхронных сессий ---
+# --- Фабрики асинхронных сессий ---
 AsyncSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
+AsyncReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
 
 # --- Базовый класс моделей ---
 Base = declarative_base()
@@ -34,3 +161,43 @@ async def get_async_session() -> AsyncSession:
     """Асинхронная сессия для внедрения зависимостей."""
     async with AsyncSessionLocal() as session:
         yield session
+
+
+# Cookie с моментом (unix time), до которого клиент читает с основной БД
+PRIMARY_PIN_COOKIE = "bms_primary_pin"
+
+
+def is_pinned_to_primary(request: Request) -> bool:
+    """Клиент недавно что-то записал и должен видеть свои изменения."""
+    try:
+        return float(request.cookies.get(PRIMARY_PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_session(request: Request) -> AsyncSession:
+    """
+    Сессия только для чтения: реплика, если она настроена.
+    В окне DB_READ_STICKY_SECONDS после записи клиента — основная БД (read-your-writes).
+    """
+    factory = AsyncSessionLocal if is_pinned_to_primary(request) else AsyncReadSessionLocal
+    async with factory() as session:
+        yield session
+
+
+def session_pinned_to_primary(db: AsyncSession) -> bool:
+    """
+    Реплика настроена, но сессия чтения получена в окне read-your-writes
+    и читает основную БД. Такие запросы не берут ответ из кэша: чтение
+    с отстающей реплики могло вернуть туда данные до записи клиента.
+    """
+    return read_engine is not engine and db.bind is not read_engine
+
+
+def get_stream_session_factory(request: Request) -> sessionmaker:
+    """
+    Фабрика сессий для потоковых ответов. Зависимости с yield закрываются
+    до отправки тела StreamingResponse, поэтому генератор тела открывает
+    сессию сам. Выбор базы — как у get_read_session.
+    """
+    return AsyncSessionLocal if is_pinned_to_primary(request) else AsyncReadSessionLocal
@@ -0,0 +1,99 @@
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.database import PRIMARY_PIN_COOKIE, QueryStats, query_stats
+
+
+logger = logging.getLogger("app.sql")
+
+
+# -------------------------------------------------------------------
+# Метрики SQL по каждому HTTP-запросу
+# -------------------------------------------------------------------
+
+class SQLMetricsMiddleware:
+    """
+    Считает SQL-выражения, время БД и ожидание пула за запрос.
+    Отдаёт их в заголовках X-DB-Queries и Server-Timing
+    и пишет одну строку лога в формате key=value.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Queries"] = str(stats.queries)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.queries} queries", '
+                    f'pool;dur={stats.pool_wait * 1000:.1f}',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            query_stats.reset(token)
+            logger.info(
+                "sql method=%s path=%s status=%s db_queries=%d db_ms=%.1f pool_wait_ms=%.1f total_ms=%.1f",
+                scope["method"],
+                scope["path"],
+                status_code,
+                stats.queries,
+                stats.duration * 1000,
+                stats.pool_wait * 1000,
+                (time.perf_counter() - started) * 1000,
+            )
+
+
+# -------------------------------------------------------------------
+# Read-your-writes для реплики
+# -------------------------------------------------------------------
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReadYourWritesMiddleware:
+    """
+    После успешного пишущего запроса ставит cookie, по которой
+    get_read_session ещё sticky_seconds читает с основной БД, а не с реплики.
+    """
+
+    def __init__(self, app: ASGIApp, sticky_seconds: int):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = int(time.time()) + self.sticky_seconds
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{PRIMARY_PIN_COOKIE}={until}; Max-Age={self.sticky_seconds}; "
+                    f"Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
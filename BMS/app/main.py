@@ -1,18 +1,29 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException
 from starlette.middleware.sessions import SessionMiddleware
 
+from app.core.auth import current_active_user
 from app.core.config import settings
+from app.core.database import engine, pool_metrics
+from app.core.middleware import ReadYourWritesMiddleware, SQLMetricsMiddleware
 from app.routers.auth import router as auth_router
 from app.routers.meetings import router as meetings_router
 from app.routers.tasks import router as tasks_router
 from app.routers.teams import router as teams_router
 from app.routers.calendar import router as calendar_router
 from app.routers.profile import router as users_router
+from app.models.user import User, UserRole
 from app.admin import setup_admin
 
 
 app = FastAPI(title="Business Management System")
 
+# Счётчики SQL-запросов в заголовках ответа и логе
+app.add_middleware(SQLMetricsMiddleware)
+
+# Чтение своих записей с основной БД, пока реплика догоняет
+if settings.DATABASE_URL_read:
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=settings.DB_READ_STICKY_SECONDS)
+
 # Подключаем роутеры
 app.include_router(auth_router)
 app.include_router(meetings_router)
@@ -28,3 +39,17 @@ setup_admin(app)
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Business Management System API"}
+
+
+@app.get(
+    "/db/pool/stats",
+    description="Метрики пула соединений: число выдач, ожидание соединения, занятые соединения. Только для админов"
+)
+async def db_pool_stats(current_user: User = Depends(current_active_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения операции")
+    return {
+        **pool_metrics.snapshot(),
+        "pool_size": engine.pool.size(),
+        "checked_out": engine.pool.checkedout(),
+    }
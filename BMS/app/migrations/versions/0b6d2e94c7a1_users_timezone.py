@@ -0,0 +1,28 @@
+"""users timezone
+
+Revision ID: 0b6d2e94c7a1
+Revises: f3a8c61d2b97
+Create Date: 2026-10-18 22:14:05.318920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6d2e94c7a1'
+down_revision: Union[str, None] = 'f3a8c61d2b97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('timezone', sa.String(length=64), nullable=True, comment='Часовой пояс IANA для календаря; NULL — UTC'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'timezone')
@@ -0,0 +1,85 @@
+"""tasks counters
+
+Revision ID: 4f7b2c9e6d13
+Revises: 9c2f5d7e1a48
+Create Date: 2026-10-19 01:02:37.406118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f7b2c9e6d13'
+down_revision: Union[str, None] = '9c2f5d7e1a48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False, comment='Число комментариев к задаче'))
+    op.add_column('tasks', sa.Column('has_evaluation', sa.Boolean(), server_default=sa.false(), nullable=False, comment='Выставлена ли оценка'))
+    op.add_column('tasks', sa.Column('score', sa.Integer(), nullable=True, comment='Балл оценки задачи; NULL — оценки нет'))
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_comment_count() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                UPDATE tasks SET comment_count = comment_count - 1 WHERE id = OLD.task_id;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                UPDATE tasks SET comment_count = comment_count + 1 WHERE id = NEW.task_id;
+            END IF;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_comments_task_count
+        AFTER INSERT OR DELETE OR UPDATE OF task_id ON comments
+        FOR EACH ROW EXECUTE FUNCTION tasks_comment_count()
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_evaluation_score() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                UPDATE tasks SET has_evaluation = false, score = NULL WHERE id = OLD.task_id;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                UPDATE tasks SET has_evaluation = true, score = NEW.score WHERE id = NEW.task_id;
+            END IF;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_evaluations_task_score
+        AFTER INSERT OR DELETE OR UPDATE OF score, task_id ON evaluations
+        FOR EACH ROW EXECUTE FUNCTION tasks_evaluation_score()
+    """)
+
+    # Счётчики по уже существующим комментариям и оценкам
+    op.execute("""
+        UPDATE tasks SET comment_count = c.total
+        FROM (SELECT task_id, count(*) AS total FROM comments GROUP BY task_id) c
+        WHERE c.task_id = tasks.id
+    """)
+    op.execute("""
+        UPDATE tasks SET has_evaluation = true, score = e.score
+        FROM evaluations e
+        WHERE e.task_id = tasks.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_evaluations_task_score ON evaluations")
+    op.execute("DROP FUNCTION IF EXISTS tasks_evaluation_score()")
+    op.execute("DROP TRIGGER IF EXISTS trg_comments_task_count ON comments")
+    op.execute("DROP FUNCTION IF EXISTS tasks_comment_count()")
+    op.drop_column('tasks', 'score')
+    op.drop_column('tasks', 'has_evaluation')
+    op.drop_column('tasks', 'comment_count')
@@ -0,0 +1,31 @@
+"""calendar date indexes
+
+Revision ID: 5c1e8a2d9f40
+Revises: 312ef7dc165d
+Create Date: 2026-10-18 10:12:31.418204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e8a2d9f40'
+down_revision: Union[str, None] = '312ef7dc165d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # B-tree индексы под диапазонные выборки календаря [начало дня, начало следующего дня)
+    op.create_index(op.f('ix_tasks_deadline'), 'tasks', ['deadline'], unique=False)
+    op.create_index(op.f('ix_meetings_start_time'), 'meetings', ['start_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_meetings_start_time'), table_name='meetings')
+    op.drop_index(op.f('ix_tasks_deadline'), table_name='tasks')
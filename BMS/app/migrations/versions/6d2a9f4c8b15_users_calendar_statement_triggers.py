@@ -0,0 +1,196 @@
+"""users calendar statement triggers
+
+Revision ID: 6d2a9f4c8b15
+Revises: 8b3e6a0f2c71
+Create Date: 2026-10-19 10:12:48.517203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2a9f4c8b15'
+down_revision: Union[str, None] = '8b3e6a0f2c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TOUCH = "UPDATE users SET calendar_version = calendar_version + 1, calendar_changed_at = now()"
+TASK_COLUMNS = "title, description, status, deadline, creator_id, assignee_id"
+MEETING_COLUMNS = (
+    "title, start_time, end_time, recurrence_freq, recurrence_interval,"
+    " recurrence_count, recurrence_until, recurrence_exceptions"
+)
+
+
+def changed(columns: str) -> str:
+    """Изменилась хотя бы одна колонка пары old_rows o / new_rows n (::text — у json нет =)."""
+    names = [name.strip() for name in columns.split(",")]
+    return " OR ".join(f"o.{name}::text IS DISTINCT FROM n.{name}::text" for name in names)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Построчные триггеры обновляли users на каждую строку пакета
+    op.execute("DROP TRIGGER IF EXISTS trg_meetings_calendar_touch ON meetings")
+    op.execute("DROP FUNCTION IF EXISTS users_calendar_touch_meeting()")
+    op.execute("DROP TRIGGER IF EXISTS trg_meeting_participants_calendar_touch ON meeting_participants")
+    op.execute("DROP FUNCTION IF EXISTS users_calendar_touch_participant()")
+    op.execute("DROP TRIGGER IF EXISTS trg_tasks_calendar_touch ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS users_calendar_touch_task()")
+
+    # Строки users блокируются по порядку id: встречные пакеты не взаимоблокируются
+    op.execute("""
+        CREATE OR REPLACE FUNCTION users_calendar_touch(user_ids integer[]) RETURNS void
+        LANGUAGE sql AS $$
+            WITH touched AS (
+                SELECT id FROM users WHERE id = ANY(user_ids) ORDER BY id FOR UPDATE
+            )
+            UPDATE users SET calendar_version = calendar_version + 1, calendar_changed_at = now()
+            FROM touched WHERE users.id = touched.id
+        $$
+    """)
+
+    # Переходные таблицы не сочетаются с UPDATE OF и несколькими событиями в одном триггере
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION users_calendar_touch_tasks() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM users_calendar_touch(ARRAY(
+                    SELECT creator_id FROM new_rows UNION SELECT assignee_id FROM new_rows
+                ));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM users_calendar_touch(ARRAY(
+                    SELECT creator_id FROM old_rows UNION SELECT assignee_id FROM old_rows
+                ));
+            ELSE
+                PERFORM users_calendar_touch(ARRAY(
+                    SELECT DISTINCT u.id
+                    FROM old_rows o JOIN new_rows n USING (id)
+                    CROSS JOIN LATERAL (VALUES (o.creator_id), (o.assignee_id), (n.creator_id), (n.assignee_id)) AS u(id)
+                    WHERE {changed(TASK_COLUMNS)}
+                ));
+            END IF;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_tasks_calendar_touch_insert
+        AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION users_calendar_touch_tasks()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_tasks_calendar_touch_update
+        AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION users_calendar_touch_tasks()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_tasks_calendar_touch_delete
+        AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION users_calendar_touch_tasks()
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION users_calendar_touch_participants() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM users_calendar_touch(ARRAY(SELECT DISTINCT user_id FROM new_rows));
+            ELSE
+                PERFORM users_calendar_touch(ARRAY(SELECT DISTINCT user_id FROM old_rows));
+            END IF;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_meeting_participants_calendar_touch_insert
+        AFTER INSERT ON meeting_participants REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION users_calendar_touch_participants()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_meeting_participants_calendar_touch_delete
+        AFTER DELETE ON meeting_participants REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION users_calendar_touch_participants()
+    """)
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION users_calendar_touch_meetings() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            PERFORM users_calendar_touch(ARRAY(
+                SELECT DISTINCT mp.user_id
+                FROM old_rows o JOIN new_rows n USING (id)
+                JOIN meeting_participants mp ON mp.meeting_id = n.id
+                WHERE {changed(MEETING_COLUMNS)}
+            ));
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_meetings_calendar_touch
+        AFTER UPDATE ON meetings REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION users_calendar_touch_meetings()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_meetings_calendar_touch ON meetings")
+    op.execute("DROP FUNCTION IF EXISTS users_calendar_touch_meetings()")
+    op.execute("DROP TRIGGER IF EXISTS trg_meeting_participants_calendar_touch_delete ON meeting_participants")
+    op.execute("DROP TRIGGER IF EXISTS trg_meeting_participants_calendar_touch_insert ON meeting_participants")
+    op.execute("DROP FUNCTION IF EXISTS users_calendar_touch_participants()")
+    op.execute("DROP TRIGGER IF EXISTS trg_tasks_calendar_touch_delete ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS trg_tasks_calendar_touch_update ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS trg_tasks_calendar_touch_insert ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS users_calendar_touch_tasks()")
+    op.execute("DROP FUNCTION IF EXISTS users_calendar_touch(integer[])")
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION users_calendar_touch_task() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                {TOUCH} WHERE id IN (OLD.creator_id, OLD.assignee_id);
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                {TOUCH} WHERE id IN (NEW.creator_id, NEW.assignee_id);
+            END IF;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_tasks_calendar_touch
+        AFTER INSERT OR DELETE OR UPDATE OF {TASK_COLUMNS} ON tasks
+        FOR EACH ROW EXECUTE FUNCTION users_calendar_touch_task()
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION users_calendar_touch_participant() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            {TOUCH} WHERE id = CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_meeting_participants_calendar_touch
+        AFTER INSERT OR DELETE ON meeting_participants
+        FOR EACH ROW EXECUTE FUNCTION users_calendar_touch_participant()
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION users_calendar_touch_meeting() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            {TOUCH} WHERE id IN (SELECT user_id FROM meeting_participants WHERE meeting_id = NEW.id);
+            RETURN NULL;
+        END $$
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_meetings_calendar_touch
+        AFTER UPDATE OF {MEETING_COLUMNS} ON meetings
+        FOR EACH ROW EXECUTE FUNCTION users_calendar_touch_meeting()
+    """)
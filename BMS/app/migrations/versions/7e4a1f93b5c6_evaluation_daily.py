@@ -0,0 +1,103 @@
+"""evaluation daily
+
+Revision ID: 7e4a1f93b5c6
+Revises: 0b6d2e94c7a1
+Create Date: 2026-10-18 23:02:41.557310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e4a1f93b5c6'
+down_revision: Union[str, None] = '0b6d2e94c7a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('evaluation_daily',
+        sa.Column('user_id', sa.Integer(), nullable=False, comment='ID исполнителя оценённых задач'),
+        sa.Column('day', sa.Date(), nullable=False, comment='День создания оценок (UTC)'),
+        sa.Column('score_sum', sa.Integer(), nullable=False, comment='Сумма баллов за день'),
+        sa.Column('score_count', sa.Integer(), nullable=False, comment='Число оценок за день'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION evaluation_daily_add(p_user_id integer, p_day date, p_score integer, p_sign integer)
+        RETURNS void LANGUAGE sql AS $$
+            INSERT INTO evaluation_daily (user_id, day, score_sum, score_count)
+            SELECT p_user_id, p_day, p_sign * p_score, p_sign WHERE p_user_id IS NOT NULL
+            ON CONFLICT (user_id, day) DO UPDATE
+            SET score_sum = evaluation_daily.score_sum + EXCLUDED.score_sum,
+                score_count = evaluation_daily.score_count + EXCLUDED.score_count
+        $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION evaluation_daily_evaluation() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                PERFORM evaluation_daily_add(t.assignee_id, (OLD.created_at AT TIME ZONE 'UTC')::date, OLD.score, -1)
+                FROM tasks t WHERE t.id = OLD.task_id;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                PERFORM evaluation_daily_add(t.assignee_id, (NEW.created_at AT TIME ZONE 'UTC')::date, NEW.score, 1)
+                FROM tasks t WHERE t.id = NEW.task_id;
+            END IF;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_evaluations_daily
+        AFTER INSERT OR DELETE OR UPDATE OF score, created_at, task_id ON evaluations
+        FOR EACH ROW EXECUTE FUNCTION evaluation_daily_evaluation()
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION evaluation_daily_task() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' OR NEW.assignee_id IS DISTINCT FROM OLD.assignee_id THEN
+                PERFORM evaluation_daily_add(OLD.assignee_id, (e.created_at AT TIME ZONE 'UTC')::date, e.score, -1)
+                FROM evaluations e WHERE e.task_id = OLD.id;
+            END IF;
+            IF TG_OP = 'DELETE' THEN
+                RETURN OLD;
+            END IF;
+            IF NEW.assignee_id IS DISTINCT FROM OLD.assignee_id THEN
+                PERFORM evaluation_daily_add(NEW.assignee_id, (e.created_at AT TIME ZONE 'UTC')::date, e.score, 1)
+                FROM evaluations e WHERE e.task_id = NEW.id;
+            END IF;
+            RETURN NEW;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_tasks_evaluation_daily
+        BEFORE DELETE OR UPDATE OF assignee_id ON tasks
+        FOR EACH ROW EXECUTE FUNCTION evaluation_daily_task()
+    """)
+
+    # Сводка по уже выставленным оценкам
+    op.execute("""
+        INSERT INTO evaluation_daily (user_id, day, score_sum, score_count)
+        SELECT t.assignee_id, (e.created_at AT TIME ZONE 'UTC')::date, sum(e.score), count(e.id)
+        FROM evaluations e JOIN tasks t ON t.id = e.task_id
+        WHERE t.assignee_id IS NOT NULL
+        GROUP BY t.assignee_id, (e.created_at AT TIME ZONE 'UTC')::date
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_tasks_evaluation_daily ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS evaluation_daily_task()")
+    op.execute("DROP TRIGGER IF EXISTS trg_evaluations_daily ON evaluations")
+    op.execute("DROP FUNCTION IF EXISTS evaluation_daily_evaluation()")
+    op.execute("DROP FUNCTION IF EXISTS evaluation_daily_add(integer, date, integer, integer)")
+    op.drop_table('evaluation_daily')
@@ -0,0 +1,31 @@
+"""comments keyset index
+
+Revision ID: 8b3e6a0f2c71
+Revises: 4f7b2c9e6d13
+Create Date: 2026-10-19 01:47:12.283594
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3e6a0f2c71'
+down_revision: Union[str, None] = '4f7b2c9e6d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Префикс task_id по-прежнему обслуживает внешний ключ
+    op.create_index('ix_comments_task_id_created_at_id', 'comments', ['task_id', 'created_at', 'id'], unique=False)
+    op.drop_index('ix_comments_task_id', table_name='comments')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_comments_task_id', 'comments', ['task_id'], unique=False)
+    op.drop_index('ix_comments_task_id_created_at_id', table_name='comments')
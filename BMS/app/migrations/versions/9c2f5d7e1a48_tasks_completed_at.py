@@ -0,0 +1,37 @@
+"""tasks completed at
+
+Revision ID: 9c2f5d7e1a48
+Revises: 7e4a1f93b5c6
+Create Date: 2026-10-19 00:11:19.804265
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c2f5d7e1a48'
+down_revision: Union[str, None] = '7e4a1f93b5c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True, comment='Когда задача перешла в статус DONE; NULL, пока не выполнена'))
+    # Для уже выполненных задач точный момент неизвестен; оценка ставится
+    # только после выполнения, так что её время — ближайшая верхняя граница
+    op.execute("""
+        UPDATE tasks SET completed_at = e.created_at
+        FROM evaluations e
+        WHERE e.task_id = tasks.id AND tasks.status = 'DONE'
+    """)
+    op.create_index('ix_tasks_assignee_id_completed_at', 'tasks', ['assignee_id', 'completed_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_assignee_id_completed_at', table_name='tasks')
+    op.drop_column('tasks', 'completed_at')
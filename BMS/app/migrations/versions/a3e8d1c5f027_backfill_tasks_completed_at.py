@@ -0,0 +1,41 @@
+"""backfill tasks completed at
+
+Revision ID: a3e8d1c5f027
+Revises: 6d2a9f4c8b15
+Create Date: 2026-10-19 10:41:06.228931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e8d1c5f027'
+down_revision: Union[str, None] = '6d2a9f4c8b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 9c2f5d7e1a48 заполнил completed_at только по времени оценки. У выполненных
+    # задач без оценки момента выполнения нет, а колонки updated_at в tasks нет.
+    # Берётся дедлайн, если он уже прошёл и не раньше создания задачи, иначе
+    # время создания: задача засчитывается выполненной в срок и попадает
+    # в рейтинг периода, на который приходился её срок
+    op.execute("""
+        UPDATE tasks
+        SET completed_at = CASE
+            WHEN deadline IS NOT NULL AND deadline BETWEEN created_at AND now() THEN deadline
+            ELSE created_at
+        END
+        WHERE status = 'DONE' AND completed_at IS NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Заполненные значения не отличить от записанных приложением — оставляем
+    pass
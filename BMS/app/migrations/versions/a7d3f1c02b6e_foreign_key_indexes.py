@@ -0,0 +1,43 @@
+"""foreign key indexes
+
+Revision ID: a7d3f1c02b6e
+Revises: 5c1e8a2d9f40
+Create Date: 2026-10-18 11:03:54.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3f1c02b6e'
+down_revision: Union[str, None] = '5c1e8a2d9f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (assignee_id, deadline) покрывает и одиночный фильтр по assignee_id
+    op.create_index('ix_tasks_assignee_id_deadline', 'tasks', ['assignee_id', 'deadline'], unique=False)
+    op.create_index(op.f('ix_tasks_creator_id'), 'tasks', ['creator_id'], unique=False)
+    op.create_index(op.f('ix_comments_task_id'), 'comments', ['task_id'], unique=False)
+    op.create_index(op.f('ix_evaluations_created_at'), 'evaluations', ['created_at'], unique=False)
+    op.create_index(op.f('ix_users_team_id'), 'users', ['team_id'], unique=False)
+    # (meeting_id, user_id) уже обслуживается первичным ключом
+    op.create_index(
+        'ix_meeting_participants_user_id_meeting_id', 'meeting_participants',
+        ['user_id', 'meeting_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_meeting_participants_user_id_meeting_id', table_name='meeting_participants')
+    op.drop_index(op.f('ix_users_team_id'), table_name='users')
+    op.drop_index(op.f('ix_evaluations_created_at'), table_name='evaluations')
+    op.drop_index(op.f('ix_comments_task_id'), table_name='comments')
+    op.drop_index(op.f('ix_tasks_creator_id'), table_name='tasks')
+    op.drop_index('ix_tasks_assignee_id_deadline', table_name='tasks')
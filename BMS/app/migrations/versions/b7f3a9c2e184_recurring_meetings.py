@@ -0,0 +1,73 @@
+"""recurring meetings
+
+Revision ID: b7f3a9c2e184
+Revises: e2b8d4f61a07
+Create Date: 2026-10-18 18:05:12.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f3a9c2e184'
+down_revision: Union[str, None] = 'e2b8d4f61a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+recurrence_freq_enum = sa.Enum('DAILY', 'WEEKLY', 'MONTHLY', name='recurrence_freq_enum')
+
+
+def _sync_participant_function(condition: str) -> str:
+    return f"""
+        CREATE OR REPLACE FUNCTION meeting_bookings_sync_participant() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO meeting_bookings (meeting_id, user_id, start_time, end_time)
+                SELECT NEW.meeting_id, NEW.user_id, m.start_time, m.end_time
+                FROM meetings m WHERE {condition};
+                RETURN NEW;
+            END IF;
+            DELETE FROM meeting_bookings
+            WHERE meeting_id = OLD.meeting_id AND user_id = OLD.user_id;
+            RETURN OLD;
+        END $$
+    """
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    recurrence_freq_enum.create(op.get_bind(), checkfirst=True)
+    op.add_column('meetings', sa.Column('recurrence_freq', recurrence_freq_enum, nullable=True, comment='Частота повторения серии; NULL — разовая встреча'))
+    op.add_column('meetings', sa.Column('recurrence_interval', sa.Integer(), server_default='1', nullable=False, comment='Шаг повторения в единицах частоты'))
+    op.add_column('meetings', sa.Column('recurrence_count', sa.Integer(), nullable=True, comment='Число вхождений серии'))
+    op.add_column('meetings', sa.Column('recurrence_until', sa.DateTime(timezone=True), nullable=True, comment='Последний допустимый момент начала вхождения'))
+    op.add_column('meetings', sa.Column('recurrence_exceptions', sa.JSON(), nullable=True, comment='Начала отменённых вхождений (ISO, UTC)'))
+    op.add_column('meetings', sa.Column('series_end', sa.DateTime(timezone=True), nullable=True, comment='Окончание последнего вхождения серии; NULL — бессрочная серия или разовая встреча'))
+
+    # Серии не бронируются: их вхождения проверяет приложение
+    op.execute(_sync_participant_function("m.id = NEW.meeting_id AND m.recurrence_freq IS NULL"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Серии при откате превращаются в свою первую встречу
+    op.execute(_sync_participant_function("m.id = NEW.meeting_id"))
+    op.execute("""
+        INSERT INTO meeting_bookings (meeting_id, user_id, start_time, end_time)
+        SELECT mp.meeting_id, mp.user_id, m.start_time, m.end_time
+        FROM meeting_participants mp
+        JOIN meetings m ON m.id = mp.meeting_id
+        WHERE m.recurrence_freq IS NOT NULL
+    """)
+    op.drop_column('meetings', 'series_end')
+    op.drop_column('meetings', 'recurrence_exceptions')
+    op.drop_column('meetings', 'recurrence_until')
+    op.drop_column('meetings', 'recurrence_count')
+    op.drop_column('meetings', 'recurrence_interval')
+    op.drop_column('meetings', 'recurrence_freq')
+    recurrence_freq_enum.drop(op.get_bind(), checkfirst=True)
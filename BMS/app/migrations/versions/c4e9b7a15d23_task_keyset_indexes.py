@@ -0,0 +1,39 @@
+"""task keyset indexes
+
+Revision ID: c4e9b7a15d23
+Revises: a7d3f1c02b6e
+Create Date: 2026-10-18 14:20:11.318402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e9b7a15d23'
+down_revision: Union[str, None] = 'a7d3f1c02b6e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Составные индексы keyset-пагинации покрывают и прежние префиксы
+    op.create_index('ix_tasks_assignee_id_deadline_id', 'tasks', ['assignee_id', 'deadline', 'id'], unique=False)
+    op.create_index('ix_tasks_creator_id_deadline_id', 'tasks', ['creator_id', 'deadline', 'id'], unique=False)
+    op.create_index('ix_tasks_assignee_id_created_at_id', 'tasks', ['assignee_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tasks_creator_id_created_at_id', 'tasks', ['creator_id', 'created_at', 'id'], unique=False)
+    op.drop_index('ix_tasks_assignee_id_deadline', table_name='tasks')
+    op.drop_index(op.f('ix_tasks_creator_id'), table_name='tasks')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_tasks_creator_id'), 'tasks', ['creator_id'], unique=False)
+    op.create_index('ix_tasks_assignee_id_deadline', 'tasks', ['assignee_id', 'deadline'], unique=False)
+    op.drop_index('ix_tasks_creator_id_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_assignee_id_created_at_id', table_name='tasks')
+    op.drop_index('ix_tasks_creator_id_deadline_id', table_name='tasks')
+    op.drop_index('ix_tasks_assignee_id_deadline_id', table_name='tasks')
@@ -0,0 +1,31 @@
+"""meeting bookings keyset index
+
+Revision ID: d91c5e3f7a28
+Revises: b7f3a9c2e184
+Create Date: 2026-10-18 19:12:44.905127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91c5e3f7a28'
+down_revision: Union[str, None] = 'b7f3a9c2e184'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Префикс (user_id, start_time) по-прежнему обслуживает проверку пересечений
+    op.create_index('ix_meeting_bookings_user_id_start_time_meeting_id', 'meeting_bookings', ['user_id', 'start_time', 'meeting_id'], unique=False)
+    op.drop_index('ix_meeting_bookings_user_id_start_time', table_name='meeting_bookings')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_meeting_bookings_user_id_start_time', 'meeting_bookings', ['user_id', 'start_time'], unique=False)
+    op.drop_index('ix_meeting_bookings_user_id_start_time_meeting_id', table_name='meeting_bookings')
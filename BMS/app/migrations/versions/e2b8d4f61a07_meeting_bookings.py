@@ -0,0 +1,95 @@
+"""meeting bookings
+
+Revision ID: e2b8d4f61a07
+Revises: c4e9b7a15d23
+Create Date: 2026-10-18 16:42:37.520914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8d4f61a07'
+down_revision: Union[str, None] = 'c4e9b7a15d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gist: в GiST-ограничении нужен оператор = для integer
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    op.create_table('meeting_bookings',
+        sa.Column('meeting_id', sa.Integer(), nullable=False, comment='ID встречи'),
+        sa.Column('user_id', sa.Integer(), nullable=False, comment='ID участника'),
+        sa.Column('start_time', sa.DateTime(timezone=True), nullable=False, comment='Начало встречи (копия meetings.start_time)'),
+        sa.Column('end_time', sa.DateTime(timezone=True), nullable=False, comment='Окончание встречи (копия meetings.end_time)'),
+        sa.ForeignKeyConstraint(['meeting_id'], ['meetings.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('meeting_id', 'user_id')
+    )
+    op.create_index('ix_meeting_bookings_user_id_start_time', 'meeting_bookings', ['user_id', 'start_time'], unique=False)
+
+    # Перенос текущих участников. Если в данных уже есть пересечения
+    # (следствие прежней гонки), ограничение ниже не создастся — их нужно разобрать вручную.
+    op.execute("""
+        INSERT INTO meeting_bookings (meeting_id, user_id, start_time, end_time)
+        SELECT mp.meeting_id, mp.user_id, m.start_time, m.end_time
+        FROM meeting_participants mp
+        JOIN meetings m ON m.id = mp.meeting_id
+    """)
+    op.execute("""
+        ALTER TABLE meeting_bookings
+        ADD CONSTRAINT ex_meeting_bookings_user_id_time
+        EXCLUDE USING gist (user_id WITH =, tstzrange(start_time, end_time) WITH &&)
+    """)
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION meeting_bookings_sync_participant() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO meeting_bookings (meeting_id, user_id, start_time, end_time)
+                SELECT NEW.meeting_id, NEW.user_id, m.start_time, m.end_time
+                FROM meetings m WHERE m.id = NEW.meeting_id;
+                RETURN NEW;
+            END IF;
+            DELETE FROM meeting_bookings
+            WHERE meeting_id = OLD.meeting_id AND user_id = OLD.user_id;
+            RETURN OLD;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_meeting_participants_booking
+        AFTER INSERT OR DELETE ON meeting_participants
+        FOR EACH ROW EXECUTE FUNCTION meeting_bookings_sync_participant()
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION meeting_bookings_sync_time() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            UPDATE meeting_bookings
+            SET start_time = NEW.start_time, end_time = NEW.end_time
+            WHERE meeting_id = NEW.id;
+            RETURN NEW;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_meetings_booking_time
+        AFTER UPDATE OF start_time, end_time ON meetings
+        FOR EACH ROW EXECUTE FUNCTION meeting_bookings_sync_time()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_meetings_booking_time ON meetings")
+    op.execute("DROP FUNCTION IF EXISTS meeting_bookings_sync_time()")
+    op.execute("DROP TRIGGER IF EXISTS trg_meeting_participants_booking ON meeting_participants")
+    op.execute("DROP FUNCTION IF EXISTS meeting_bookings_sync_participant()")
+    op.drop_index('ix_meeting_bookings_user_id_start_time', table_name='meeting_bookings')
+    op.drop_table('meeting_bookings')
@@ -0,0 +1,89 @@
+"""users calendar version
+
+Revision ID: f3a8c61d2b97
+Revises: d91c5e3f7a28
+Create Date: 2026-10-18 21:03:27.640519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a8c61d2b97'
+down_revision: Union[str, None] = 'd91c5e3f7a28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TOUCH = "UPDATE users SET calendar_version = calendar_version + 1, calendar_changed_at = now()"
+TASK_COLUMNS = "title, description, status, deadline, creator_id, assignee_id"
+MEETING_COLUMNS = (
+    "title, start_time, end_time, recurrence_freq, recurrence_interval,"
+    " recurrence_count, recurrence_until, recurrence_exceptions"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('calendar_version', sa.Integer(), server_default='0', nullable=False, comment='Счётчик изменений задач и встреч пользователя (ETag ленты ICS)'))
+    op.add_column('users', sa.Column('calendar_changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False, comment='Время последнего изменения задач и встреч пользователя (Last-Modified ленты ICS)'))
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION users_calendar_touch_task() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                {TOUCH} WHERE id IN (OLD.creator_id, OLD.assignee_id);
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                {TOUCH} WHERE id IN (NEW.creator_id, NEW.assignee_id);
+            END IF;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_tasks_calendar_touch
+        AFTER INSERT OR DELETE OR UPDATE OF {TASK_COLUMNS} ON tasks
+        FOR EACH ROW EXECUTE FUNCTION users_calendar_touch_task()
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION users_calendar_touch_participant() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            {TOUCH} WHERE id = CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END;
+            RETURN NULL;
+        END $$
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_meeting_participants_calendar_touch
+        AFTER INSERT OR DELETE ON meeting_participants
+        FOR EACH ROW EXECUTE FUNCTION users_calendar_touch_participant()
+    """)
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION users_calendar_touch_meeting() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            {TOUCH} WHERE id IN (SELECT user_id FROM meeting_participants WHERE meeting_id = NEW.id);
+            RETURN NULL;
+        END $$
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_meetings_calendar_touch
+        AFTER UPDATE OF {MEETING_COLUMNS} ON meetings
+        FOR EACH ROW EXECUTE FUNCTION users_calendar_touch_meeting()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_meetings_calendar_touch ON meetings")
+    op.execute("DROP FUNCTION IF EXISTS users_calendar_touch_meeting()")
+    op.execute("DROP TRIGGER IF EXISTS trg_meeting_participants_calendar_touch ON meeting_participants")
+    op.execute("DROP FUNCTION IF EXISTS users_calendar_touch_participant()")
+    op.execute("DROP TRIGGER IF EXISTS trg_tasks_calendar_touch ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS users_calendar_touch_task()")
+    op.drop_column('users', 'calendar_changed_at')
+    op.drop_column('users', 'calendar_version')
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import DateTime, Integer, ForeignKey, Text
+from sqlalchemy import DateTime, Index, Integer, ForeignKey, Text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.core.database import Base
@@ -15,6 +15,11 @@ class Comment(Base):
     Содержит текст, автора и время создания.
     """
     __tablename__ = 'comments'
+    __table_args__ = (
+        # Keyset-страницы комментариев задачи по (created_at, id);
+        # префикс task_id обслуживает и каскадное удаление задачи
+        Index('ix_comments_task_id_created_at_id', 'task_id', 'created_at', 'id'),
+    )
 
     # --- Базовые поля ---
     id: Mapped[int] = mapped_column(
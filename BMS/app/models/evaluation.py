@@ -1,5 +1,5 @@
-from datetime import datetime
-from sqlalchemy import DateTime, Integer, ForeignKey
+from datetime import date, datetime
+from sqlalchemy import DDL, Date, DateTime, Integer, ForeignKey, event
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.core.database import Base
@@ -32,6 +32,7 @@ class Evaluation(Base):
         DateTime(timezone=True),
         default=datetime.utcnow,
         nullable=False,
+        index=True,
         comment="Дата и время создания оценки"
     )
 
@@ -57,3 +58,149 @@ class Evaluation(Base):
     evaluator: Mapped["User"] = relationship(
         "User",
     )
+
+
+# -------------------------------------------------------------------
+# Модель EvaluationDaily: сводка оценок по исполнителю и дню
+# -------------------------------------------------------------------
+
+class EvaluationDaily(Base):
+    """
+    Сумма и число оценок задач исполнителя за день (UTC) создания оценки.
+    Средняя за период — отношение сумм по дням, без чтения самих оценок.
+    Ведут триггеры (см. EVALUATION_DAILY_DDL_*), перестраивает
+    rebuild_evaluation_daily.
+    """
+    __tablename__ = 'evaluation_daily'
+
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('users.id', ondelete='CASCADE'),
+        primary_key=True,
+        comment="ID исполнителя оценённых задач"
+    )
+    day: Mapped[date] = mapped_column(
+        Date,
+        primary_key=True,
+        comment="День создания оценок (UTC)"
+    )
+    score_sum: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Сумма баллов за день"
+    )
+    score_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+        comment="Число оценок за день"
+    )
+
+
+# Вклад оценки принадлежит текущему исполнителю задачи, поэтому сводку
+# меняют и оценки (создание, удаление, правка), и задачи: смена исполнителя
+# переносит вклад, удаление вычитает его. Задачи обрабатываются BEFORE DELETE,
+# пока их оценки ещё на месте; каскадное удаление оценок после этого задачу
+# уже не находит и второй раз не вычитает.
+EVALUATION_DAILY_DDL_POSTGRESQL = [
+    """
+    CREATE OR REPLACE FUNCTION evaluation_daily_add(p_user_id integer, p_day date, p_score integer, p_sign integer)
+    RETURNS void LANGUAGE sql AS $$
+        INSERT INTO evaluation_daily (user_id, day, score_sum, score_count)
+        SELECT p_user_id, p_day, p_sign * p_score, p_sign WHERE p_user_id IS NOT NULL
+        ON CONFLICT (user_id, day) DO UPDATE
+        SET score_sum = evaluation_daily.score_sum + EXCLUDED.score_sum,
+            score_count = evaluation_daily.score_count + EXCLUDED.score_count
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION evaluation_daily_evaluation() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM evaluation_daily_add(t.assignee_id, (OLD.created_at AT TIME ZONE 'UTC')::date, OLD.score, -1)
+            FROM tasks t WHERE t.id = OLD.task_id;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            PERFORM evaluation_daily_add(t.assignee_id, (NEW.created_at AT TIME ZONE 'UTC')::date, NEW.score, 1)
+            FROM tasks t WHERE t.id = NEW.task_id;
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE TRIGGER trg_evaluations_daily
+    AFTER INSERT OR DELETE OR UPDATE OF score, created_at, task_id ON evaluations
+    FOR EACH ROW EXECUTE FUNCTION evaluation_daily_evaluation()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION evaluation_daily_task() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' OR NEW.assignee_id IS DISTINCT FROM OLD.assignee_id THEN
+            PERFORM evaluation_daily_add(OLD.assignee_id, (e.created_at AT TIME ZONE 'UTC')::date, e.score, -1)
+            FROM evaluations e WHERE e.task_id = OLD.id;
+        END IF;
+        IF TG_OP = 'DELETE' THEN
+            RETURN OLD;
+        END IF;
+        IF NEW.assignee_id IS DISTINCT FROM OLD.assignee_id THEN
+            PERFORM evaluation_daily_add(NEW.assignee_id, (e.created_at AT TIME ZONE 'UTC')::date, e.score, 1)
+            FROM evaluations e WHERE e.task_id = NEW.id;
+        END IF;
+        RETURN NEW;
+    END $$
+    """,
+    """
+    CREATE TRIGGER trg_tasks_evaluation_daily
+    BEFORE DELETE OR UPDATE OF assignee_id ON tasks
+    FOR EACH ROW EXECUTE FUNCTION evaluation_daily_task()
+    """,
+]
+
+
+def _sqlite_add(user_id: str, day: str, score: str, sign: int, source: str) -> str:
+    # WHERE обязателен: без него SQLite не отличит ON CONFLICT от условия соединения
+    return f"""
+        INSERT INTO evaluation_daily (user_id, day, score_sum, score_count)
+        SELECT {user_id}, date({day}), {sign} * {score}, {sign} FROM {source} AND {user_id} IS NOT NULL
+        ON CONFLICT (user_id, day) DO UPDATE
+        SET score_sum = score_sum + excluded.score_sum, score_count = score_count + excluded.score_count;
+    """
+
+
+EVALUATION_DAILY_DDL_SQLITE = [
+    f"""
+    CREATE TRIGGER trg_evaluations_daily_insert AFTER INSERT ON evaluations
+    BEGIN {_sqlite_add("t.assignee_id", "NEW.created_at", "NEW.score", 1, "tasks t WHERE t.id = NEW.task_id")} END
+    """,
+    f"""
+    CREATE TRIGGER trg_evaluations_daily_delete AFTER DELETE ON evaluations
+    BEGIN {_sqlite_add("t.assignee_id", "OLD.created_at", "OLD.score", -1, "tasks t WHERE t.id = OLD.task_id")} END
+    """,
+    f"""
+    CREATE TRIGGER trg_evaluations_daily_update AFTER UPDATE OF score, created_at, task_id ON evaluations
+    BEGIN
+        {_sqlite_add("t.assignee_id", "OLD.created_at", "OLD.score", -1, "tasks t WHERE t.id = OLD.task_id")}
+        {_sqlite_add("t.assignee_id", "NEW.created_at", "NEW.score", 1, "tasks t WHERE t.id = NEW.task_id")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_tasks_evaluation_daily_delete BEFORE DELETE ON tasks
+    BEGIN {_sqlite_add("OLD.assignee_id", "e.created_at", "e.score", -1, "evaluations e WHERE e.task_id = OLD.id")} END
+    """,
+    f"""
+    CREATE TRIGGER trg_tasks_evaluation_daily_update AFTER UPDATE OF assignee_id ON tasks
+    WHEN OLD.assignee_id IS NOT NEW.assignee_id
+    BEGIN
+        {_sqlite_add("OLD.assignee_id", "e.created_at", "e.score", -1, "evaluations e WHERE e.task_id = OLD.id")}
+        {_sqlite_add("NEW.assignee_id", "e.created_at", "e.score", 1, "evaluations e WHERE e.task_id = NEW.id")}
+    END
+    """,
+]
+
+for _statement in EVALUATION_DAILY_DDL_POSTGRESQL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in EVALUATION_DAILY_DDL_SQLITE:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
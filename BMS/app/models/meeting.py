@@ -1,12 +1,27 @@
+import enum
 from datetime import datetime
-from typing import List
-from sqlalchemy import DateTime, Integer, String, ForeignKey
+from typing import List, Optional
+from sqlalchemy import (
+    DDL, JSON, DateTime, Enum as SQLEnum, Index, Integer, String, ForeignKey, event, func, text,
+)
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.core.database import Base
 from app.models.user import meeting_participants_association
 
 
+# -------------------------------------------------------------------
+# Перечисления
+# -------------------------------------------------------------------
+
+class RecurrenceFreq(str, enum.Enum):
+    """Частота повторения серии встреч."""
+    DAILY = "daily"      # Каждый день
+    WEEKLY = "weekly"    # Каждую неделю
+    MONTHLY = "monthly"  # Каждый месяц (то же число или последний день месяца)
+
+
 # -------------------------------------------------------------------
 # Модель Meeting
 # -------------------------------------------------------------------
@@ -15,6 +30,9 @@ class Meeting(Base):
     """
     Встреча между пользователями.
     Содержит тему, время и список участников.
+    Серия повторяющихся встреч хранится одной строкой: start_time/end_time —
+    первое вхождение, правило — в полях recurrence_*; вхождения
+    разворачиваются только для запрошенного окна.
     """
     __tablename__ = 'meetings'
 
@@ -33,6 +51,7 @@ class Meeting(Base):
     start_time: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
+        index=True,
         comment="Дата и время начала встречи"
     )
     end_time: Mapped[datetime] = mapped_column(
@@ -41,6 +60,40 @@ class Meeting(Base):
         comment="Дата и время окончания встречи"
     )
 
+    # --- Правило повторения (NULL в recurrence_freq — разовая встреча) ---
+    recurrence_freq: Mapped[Optional[RecurrenceFreq]] = mapped_column(
+        SQLEnum(RecurrenceFreq, name="recurrence_freq_enum"),
+        nullable=True,
+        comment="Частота повторения серии; NULL — разовая встреча"
+    )
+    recurrence_interval: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=1,
+        server_default="1",
+        comment="Шаг повторения в единицах частоты"
+    )
+    recurrence_count: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="Число вхождений серии"
+    )
+    recurrence_until: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Последний допустимый момент начала вхождения"
+    )
+    recurrence_exceptions: Mapped[Optional[List[str]]] = mapped_column(
+        JSON(none_as_null=True),
+        nullable=True,
+        comment="Начала отменённых вхождений (ISO, UTC)"
+    )
+    series_end: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Окончание последнего вхождения серии; NULL — бессрочная серия или разовая встреча"
+    )
+
     # --- Создатель ---
     creator_id: Mapped[int] = mapped_column(
         Integer,
@@ -58,3 +111,153 @@ class Meeting(Base):
         secondary=meeting_participants_association,
         back_populates="meetings",
     )
+
+
+# -------------------------------------------------------------------
+# Занятость участников
+# -------------------------------------------------------------------
+
+# Сообщение, с которым БД отклоняет пересекающуюся бронь (SQLite)
+BOOKING_CONFLICT = "meeting_booking_conflict"
+
+
+class MeetingBooking(Base):
+    """
+    Интервал занятости участника разовой встречей: строка на пару (встреча, участник).
+    Заполняется триггерами из meeting_participants и meetings, поэтому
+    пересечения отклоняет сама БД — атомарно, без гонки «проверил, потом вставил».
+    PostgreSQL: EXCLUDE USING gist (user_id WITH =, tstzrange(start, end) WITH &&).
+    SQLite: триггер с той же проверкой по индексу (user_id, start_time, meeting_id).
+    Серии броней не получают — их вхождения проверяются арифметически
+    (см. app.utils.recurrence), без разворачивания всей серии.
+    """
+    __tablename__ = 'meeting_bookings'
+    __table_args__ = (
+        ExcludeConstraint(
+            ('user_id', '='),
+            (func.tstzrange(text('start_time'), text('end_time')), '&&'),
+            name='ex_meeting_bookings_user_id_time',
+            using='gist',
+        ).ddl_if(dialect='postgresql'),
+        # meeting_id в конце: keyset-страницы списка встреч по (start_time, id)
+        Index('ix_meeting_bookings_user_id_start_time_meeting_id', 'user_id', 'start_time', 'meeting_id'),
+    )
+
+    meeting_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('meetings.id', ondelete='CASCADE'),
+        primary_key=True,
+        comment="ID встречи"
+    )
+    user_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey('users.id', ondelete='CASCADE'),
+        primary_key=True,
+        comment="ID участника"
+    )
+    start_time: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="Начало встречи (копия meetings.start_time)"
+    )
+    end_time: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="Окончание встречи (копия meetings.end_time)"
+    )
+
+
+# --- DDL броней: расширение до создания таблиц, триггеры — после ---
+
+# btree_gist нужен ограничению исключения (user_id WITH =) ещё до создания таблиц
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
+
+BOOKING_DDL_POSTGRESQL = [
+    """
+    CREATE OR REPLACE FUNCTION meeting_bookings_sync_participant() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO meeting_bookings (meeting_id, user_id, start_time, end_time)
+            SELECT NEW.meeting_id, NEW.user_id, m.start_time, m.end_time
+            FROM meetings m WHERE m.id = NEW.meeting_id AND m.recurrence_freq IS NULL;
+            RETURN NEW;
+        END IF;
+        DELETE FROM meeting_bookings
+        WHERE meeting_id = OLD.meeting_id AND user_id = OLD.user_id;
+        RETURN OLD;
+    END $$
+    """,
+    """
+    CREATE TRIGGER trg_meeting_participants_booking
+    AFTER INSERT OR DELETE ON meeting_participants
+    FOR EACH ROW EXECUTE FUNCTION meeting_bookings_sync_participant()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION meeting_bookings_sync_time() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE meeting_bookings
+        SET start_time = NEW.start_time, end_time = NEW.end_time
+        WHERE meeting_id = NEW.id;
+        RETURN NEW;
+    END $$
+    """,
+    """
+    CREATE TRIGGER trg_meetings_booking_time
+    AFTER UPDATE OF start_time, end_time ON meetings
+    FOR EACH ROW EXECUTE FUNCTION meeting_bookings_sync_time()
+    """,
+]
+
+_SQLITE_OVERLAP = f"""
+    WHEN EXISTS (
+        SELECT 1 FROM meeting_bookings b
+        WHERE b.user_id = NEW.user_id
+          AND b.meeting_id != NEW.meeting_id
+          AND b.start_time < NEW.end_time
+          AND b.end_time > NEW.start_time
+    )
+    BEGIN SELECT RAISE(ABORT, '{BOOKING_CONFLICT}'); END
+"""
+
+BOOKING_DDL_SQLITE = [
+    """
+    CREATE TRIGGER trg_meeting_participants_booking_insert
+    AFTER INSERT ON meeting_participants
+    BEGIN
+        INSERT INTO meeting_bookings (meeting_id, user_id, start_time, end_time)
+        SELECT NEW.meeting_id, NEW.user_id, m.start_time, m.end_time
+        FROM meetings m WHERE m.id = NEW.meeting_id AND m.recurrence_freq IS NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER trg_meeting_participants_booking_delete
+    AFTER DELETE ON meeting_participants
+    BEGIN
+        DELETE FROM meeting_bookings
+        WHERE meeting_id = OLD.meeting_id AND user_id = OLD.user_id;
+    END
+    """,
+    """
+    CREATE TRIGGER trg_meetings_booking_time
+    AFTER UPDATE OF start_time, end_time ON meetings
+    BEGIN
+        UPDATE meeting_bookings
+        SET start_time = NEW.start_time, end_time = NEW.end_time
+        WHERE meeting_id = NEW.id;
+    END
+    """,
+    "CREATE TRIGGER trg_meeting_bookings_no_overlap_insert BEFORE INSERT ON meeting_bookings" + _SQLITE_OVERLAP,
+    "CREATE TRIGGER trg_meeting_bookings_no_overlap_update"
+    " BEFORE UPDATE OF start_time, end_time ON meeting_bookings" + _SQLITE_OVERLAP,
+]
+
+for _statement in BOOKING_DDL_POSTGRESQL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in BOOKING_DDL_SQLITE:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy import DateTime, Integer, String, ForeignKey, Enum as SQLEnum, Text
+from sqlalchemy import DDL, Boolean, DateTime, Index, Integer, String, ForeignKey, Enum as SQLEnum, Text, event, false
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.core.database import Base
@@ -29,6 +29,15 @@ class Task(Base):
     создателе, исполнителе, комментариях и оценках.
     """
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Keyset-пагинация списка задач: (роль, поле сортировки, id)
+        Index('ix_tasks_assignee_id_deadline_id', 'assignee_id', 'deadline', 'id'),
+        Index('ix_tasks_creator_id_deadline_id', 'creator_id', 'deadline', 'id'),
+        Index('ix_tasks_assignee_id_created_at_id', 'assignee_id', 'created_at', 'id'),
+        Index('ix_tasks_creator_id_created_at_id', 'creator_id', 'created_at', 'id'),
+        # Выполненные задачи исполнителя за период (рейтинг команды)
+        Index('ix_tasks_assignee_id_completed_at', 'assignee_id', 'completed_at'),
+    )
 
     # --- Базовые поля ---
     id: Mapped[int] = mapped_column(
@@ -62,8 +71,35 @@ class Task(Base):
     deadline: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True),
         nullable=True,
+        index=True,
         comment="Срок выполнения задачи"
     )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Когда задача перешла в статус DONE; NULL, пока не выполнена"
+    )
+
+    # --- Счётчики комментариев и оценки (ведут триггеры, см. TASK_COUNTERS_DDL_*) ---
+    comment_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="Число комментариев к задаче"
+    )
+    has_evaluation: Mapped[bool] = mapped_column(
+        Boolean,
+        default=False,
+        server_default=false(),
+        nullable=False,
+        comment="Выставлена ли оценка"
+    )
+    score: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="Балл оценки задачи; NULL — оценки нет"
+    )
 
     # --- Связь с пользователями ---
     creator_id: Mapped[int] = mapped_column(
@@ -99,3 +135,90 @@ class Task(Base):
         back_populates="task",
         cascade="all, delete-orphan",
     )
+
+
+# -------------------------------------------------------------------
+# Счётчики на задаче
+# -------------------------------------------------------------------
+
+# Списки задач показывают число комментариев и оценку, не читая дочерние
+# таблицы. Счётчики меняются в той же транзакции, что и комментарий или
+# оценка, — из эндпоинтов, админки и каскадного удаления одинаково.
+# При удалении самой задачи каскад удаляет дочерние строки уже после неё,
+# и UPDATE задачи просто ничего не находит. Перестраивает rebuild_task_counters.
+TASK_COUNTERS_DDL_POSTGRESQL = [
+    """
+    CREATE OR REPLACE FUNCTION tasks_comment_count() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            UPDATE tasks SET comment_count = comment_count - 1 WHERE id = OLD.task_id;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            UPDATE tasks SET comment_count = comment_count + 1 WHERE id = NEW.task_id;
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE TRIGGER trg_comments_task_count
+    AFTER INSERT OR DELETE OR UPDATE OF task_id ON comments
+    FOR EACH ROW EXECUTE FUNCTION tasks_comment_count()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION tasks_evaluation_score() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            UPDATE tasks SET has_evaluation = false, score = NULL WHERE id = OLD.task_id;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            UPDATE tasks SET has_evaluation = true, score = NEW.score WHERE id = NEW.task_id;
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE TRIGGER trg_evaluations_task_score
+    AFTER INSERT OR DELETE OR UPDATE OF score, task_id ON evaluations
+    FOR EACH ROW EXECUTE FUNCTION tasks_evaluation_score()
+    """,
+]
+
+TASK_COUNTERS_DDL_SQLITE = [
+    """
+    CREATE TRIGGER trg_comments_task_count_insert AFTER INSERT ON comments
+    BEGIN UPDATE tasks SET comment_count = comment_count + 1 WHERE id = NEW.task_id; END
+    """,
+    """
+    CREATE TRIGGER trg_comments_task_count_delete AFTER DELETE ON comments
+    BEGIN UPDATE tasks SET comment_count = comment_count - 1 WHERE id = OLD.task_id; END
+    """,
+    """
+    CREATE TRIGGER trg_comments_task_count_update AFTER UPDATE OF task_id ON comments
+    BEGIN
+        UPDATE tasks SET comment_count = comment_count - 1 WHERE id = OLD.task_id;
+        UPDATE tasks SET comment_count = comment_count + 1 WHERE id = NEW.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER trg_evaluations_task_score_insert AFTER INSERT ON evaluations
+    BEGIN UPDATE tasks SET has_evaluation = 1, score = NEW.score WHERE id = NEW.task_id; END
+    """,
+    """
+    CREATE TRIGGER trg_evaluations_task_score_delete AFTER DELETE ON evaluations
+    BEGIN UPDATE tasks SET has_evaluation = 0, score = NULL WHERE id = OLD.task_id; END
+    """,
+    """
+    CREATE TRIGGER trg_evaluations_task_score_update AFTER UPDATE OF score, task_id ON evaluations
+    BEGIN
+        UPDATE tasks SET has_evaluation = 0, score = NULL WHERE id = OLD.task_id;
+        UPDATE tasks SET has_evaluation = 1, score = NEW.score WHERE id = NEW.task_id;
+    END
+    """,
+]
+
+for _statement in TASK_COUNTERS_DDL_POSTGRESQL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in TASK_COUNTERS_DDL_SQLITE:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -1,5 +1,6 @@
 import enum
-from sqlalchemy import Column, Integer, ForeignKey, Enum, Table
+from datetime import datetime
+from sqlalchemy import DDL, Column, DateTime, Integer, ForeignKey, Enum, Index, String, Table, event, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from fastapi_users_db_sqlalchemy import SQLAlchemyBaseUserTable
 
@@ -27,6 +28,8 @@ meeting_participants_association = Table(
     Base.metadata,
     Column('meeting_id', Integer, ForeignKey('meetings.id'), primary_key=True),
     Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
+    # PK (meeting_id, user_id) не помогает искать встречи пользователя
+    Index('ix_meeting_participants_user_id_meeting_id', 'user_id', 'meeting_id'),
 )
 
 
@@ -57,6 +60,7 @@ class User(SQLAlchemyBaseUserTable[int], Base):
         Integer,
         ForeignKey('teams.id', ondelete='SET NULL'),
         nullable=True,
+        index=True,
         comment="ID команды, к которой привязан пользователь"
     )
     team: Mapped["Team"] = relationship(
@@ -65,6 +69,28 @@ class User(SQLAlchemyBaseUserTable[int], Base):
         foreign_keys=[team_id]
     )
 
+    # --- Часовой пояс, в котором календарь делит время на дни ---
+    timezone: Mapped[str | None] = mapped_column(
+        String(64),
+        nullable=True,
+        comment="Часовой пояс IANA для календаря; NULL — UTC"
+    )
+
+    # --- Отметка изменений календаря (ведут триггеры, см. CALENDAR_DDL_*) ---
+    calendar_version: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="Счётчик изменений задач и встреч пользователя (ETag ленты ICS)"
+    )
+    calendar_changed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        comment="Время последнего изменения задач и встреч пользователя (Last-Modified ленты ICS)"
+    )
+
     # --- Связь с задачами ---
     created_tasks: Mapped[list["Task"]] = relationship(
         "Task",
@@ -84,3 +110,163 @@ class User(SQLAlchemyBaseUserTable[int], Base):
         secondary=meeting_participants_association,
         back_populates="participants",
     )
+
+
+# --- DDL отметок календаря: любое изменение задачи или встречи пользователя
+# увеличивает users.calendar_version, так что проверка актуальности ленты ICS
+# читает одну строку users и не трогает задачи и встречи ---
+
+# Поля, попадающие в ленту: изменения счётчиков и прочих служебных колонок её не меняют
+CALENDAR_TASK_COLUMNS = "title, description, status, deadline, creator_id, assignee_id"
+CALENDAR_MEETING_COLUMNS = (
+    "title, start_time, end_time, recurrence_freq, recurrence_interval,"
+    " recurrence_count, recurrence_until, recurrence_exceptions"
+)
+
+
+def calendar_rows_changed(columns: str) -> str:
+    """
+    Условие для пары строк o (old_rows) и n (new_rows) переходных таблиц:
+    изменилась хотя бы одна из колонок. Сравнение по ::text — у json нет оператора =.
+    """
+    names = [name.strip() for name in columns.split(",")]
+    return " OR ".join(f"o.{name}::text IS DISTINCT FROM n.{name}::text" for name in names)
+
+
+# PostgreSQL: триггеры уровня оператора с переходными таблицами — пакетная
+# запись обновляет каждого пользователя один раз, а не на каждую строку, и
+# блокирует строки users по порядку id, так что встречные пакеты не ловят
+# взаимоблокировку. Переходные таблицы не сочетаются со списком колонок
+# UPDATE OF и с несколькими событиями в одном триггере, поэтому триггеров
+# по одному на событие, а изменения колонок ленты проверяет calendar_rows_changed
+CALENDAR_DDL_POSTGRESQL = [
+    """
+    CREATE OR REPLACE FUNCTION users_calendar_touch(user_ids integer[]) RETURNS void
+    LANGUAGE sql AS $$
+        WITH touched AS (
+            SELECT id FROM users WHERE id = ANY(user_ids) ORDER BY id FOR UPDATE
+        )
+        UPDATE users SET calendar_version = calendar_version + 1, calendar_changed_at = now()
+        FROM touched WHERE users.id = touched.id
+    $$
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION users_calendar_touch_tasks() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM users_calendar_touch(ARRAY(
+                SELECT creator_id FROM new_rows UNION SELECT assignee_id FROM new_rows
+            ));
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM users_calendar_touch(ARRAY(
+                SELECT creator_id FROM old_rows UNION SELECT assignee_id FROM old_rows
+            ));
+        ELSE
+            PERFORM users_calendar_touch(ARRAY(
+                SELECT DISTINCT u.id
+                FROM old_rows o JOIN new_rows n USING (id)
+                CROSS JOIN LATERAL (VALUES (o.creator_id), (o.assignee_id), (n.creator_id), (n.assignee_id)) AS u(id)
+                WHERE {calendar_rows_changed(CALENDAR_TASK_COLUMNS)}
+            ));
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE TRIGGER trg_tasks_calendar_touch_insert
+    AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION users_calendar_touch_tasks()
+    """,
+    """
+    CREATE TRIGGER trg_tasks_calendar_touch_update
+    AFTER UPDATE ON tasks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION users_calendar_touch_tasks()
+    """,
+    """
+    CREATE TRIGGER trg_tasks_calendar_touch_delete
+    AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION users_calendar_touch_tasks()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION users_calendar_touch_participants() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM users_calendar_touch(ARRAY(SELECT DISTINCT user_id FROM new_rows));
+        ELSE
+            PERFORM users_calendar_touch(ARRAY(SELECT DISTINCT user_id FROM old_rows));
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE TRIGGER trg_meeting_participants_calendar_touch_insert
+    AFTER INSERT ON meeting_participants REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION users_calendar_touch_participants()
+    """,
+    """
+    CREATE TRIGGER trg_meeting_participants_calendar_touch_delete
+    AFTER DELETE ON meeting_participants REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION users_calendar_touch_participants()
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION users_calendar_touch_meetings() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM users_calendar_touch(ARRAY(
+            SELECT DISTINCT mp.user_id
+            FROM old_rows o JOIN new_rows n USING (id)
+            JOIN meeting_participants mp ON mp.meeting_id = n.id
+            WHERE {calendar_rows_changed(CALENDAR_MEETING_COLUMNS)}
+        ));
+        RETURN NULL;
+    END $$
+    """,
+    """
+    CREATE TRIGGER trg_meetings_calendar_touch
+    AFTER UPDATE ON meetings REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION users_calendar_touch_meetings()
+    """,
+]
+
+# SQLite: триггеров уровня оператора нет, остаются построчные. Запись в SQLite
+# однопоточна и обновляет строку на месте, так что ни мёртвых версий строк,
+# ни взаимоблокировок построчный триггер там не создаёт
+_SQLITE_TOUCH = "UPDATE users SET calendar_version = calendar_version + 1, calendar_changed_at = CURRENT_TIMESTAMP"
+
+CALENDAR_DDL_SQLITE = [
+    f"""
+    CREATE TRIGGER trg_tasks_calendar_touch_insert AFTER INSERT ON tasks
+    BEGIN {_SQLITE_TOUCH} WHERE id IN (NEW.creator_id, NEW.assignee_id); END
+    """,
+    f"""
+    CREATE TRIGGER trg_tasks_calendar_touch_update AFTER UPDATE OF {CALENDAR_TASK_COLUMNS} ON tasks
+    BEGIN
+        {_SQLITE_TOUCH} WHERE id IN (OLD.creator_id, OLD.assignee_id, NEW.creator_id, NEW.assignee_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER trg_tasks_calendar_touch_delete AFTER DELETE ON tasks
+    BEGIN {_SQLITE_TOUCH} WHERE id IN (OLD.creator_id, OLD.assignee_id); END
+    """,
+    f"""
+    CREATE TRIGGER trg_meeting_participants_calendar_touch_insert AFTER INSERT ON meeting_participants
+    BEGIN {_SQLITE_TOUCH} WHERE id = NEW.user_id; END
+    """,
+    f"""
+    CREATE TRIGGER trg_meeting_participants_calendar_touch_delete AFTER DELETE ON meeting_participants
+    BEGIN {_SQLITE_TOUCH} WHERE id = OLD.user_id; END
+    """,
+    f"""
+    CREATE TRIGGER trg_meetings_calendar_touch AFTER UPDATE OF {CALENDAR_MEETING_COLUMNS} ON meetings
+    BEGIN
+        {_SQLITE_TOUCH} WHERE id IN (SELECT user_id FROM meeting_participants WHERE meeting_id = NEW.id);
+    END
+    """,
+]
+
+for _statement in CALENDAR_DDL_POSTGRESQL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in CALENDAR_DDL_SQLITE:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -1,83 +1,435 @@
-from datetime import datetime, date
+from datetime import datetime, date, timedelta, timezone
 import calendar as pycal
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import PlainTextResponse
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
 
-from app.utils.services import get_meetings_for_date, get_tasks_for_date
-from app.core.database import get_async_session
+from app.utils.services import (
+    assert_can_view_team_reports,
+    count_meetings_by_day,
+    count_tasks_by_day,
+    count_team_events_by_day,
+    day_bounds,
+    get_meetings_for_date,
+    get_tasks_for_date,
+    get_team_events_for_date,
+    get_team_or_404,
+    get_user_series,
+    meeting_recurrence,
+)
+from app.core.database import get_read_session, get_stream_session_factory, session_pinned_to_primary
 from app.core.auth import current_active_user
-from app.models.user import User
+from app.models.meeting import Meeting, MeetingBooking
+from app.models.task import Task
+from app.models.user import User, UserRole
+from app.schemas.calendar import (
+    CalendarEvent,
+    CalendarEventKind,
+    CalendarFormat,
+    TeamDailyCalendar,
+    TeamMemberDay,
+    TeamMemberMonth,
+    TeamMonthlyCalendar,
+)
+from app.utils.cache import CalendarKey, calendar_cache
+from app.utils.ical import CALENDAR_FOOTER, calendar_header, meeting_vevent, task_vtodo
+from app.utils.timezones import UTC, parse_timezone, to_local
 
 
 router = APIRouter(prefix="/calendar", tags=["Календарь"])
 
+TEAM_CALENDAR_RESPONSES = {200: {"content": {"text/plain": {}, "application/json": {}}}}
+
+# Окно ленты ICS по умолчанию и размер пачки строк серверного курсора
+FEED_DEFAULT_PAST_DAYS = 90
+FEED_DEFAULT_FUTURE_DAYS = 365
+FEED_BATCH_SIZE = 500
+
+
 # -------------------------------------------------------------------
-# Эндпоинты
+# Разбор параметров и текстовые таблицы
 # -------------------------------------------------------------------
 
-@router.get(
-    "/daily/{target_date}",
-    response_class=PlainTextResponse,
-    description="Дневной вид: текстовая таблица задач и встреч на указанную дату YYYY-MM-DD"
-)
-async def daily_calendar(
-    target_date: str,
-    current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
-):
+def _parse_date(target_date: str) -> date:
     try:
-        d = datetime.fromisoformat(target_date).date()
+        return datetime.fromisoformat(target_date).date()
     except ValueError:
         raise HTTPException(status_code=400, detail="Неверный формат даты, ожидается YYYY-MM-DD")
 
-    if not current_user.team_id:
-        return "Вы не состоите в команде."
 
-    tasks = await get_tasks_for_date(db, current_user.team_id, d)
-    meetings = await get_meetings_for_date(db, current_user.id, d)
+def _month_days(year: int, month: int) -> List[date]:
+    if not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="Месяц должен быть от 1 до 12")
+    _, days_in_month = pycal.monthrange(year, month)
+    return [date(year, month, day) for day in range(1, days_in_month + 1)]
+
 
+def calendar_timezone(
+    tz: Optional[str] = Query(
+        None, description="Часовой пояс IANA, например Europe/Moscow; по умолчанию — из профиля, иначе UTC"
+    ),
+    current_user: User = Depends(current_active_user),
+) -> ZoneInfo:
+    """Часовой пояс, в котором календарь делит время на дни."""
+    name = tz or getattr(current_user, "timezone", None)
+    return parse_timezone(name) if name else UTC
+
+
+def _day_lines(tasks, meetings, tz: ZoneInfo = UTC) -> List[str]:
+    """Таблица дня: локальное время, тип и заголовок события."""
     lines = ["Время      | Тип     | Заголовок", "-" * 40]
 
     for t in sorted(tasks, key=lambda x: x.deadline or datetime.min):
-        tm = t.deadline.time().strftime("%H:%M") if t.deadline else "--:--"
+        tm = to_local(t.deadline, tz).strftime("%H:%M") if t.deadline else "--:--"
         lines.append(f"{tm:<10}| Задача  | {t.title}")
 
     for m in sorted(meetings, key=lambda x: x.start_time):
-        tm = m.start_time.time().strftime("%H:%M")
+        tm = to_local(m.start_time, tz).strftime("%H:%M")
         lines.append(f"{tm:<10}| Встреча| {m.title}")
 
     if len(lines) == 2:
         lines.append("Событий нет.")
+    return lines
 
-    return "\n".join(lines)
+
+def _month_lines(days: List[date], task_counts: Dict[date, int], meeting_counts: Dict[date, int]) -> List[str]:
+    """Таблица месяца: количество задач и встреч на каждый день."""
+    header = "Дата       | Задач | Встреч"
+    lines = [header, "-" * len(header)]
+
+    for d in days:
+        tasks = task_counts.get(d, 0)
+        meetings = meeting_counts.get(d, 0)
+        lines.append(f"{d.isoformat():<10}| {tasks:^5} | {meetings:^6}")
+    return lines
+
+
+def _member_title(member: User) -> str:
+    return f"== {member.email} (ID {member.id}) =="
+
+
+def _cached(response: Response, key: CalendarKey, db: AsyncSession):
+    """
+    Текст из кэша календаря или None; попадание отмечается заголовком X-Calendar-Cache.
+    Кэш заполняют и чтения с реплики: её отставание может продержать в кэше
+    старый ответ до ttl, но только что записавший клиент кэш не читает.
+    """
+    text = None if session_pinned_to_primary(db) else calendar_cache.get(key)
+    response.headers["X-Calendar-Cache"] = "MISS" if text is None else "HIT"
+    return text
+
+
+# -------------------------------------------------------------------
+# Эндпоинты
+# -------------------------------------------------------------------
+
+@router.get(
+    "/daily/{target_date}",
+    response_class=PlainTextResponse,
+    description=(
+        "Дневной вид: текстовая таблица задач и встреч на указанную дату YYYY-MM-DD. "
+        "Границы дня и время событий — в часовом поясе tz"
+    )
+)
+async def daily_calendar(
+    target_date: str,
+    response: Response,
+    current_user: User = Depends(current_active_user),
+    tz: ZoneInfo = Depends(calendar_timezone),
+    db: AsyncSession = Depends(get_read_session),
+):
+    d = _parse_date(target_date)
+
+    if not current_user.team_id:
+        return "Вы не состоите в команде."
+
+    key = CalendarKey(current_user.id, current_user.team_id, d, tz.key)
+    cached = _cached(response, key, db)
+    if cached is not None:
+        return cached
+    generation = calendar_cache.generation()
+
+    tasks = await get_tasks_for_date(db, current_user.team_id, d, tz)
+    meetings = await get_meetings_for_date(db, current_user.id, d, tz)
+
+    text = "\n".join(_day_lines(tasks, meetings, tz))
+    calendar_cache.set(key, text, generation)
+    return text
 
 
 @router.get(
     "/monthly/{year}/{month}",
     response_class=PlainTextResponse,
-    description="Месячный вид: текстовая таблица с количеством задач и встреч на каждый день"
+    description=(
+        "Месячный вид: текстовая таблица с количеством задач и встреч на каждый день. "
+        "Дни считаются в часовом поясе tz"
+    )
 )
 async def monthly_calendar(
     year: int,
     month: int,
+    response: Response,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    tz: ZoneInfo = Depends(calendar_timezone),
+    db: AsyncSession = Depends(get_read_session),
 ):
-    if not 1 <= month <= 12:
-        raise HTTPException(status_code=400, detail="Месяц должен быть от 1 до 12")
+    days = _month_days(year, month)
 
     if not current_user.team_id:
         return "Вы не состоите в команде."
 
-    _, days_in_month = pycal.monthrange(year, month)
-    header = "Дата       | Задач | Встреч"
-    lines = [header, "-" * len(header)]
+    key = CalendarKey(current_user.id, current_user.team_id, (year, month), tz.key)
+    cached = _cached(response, key, db)
+    if cached is not None:
+        return cached
+    generation = calendar_cache.generation()
+
+    first_day, next_month = days[0], days[-1] + timedelta(days=1)
+
+    # Два сгруппированных запроса на весь месяц вместо пары запросов на каждый день
+    task_counts = await count_tasks_by_day(db, current_user.team_id, first_day, next_month, tz)
+    meeting_counts = await count_meetings_by_day(db, current_user.id, first_day, next_month, tz)
+
+    text = "\n".join(_month_lines(days, task_counts, meeting_counts))
+    calendar_cache.set(key, text, generation)
+    return text
+
+
+@router.get(
+    "/cache/stats",
+    description="Счётчики кэша дневного и месячного вида: попадания, промахи, размер. Только для админов"
+)
+async def calendar_cache_stats(current_user: User = Depends(current_active_user)):
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения операции")
+    return calendar_cache.stats()
+
+
+# -------------------------------------------------------------------
+# Календарь команды
+# -------------------------------------------------------------------
+
+@router.get(
+    "/team/{team_id}/daily/{target_date}",
+    response_model=None,
+    responses=TEAM_CALENDAR_RESPONSES,
+    description=(
+        "Дневной вид команды: задачи и встречи каждого участника на дату YYYY-MM-DD. "
+        "format=text — текстовые таблицы по участникам, format=json — сетка TeamDailyCalendar. "
+        "Границы дня — в часовом поясе tz. Доступно админу команды и глобальному админу"
+    )
+)
+async def team_daily_calendar(
+    team_id: int,
+    target_date: str,
+    fmt: CalendarFormat = Query(CalendarFormat.TEXT, alias="format", description="text или json"),
+    current_user: User = Depends(current_active_user),
+    tz: ZoneInfo = Depends(calendar_timezone),
+    db: AsyncSession = Depends(get_read_session),
+):
+    d = _parse_date(target_date)
+    team = await get_team_or_404(team_id, db)
+    assert_can_view_team_reports(current_user, team)
+
+    members = sorted(team.members, key=lambda u: u.id)
+    tasks, meetings = await get_team_events_for_date(db, [u.id for u in members], d, tz)
+
+    if fmt == CalendarFormat.JSON:
+        grid = []
+        for member in members:
+            events = [
+                CalendarEvent(kind=CalendarEventKind.TASK, id=t.id, title=t.title, start_time=t.deadline)
+                for t in tasks[member.id]
+            ] + [
+                CalendarEvent(kind=CalendarEventKind.MEETING, id=m.id, title=m.title,
+                              start_time=m.start_time, end_time=m.end_time)
+                for m in meetings[member.id]
+            ]
+            events.sort(key=lambda e: (e.start_time or datetime.min, e.kind.value, e.id))
+            grid.append(TeamMemberDay(user_id=member.id, email=member.email, events=events))
+        return TeamDailyCalendar(team_id=team.id, date=d, timezone=tz.key, members=grid)
+
+    lines = []
+    for member in members:
+        lines += [_member_title(member), *_day_lines(tasks[member.id], meetings[member.id], tz), ""]
+    return PlainTextResponse("\n".join(lines).rstrip() or "В команде нет участников.")
+
+
+@router.get(
+    "/team/{team_id}/monthly/{year}/{month}",
+    response_model=None,
+    responses=TEAM_CALENDAR_RESPONSES,
+    description=(
+        "Месячный вид команды: количество задач и встреч каждого участника по дням. "
+        "format=text — текстовые таблицы по участникам, format=json — сетка участник × день "
+        "TeamMonthlyCalendar. Дни считаются в часовом поясе tz. "
+        "Доступно админу команды и глобальному админу"
+    )
+)
+async def team_monthly_calendar(
+    team_id: int,
+    year: int,
+    month: int,
+    fmt: CalendarFormat = Query(CalendarFormat.TEXT, alias="format", description="text или json"),
+    current_user: User = Depends(current_active_user),
+    tz: ZoneInfo = Depends(calendar_timezone),
+    db: AsyncSession = Depends(get_read_session),
+):
+    days = _month_days(year, month)
+    team = await get_team_or_404(team_id, db)
+    assert_can_view_team_reports(current_user, team)
+
+    members = sorted(team.members, key=lambda u: u.id)
+    # Сгруппированные по (участник, день) запросы вместо пары запросов на участника
+    task_counts, meeting_counts = await count_team_events_by_day(
+        db, [u.id for u in members], days[0], days[-1] + timedelta(days=1), tz
+    )
+
+    if fmt == CalendarFormat.JSON:
+        return TeamMonthlyCalendar(
+            team_id=team.id,
+            year=year,
+            month=month,
+            days=days,
+            timezone=tz.key,
+            members=[
+                TeamMemberMonth(
+                    user_id=member.id,
+                    email=member.email,
+                    tasks=[task_counts[(member.id, d)] for d in days],
+                    meetings=[meeting_counts[(member.id, d)] for d in days],
+                )
+                for member in members
+            ],
+        )
+
+    lines = []
+    for member in members:
+        member_tasks = {d: task_counts[(member.id, d)] for d in days}
+        member_meetings = {d: meeting_counts[(member.id, d)] for d in days}
+        lines += [_member_title(member), *_month_lines(days, member_tasks, member_meetings), ""]
+    return PlainTextResponse("\n".join(lines).rstrip() or "В команде нет участников.")
+
+
+# -------------------------------------------------------------------
+# Лента iCalendar
+# -------------------------------------------------------------------
+
+def _http_datetime(value: datetime) -> datetime:
+    """Время для Last-Modified: UTC с точностью до секунды (SQLite отдаёт наивное UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """Условный GET: If-None-Match важнее If-Modified-Since (RFC 9110, 13.2.2)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def _feed_body(
+    session_factory: sessionmaker,
+    user_id: int,
+    email: str,
+    start: datetime,
+    end: datetime,
+    stamp: datetime,
+):
+    """
+    Тело ленты. Задачи и разовые встречи читаются серверными курсорами
+    пачками по FEED_BATCH_SIZE и сразу отдаются клиенту; серия — один
+    VEVENT с RRULE, так что размер ответа не растёт с числом её вхождений.
+    """
+    yield calendar_header(f"BMS: {email}")
+    async with session_factory() as db:
+        tasks = await db.stream_scalars(
+            select(Task)
+            .where(or_(Task.assignee_id == user_id, Task.creator_id == user_id))
+            .where(Task.deadline >= start)
+            .where(Task.deadline < end)
+            .order_by(Task.deadline, Task.id)
+            .execution_options(yield_per=FEED_BATCH_SIZE)
+        )
+        async for task in tasks:
+            yield task_vtodo(task, stamp)
+
+        meetings = await db.stream_scalars(
+            select(Meeting)
+            .join(MeetingBooking, MeetingBooking.meeting_id == Meeting.id)
+            .where(MeetingBooking.user_id == user_id)
+            .where(MeetingBooking.start_time >= start)
+            .where(MeetingBooking.start_time < end)
+            .order_by(MeetingBooking.start_time, MeetingBooking.meeting_id)
+            .execution_options(yield_per=FEED_BATCH_SIZE)
+        )
+        async for meeting in meetings:
+            yield meeting_vevent(meeting, None, stamp)
+
+        for series in await get_user_series(db, [user_id], start, end):
+            yield meeting_vevent(series, meeting_recurrence(series), stamp)
+    yield CALENDAR_FOOTER
+
+
+@router.get(
+    "/feed.ics",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/calendar": {}}}, 304: {"description": "Лента не изменилась"}},
+    description=(
+        "Лента iCalendar для подписки из внешних календарей: задачи пользователя (VTODO) "
+        "с дедлайном в окне и его встречи (VEVENT, серии — с RRULE). Окно from..to включительно, "
+        f"по умолчанию {FEED_DEFAULT_PAST_DAYS} дней назад и {FEED_DEFAULT_FUTURE_DAYS} дней вперёд. "
+        "Поддерживает ETag/If-None-Match и Last-Modified/If-Modified-Since"
+    )
+)
+async def calendar_feed(
+    request: Request,
+    date_from: Optional[date] = Query(None, alias="from", description="Начало окна"),
+    date_to: Optional[date] = Query(None, alias="to", description="Конец окна (включительно)"),
+    current_user: User = Depends(current_active_user),
+    session_factory: sessionmaker = Depends(get_stream_session_factory),
+):
+    today = datetime.now(timezone.utc).date()
+    sliding = date_from is None or date_to is None
+    date_from = date_from or today - timedelta(days=FEED_DEFAULT_PAST_DAYS)
+    date_to = date_to or today + timedelta(days=FEED_DEFAULT_FUTURE_DAYS)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="Некорректный период: 'from' позже 'to'")
 
-    for day in range(1, days_in_month + 1):
-        d = date(year, month, day)
-        tasks = await get_tasks_for_date(db, current_user.team_id, d)
-        meetings = await get_meetings_for_date(db, current_user.id, d)
-        lines.append(f"{d.isoformat():<10}| {len(tasks):^5} | {len(meetings):^6}")
+    # Версию и время изменения ведут триггеры на задачах и встречах, а строка
+    # пользователя уже загружена аутентификацией — 304 обходится без запросов
+    changed_at = _http_datetime(current_user.calendar_changed_at)
+    if sliding:
+        # Окно по умолчанию сдвигается каждые сутки, и лента меняется без
+        # изменения задач и встреч: не раньше начала текущих суток (UTC)
+        changed_at = max(changed_at, datetime.combine(today, datetime.min.time(), tzinfo=timezone.utc))
+    etag = f'"{current_user.id}-{current_user.calendar_version}-{date_from:%Y%m%d}-{date_to:%Y%m%d}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(changed_at, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+    if _not_modified(request, etag, changed_at):
+        return Response(status_code=304, headers=headers)
 
-    return "\n".join(lines)
+    start, end = day_bounds(date_from, date_to + timedelta(days=1))
+    return StreamingResponse(
+        _feed_body(session_factory, current_user.id, current_user.email, start, end, changed_at),
+        media_type="text/calendar; charset=utf-8",
+        headers=headers,
+    )
@@ -1,57 +1,269 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from sqlalchemy import delete, select, update
-from sqlalchemy.orm import selectinload
+from datetime import datetime, time, timedelta
+from itertools import islice
+from typing import List, Optional
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 
-from app.core.database import get_async_session
+from app.core.database import get_async_session, get_read_session
 from app.core.auth import current_active_user
 from app.models.user import User, UserRole
-from app.schemas.meeting import MeetingRead, MeetingCreate, MeetingUpdate
-from app.utils.services import get_meeting_or_404, check_time_conflicts
-from app.models.meeting import Meeting, meeting_participants_association
+from app.schemas.meeting import (
+    MeetingBulkConflict,
+    MeetingBulkCreate,
+    MeetingBulkItemResult,
+    MeetingBulkResult,
+    MeetingBulkStatus,
+    MeetingCreate,
+    MeetingPage,
+    MeetingRead,
+    MeetingSlot,
+    MeetingUpdate,
+)
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_after, parse_cursor_datetime
+from app.utils.recurrence import Recurrence
+from app.utils.services import (
+    build_recurrence,
+    check_series_conflicts,
+    check_time_conflicts,
+    find_free_slots,
+    find_overlaps,
+    get_user_zones,
+    get_busy_by_user,
+    get_busy_intervals,
+    get_meeting_or_404,
+    invalidate_meeting_calendar,
+    is_booking_conflict,
+    meeting_participant_ids,
+    meeting_recurrence,
+    off_hours,
+    parse_id_list,
+    recurrence_columns,
+    recurrence_read,
+    series_in_window,
+    to_naive_utc,
+)
+from app.models.meeting import Meeting, MeetingBooking, meeting_participants_association
 
 router = APIRouter(prefix="/meetings", tags=["Встречи"])
 
+
+async def _reject_busy(
+    db: AsyncSession,
+    user_ids: List[int],
+    start: datetime,
+    end: datetime,
+    exclude_meeting_id: Optional[int] = None,
+) -> None:
+    """
+    БД отклонила пересекающуюся бронь: откатить транзакцию
+    и вернуть прежнюю 400 ошибку со списком занятых участников.
+    """
+    await db.rollback()
+    await check_time_conflicts(
+        user_ids=user_ids,
+        start=start,
+        end=end,
+        db=db,
+        exclude_meeting_id=exclude_meeting_id
+    )
+    # Пересекавшуюся встречу успели удалить — сообщаем без списка
+    raise HTTPException(status_code=400, detail="Участники уже заняты в это время")
+
+
+def _meeting_read(
+    meeting: Meeting,
+    participant_ids: List[int],
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+) -> MeetingRead:
+    """Ответ по встрече; для вхождения серии — время вхождения."""
+    return MeetingRead(
+        id=meeting.id,
+        title=meeting.title,
+        start_time=start_time or meeting.start_time,
+        end_time=end_time or meeting.end_time,
+        creator_id=meeting.creator_id,
+        participants=participant_ids,
+        recurrence=recurrence_read(meeting_recurrence(meeting)),
+    )
+
+
 # -------------------------------------------------------------------
 # Эндпоинты
 # -------------------------------------------------------------------
 
+# Наибольшее окно, в котором список встреч разворачивает серии
+MEETINGS_MAX_WINDOW_DAYS = 366
+
+
 @router.get(
     "/",
-    response_model=List[MeetingRead],
-    description="Список встреч текущего пользователя."
+    response_model=MeetingPage,
+    description=(
+        "Список встреч текущего пользователя по времени начала, постранично. С окном from/to — "
+        "встречи, пересекающие окно, а серии развёрнуты во вхождения; без окна — серии одной записью с правилом."
+    )
 )
 async def list_meetings(
+    limit: int = Query(50, ge=1, le=200, description="Размер страницы"),
+    after: Optional[str] = Query(None, description="Курсор next_cursor предыдущей страницы"),
+    window_from: Optional[datetime] = Query(None, alias="from", description="Начало окна"),
+    window_to: Optional[datetime] = Query(None, alias="to", description="Конец окна"),
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
-    meetings = await db.execute(
-        select(Meeting)
-        .options(selectinload(Meeting.participants))
+    """
+    Keyset-пагинация по (start_time, id). Разовые встречи читаются страницей
+    по индексу броней (user_id, start_time, meeting_id), серии — по строке
+    на серию. ID участников приходят агрегатом в той же строке, без загрузки User.
+    """
+    windowed = window_from is not None or window_to is not None
+    if windowed:
+        if window_from is None or window_to is None:
+            raise HTTPException(status_code=400, detail="Окно задаётся параметрами from и to вместе")
+        window_from, window_to = to_naive_utc(window_from), to_naive_utc(window_to)
+        if window_to <= window_from:
+            raise HTTPException(status_code=400, detail="Конец окна должен быть позже начала")
+        if window_to - window_from > timedelta(days=MEETINGS_MAX_WINDOW_DAYS):
+            raise HTTPException(status_code=400, detail=f"Окно не длиннее {MEETINGS_MAX_WINDOW_DAYS} дней")
+
+    cursor = None
+    if after:
+        value, last_id = decode_cursor(after, 2)
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Некорректный курсор пагинации")
+        cursor = (parse_cursor_datetime(value), last_id)
+
+    participant_ids = meeting_participant_ids()
+    singles = (
+        select(Meeting, participant_ids)
+        .join(MeetingBooking, MeetingBooking.meeting_id == Meeting.id)
+        .where(MeetingBooking.user_id == current_user.id)
+        .order_by(MeetingBooking.start_time, MeetingBooking.meeting_id)
+        .limit(limit + 1)
+    )
+    series = (
+        select(Meeting, participant_ids)
         .join(meeting_participants_association)
         .where(meeting_participants_association.c.user_id == current_user.id)
+        .where(Meeting.recurrence_freq.is_not(None))
     )
-    meetings = meetings.scalars().all()
+    if windowed:
+        singles = singles.where(MeetingBooking.start_time < window_to, MeetingBooking.end_time > window_from)
+        series = series.where(series_in_window(window_from, window_to))
+    if cursor:
+        singles = singles.where(keyset_after(MeetingBooking.start_time, MeetingBooking.meeting_id, *cursor))
+
+    # (начало, id, ответ): разовые — не больше limit + 1, серии — тоже
+    entries = [
+        (to_naive_utc(m.start_time), m.id, _meeting_read(m, parse_id_list(ids)))
+        for m, ids in (await db.execute(singles)).all()
+    ]
+    for m, ids in (await db.execute(series)).all():
+        ids = parse_id_list(ids)
+        if not windowed:
+            if not cursor or (to_naive_utc(m.start_time), m.id) > cursor:
+                entries.append((to_naive_utc(m.start_time), m.id, _meeting_read(m, ids)))
+            continue
+        # Вхождения разворачиваются с позиции курсора и не дальше одной страницы
+        occurrences = meeting_recurrence(m).occurrences(
+            max(window_from, cursor[0]) if cursor else window_from, window_to
+        )
+        entries.extend(islice(
+            (
+                (start, m.id, _meeting_read(m, ids, start, end))
+                for start, end in occurrences
+                if not cursor or (start, m.id) > cursor
+            ),
+            limit + 1,
+        ))
+
+    entries.sort(key=lambda e: (e[0], e[1]))
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(entries[-1][0], entries[-1][1])
+    return MeetingPage(items=[e[2] for e in entries], next_cursor=next_cursor)
+
+
+# Ограничения поиска свободных слотов
+AVAILABILITY_MAX_USERS = 200
+AVAILABILITY_MAX_DAYS = 62
+
 
-    return [
-        MeetingRead(
-            id=m.id,
-            title=m.title,
-            start_time=m.start_time,
-            end_time=m.end_time,
-            creator_id=m.creator_id,
-            participants=[user.id for user in m.participants],
+@router.get(
+    "/availability",
+    response_model=List[MeetingSlot],
+    description=(
+        "Первые свободные слоты, общие для всех указанных пользователей, в рабочие часы. "
+        "Рабочие часы и выходные считаются в часовом поясе профиля каждого пользователя (без пояса — UTC)"
+    )
+)
+async def meeting_availability(
+    users: str = Query(..., description="ID пользователей через запятую"),
+    window_from: datetime = Query(..., alias="from", description="Начало окна поиска"),
+    window_to: datetime = Query(..., alias="to", description="Конец окна поиска"),
+    duration: int = Query(..., ge=5, le=480, description="Длительность встречи, минут"),
+    limit: int = Query(5, ge=1, le=50, description="Сколько слотов вернуть"),
+    work_start: int = Query(9, ge=0, le=23, description="Начало рабочего дня, час"),
+    work_end: int = Query(18, ge=1, le=24, description="Конец рабочего дня, час"),
+    include_weekends: bool = Query(False, description="Искать и в выходные"),
+    current_user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_read_session),
+):
+    try:
+        user_ids = sorted({int(part) for part in users.split(",") if part.strip()})
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Параметр users — ID через запятую")
+    if not user_ids or len(user_ids) > AVAILABILITY_MAX_USERS:
+        raise HTTPException(
+            status_code=400, detail=f"Укажите от 1 до {AVAILABILITY_MAX_USERS} пользователей"
         )
-        for m in meetings
-    ]
+
+    start, end = to_naive_utc(window_from), to_naive_utc(window_to)
+    if start >= end or end - start > timedelta(days=AVAILABILITY_MAX_DAYS):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Окно поиска должно быть непустым и не длиннее {AVAILABILITY_MAX_DAYS} дней"
+        )
+    if work_start >= work_end:
+        raise HTTPException(status_code=400, detail="Рабочий день должен начинаться раньше, чем заканчивается")
+
+    # Рабочие часы и выходные — в поясе каждого пользователя: его нерабочее
+    # время становится занятостью, и окно ищется одним проходом целиком
+    zones = await get_user_zones(user_ids, db)
+    # Один запрос по индексу броней, дальше — сортировка и один проход в памяти
+    busy = await get_busy_intervals(user_ids, start, end, db)
+    busy += off_hours(
+        zones, start, end,
+        work_start=time(work_start),
+        work_end=time.max if work_end == 24 else time(work_end),
+        include_weekends=include_weekends,
+    )
+    slots = find_free_slots(
+        busy,
+        window_start=start,
+        window_end=end,
+        duration=timedelta(minutes=duration),
+        work_start=None,
+        work_end=None,
+        limit=limit,
+    )
+    return [MeetingSlot(start_time=s, end_time=e) for s, e in slots]
 
 
 @router.post(
     "/",
     response_model=MeetingRead,
     status_code=status.HTTP_201_CREATED,
-    description="Создание новой встречи. Только для менеджеров. Проверка на пересечения по времени у участников."
+    description=(
+        "Создание новой встречи. Только для менеджеров. Проверка на пересечения по времени у участников. "
+        "Серия повторяется в то же время UTC: при переходе на летнее время местное время вхождений сдвигается"
+    )
 )
 async def create_meeting(
     meeting_in: MeetingCreate,
@@ -64,45 +276,200 @@ async def create_meeting(
     participants = set(meeting_in.participants)
     participants.add(current_user.id)
 
-    await check_time_conflicts(
-        user_ids=list(participants),
-        start=meeting_in.start_time,
-        end=meeting_in.end_time,
-        db=db
-    )
-
-    result = await db.execute(select(User).where(User.id.in_(participants)))
-    users = result.scalars().all()
-    if len(users) != len(participants):
+    result = await db.execute(select(func.count(User.id)).where(User.id.in_(participants)))
+    if result.scalar_one() != len(participants):
         raise HTTPException(status_code=404, detail="Один или несколько участников не найдены")
 
-    # Подставляем объекты пользователей
-    meeting = Meeting(
+    rule = None
+    if meeting_in.recurrence is not None:
+        rule = build_recurrence(meeting_in.start_time, meeting_in.end_time, meeting_in.recurrence)
+        # Серии не бронируются в meeting_bookings — проверяем их здесь
+        await check_series_conflicts(list(participants), rule, db)
+    else:
+        # Брони разовых встреч проверит БД, остаются вхождения серий
+        await check_time_conflicts(
+            user_ids=list(participants),
+            start=meeting_in.start_time,
+            end=meeting_in.end_time,
+            db=db,
+            include_bookings=False,
+        )
+
+    try:
+        # Строка встречи и участники — без загрузки пользователей;
+        # пересечения разовых встреч отклоняет ограничение на meeting_bookings
+        result = await db.execute(
+            insert(Meeting)
+            .values(
+                title=meeting_in.title,
+                start_time=meeting_in.start_time,
+                end_time=meeting_in.end_time,
+                creator_id=current_user.id,
+                **recurrence_columns(rule),
+            )
+            .returning(Meeting.id)
+        )
+        meeting_id = result.scalar_one()
+        await db.execute(
+            meeting_participants_association.insert().values(
+                [{"meeting_id": meeting_id, "user_id": uid} for uid in participants]
+            )
+        )
+        await db.commit()
+    except IntegrityError as exc:
+        if not is_booking_conflict(exc):
+            raise
+        await _reject_busy(db, list(participants), meeting_in.start_time, meeting_in.end_time)
+
+    invalidate_meeting_calendar(participants, [None if rule else meeting_in.start_time])
+
+    return MeetingRead(
+        id=meeting_id,
         title=meeting_in.title,
         start_time=meeting_in.start_time,
         end_time=meeting_in.end_time,
         creator_id=current_user.id,
-        participants=users,
+        participants=sorted(participants),
+        recurrence=recurrence_read(rule),
     )
 
-    db.add(meeting)
-    await db.commit()
-    await db.refresh(meeting, attribute_names=["participants"])
 
-    return MeetingRead(
-        id=meeting.id,
-        title=meeting.title,
-        start_time=meeting.start_time,
-        end_time=meeting.end_time,
-        creator_id=meeting.creator_id,
-        participants=[user.id for user in meeting.participants],
+@router.post(
+    "/bulk",
+    response_model=MeetingBulkResult,
+    status_code=status.HTTP_201_CREATED,
+    description=(
+        "Пакетное создание разовых встреч. Только для менеджеров. Все встречи проверяются "
+        "на пересечения с существующими и друг с другом; при пересечениях не создаётся ни одна. "
+        "С dry_run=true — только отчёт по каждой встрече."
+    )
+)
+async def bulk_create_meetings(
+    bulk_in: MeetingBulkCreate,
+    response: Response,
+    dry_run: bool = Query(False, description="Только проверить, ничего не создавая"),
+    current_user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_async_session),
+):
+    if current_user.role != UserRole.MANAGER:
+        raise HTTPException(status_code=403, detail="Только менеджер может создавать встречи")
+
+    items = bulk_in.items
+    participants = [sorted({*item.participants, current_user.id}) for item in items]
+    intervals = [(to_naive_utc(item.start_time), to_naive_utc(item.end_time)) for item in items]
+    if any(end <= start for start, end in intervals):
+        raise HTTPException(status_code=400, detail="Встреча должна заканчиваться позже, чем начинается")
+
+    user_ids = set().union(*participants)
+    result = await db.execute(select(func.count(User.id)).where(User.id.in_(user_ids)))
+    if result.scalar_one() != len(user_ids):
+        raise HTTPException(status_code=404, detail="Один или несколько участников не найдены")
+
+    # Занятость всех участников на окно пакета: брони и вхождения серий
+    window_start = min(start for start, _ in intervals)
+    window_end = max(end for _, end in intervals)
+    busy = await get_busy_by_user(user_ids, window_start, window_end, db)
+
+    # Интервалы каждого участника — существующие и из пакета — сортируются
+    # и проходятся один раз; пары «существующая — существующая» не интересны
+    by_user = {
+        user_id: [(s, e, ("meeting", mid, s, e)) for s, e, mid in busy.get(user_id, ())]
+        for user_id in user_ids
+    }
+    for index, user_list in enumerate(participants):
+        for user_id in user_list:
+            by_user[user_id].append((*intervals[index], ("item", index)))
+
+    conflicts = [[] for _ in items]
+    for user_id, user_intervals in by_user.items():
+        for first, second in find_overlaps(user_intervals):
+            for own, other in ((first, second), (second, first)):
+                if own[0] != "item":
+                    continue
+                if other[0] == "item":
+                    start, end = intervals[other[1]]
+                    conflict = MeetingBulkConflict(user_id=user_id, start_time=start, end_time=end, item=other[1])
+                else:
+                    _, meeting_id, start, end = other
+                    conflict = MeetingBulkConflict(user_id=user_id, start_time=start, end_time=end, meeting_id=meeting_id)
+                conflicts[own[1]].append(conflict)
+
+    report = MeetingBulkResult(
+        dry_run=dry_run,
+        results=[
+            MeetingBulkItemResult(
+                status=MeetingBulkStatus.CONFLICT if found else MeetingBulkStatus.VALID,
+                conflicts=sorted(found, key=lambda c: (c.start_time, c.user_id)),
+            )
+            for found in conflicts
+        ],
+    )
+    if dry_run:
+        response.status_code = status.HTTP_200_OK
+        return report
+    if any(conflicts):
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Встречи пакета пересекаются по времени", **jsonable_encoder(report)},
+        )
+
+    try:
+        # Два многострочных INSERT в одной транзакции; брони заполнит триггер.
+        # RETURNING не обязан сохранять порядок VALUES: sort_by_parameter_order
+        # возвращает id в порядке items (на PostgreSQL одним INSERT на пакет,
+        # SQLite без сентинела вставляет по одной строке)
+        result = await db.execute(
+            insert(Meeting).returning(Meeting.id, sort_by_parameter_order=True),
+            [
+                {"title": item.title, "start_time": start, "end_time": end, "creator_id": current_user.id}
+                for item, (start, end) in zip(items, intervals)
+            ],
+        )
+        meeting_ids = result.scalars().all()
+        await db.execute(
+            meeting_participants_association.insert().values([
+                {"meeting_id": meeting_id, "user_id": user_id}
+                for meeting_id, user_list in zip(meeting_ids, participants)
+                for user_id in user_list
+            ])
+        )
+        await db.commit()
+    except IntegrityError as exc:
+        if not is_booking_conflict(exc):
+            raise
+        # Пересекающуюся встречу успели создать после проверки
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Участники уже заняты в это время")
+
+    for (start, _), user_list in zip(intervals, participants):
+        invalidate_meeting_calendar(user_list, [start])
+
+    return MeetingBulkResult(
+        dry_run=False,
+        results=[
+            MeetingBulkItemResult(
+                status=MeetingBulkStatus.CREATED,
+                meeting=MeetingRead(
+                    id=meeting_id,
+                    title=item.title,
+                    start_time=start,
+                    end_time=end,
+                    creator_id=current_user.id,
+                    participants=user_list,
+                ),
+            )
+            for meeting_id, item, (start, end), user_list in zip(meeting_ids, items, intervals, participants)
+        ],
     )
 
 
 @router.put(
     "/{meeting_id}",
     response_model=MeetingRead,
-    description="Обновление встречи. Только для менеджеров, если они являются создателями встречи."
+    description=(
+        "Обновление встречи. Только для менеджеров, если они являются создателями встречи. "
+        "Серия повторяется в то же время UTC"
+    )
 )
 async def update_meeting(
     meeting_id: int,
@@ -113,58 +480,110 @@ async def update_meeting(
     if current_user.role != UserRole.MANAGER:
         raise HTTPException(status_code=403, detail="Только менеджер может обновлять встречи")
 
-    meeting = await get_meeting_or_404(meeting_id, db)
+    # Только строка встречи и ID участников — без загрузки пользователей
+    meeting = await db.get(Meeting, meeting_id)
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Встреча не найдена")
 
     if meeting.creator_id != current_user.id:
         raise HTTPException(status_code=403, detail="Можно редактировать только свои встречи")
 
+    result = await db.execute(
+        select(meeting_participants_association.c.user_id)
+        .where(meeting_participants_association.c.meeting_id == meeting_id)
+    )
+    current_ids = set(result.scalars().all())
+    old_start = meeting.start_time
+
     data = meeting_in.model_dump(exclude_none=True)
 
+    new_title = data.get("title", meeting.title)
     new_start = data.get("start_time", meeting.start_time)
     new_end = data.get("end_time", meeting.end_time)
-    new_participant_ids = set(data.get("participants", [u.id for u in meeting.participants]))
+    new_participant_ids = set(data.get("participants", current_ids))
     new_participant_ids.add(meeting.creator_id)
 
-    await check_time_conflicts(
-        user_ids=list(new_participant_ids),
-        start=new_start,
-        end=new_end,
-        db=db,
-        exclude_meeting_id=meeting_id
-    )
-
-    await db.execute(
-        update(Meeting)
-        .where(Meeting.id == meeting_id)
-        .values(
-            title=data.get("title", meeting.title),
-            start_time=new_start,
-            end_time=new_end
+    # Меняем только разницу: один DELETE для ушедших, один INSERT для новых
+    removed_ids = current_ids - new_participant_ids
+    added_ids = new_participant_ids - current_ids
+
+    if added_ids:
+        result = await db.execute(select(func.count(User.id)).where(User.id.in_(added_ids)))
+        if result.scalar_one() != len(added_ids):
+            raise HTTPException(status_code=404, detail="Один или несколько участников не найдены")
+
+    # Конфликты проверяются для всех участников, если сдвинулось время,
+    # и только для новых — если нет
+    rule = meeting_recurrence(meeting)
+    new_rule: Optional[Recurrence] = None
+    values = {"title": new_title, "start_time": new_start, "end_time": new_end}
+    if rule is not None:
+        new_rule = build_recurrence(new_start, new_end, meeting_in.recurrence or recurrence_read(rule))
+        values.update(recurrence_columns(new_rule))
+        check_ids = new_participant_ids if new_rule != rule else added_ids
+        if check_ids:
+            await check_series_conflicts(list(check_ids), new_rule, db, exclude_meeting_id=meeting_id)
+    else:
+        if meeting_in.recurrence is not None:
+            raise HTTPException(status_code=400, detail="Разовую встречу нельзя превратить в серию")
+        moved = (to_naive_utc(new_start), to_naive_utc(new_end)) != (
+            to_naive_utc(meeting.start_time), to_naive_utc(meeting.end_time)
         )
-    )
+        check_ids = new_participant_ids if moved else added_ids
+        if check_ids:
+            # Брони проверит БД при записи, остаются вхождения серий
+            await check_time_conflicts(
+                user_ids=list(check_ids),
+                start=new_start,
+                end=new_end,
+                db=db,
+                exclude_meeting_id=meeting_id,
+                include_bookings=False,
+            )
 
-    await db.execute(
-        delete(meeting_participants_association)
-        .where(meeting_participants_association.c.meeting_id == meeting_id)
-    )
+    try:
+        # Сначала снимаем ушедших участников (их брони удалит триггер),
+        # чтобы новое время проверялось только для остающихся
+        if removed_ids:
+            await db.execute(
+                delete(meeting_participants_association)
+                .where(meeting_participants_association.c.meeting_id == meeting_id)
+                .where(meeting_participants_association.c.user_id.in_(removed_ids))
+            )
 
-    for uid in new_participant_ids:
         await db.execute(
-            meeting_participants_association.insert().values(
-                meeting_id=meeting_id,
-                user_id=uid
-            )
+            update(Meeting)
+            .where(Meeting.id == meeting_id)
+            .values(**values)
         )
 
-    await db.commit()
-    updated = await get_meeting_or_404(meeting_id, db)
+        if added_ids:
+            await db.execute(
+                meeting_participants_association.insert().values(
+                    [{"meeting_id": meeting_id, "user_id": uid} for uid in added_ids]
+                )
+            )
+
+        await db.commit()
+    except IntegrityError as exc:
+        if not is_booking_conflict(exc):
+            raise
+        await _reject_busy(db, list(new_participant_ids), new_start, new_end, meeting_id)
+
+    # И прежние, и новые участники; у серии — все периоды
+    invalidate_meeting_calendar(
+        current_ids | new_participant_ids,
+        [None] if rule is not None else [old_start, new_start],
+    )
+
     return MeetingRead(
-        id=updated.id,
-        title=updated.title,
-        start_time=updated.start_time,
-        end_time=updated.end_time,
-        creator_id=updated.creator_id,
-        participants=[user.id for user in updated.participants],
+        id=meeting_id,
+        title=new_title,
+        start_time=new_start,
+        end_time=new_end,
+        creator_id=meeting.creator_id,
+        participants=sorted(new_participant_ids),
+        recurrence=recurrence_read(new_rule),
     )
 
 
@@ -186,14 +605,20 @@ async def delete_meeting(
     if meeting.creator_id != current_user.id:
         raise HTTPException(status_code=403, detail="Можно удалять только свои встречи")
 
-    await db.execute(
+    result = await db.execute(
         delete(meeting_participants_association)
         .where(meeting_participants_association.c.meeting_id == meeting_id)
+        .returning(meeting_participants_association.c.user_id)
     )
+    participant_ids = result.scalars().all()
 
     await db.execute(
         delete(Meeting).where(Meeting.id == meeting_id)
     )
 
     await db.commit()
+    invalidate_meeting_calendar(
+        participant_ids,
+        [None if meeting.recurrence_freq is not None else meeting.start_time],
+    )
 
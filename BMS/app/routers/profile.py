@@ -1,16 +1,23 @@
-from datetime import date, datetime
+from datetime import date
 from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.task import Task
-from app.models.evaluation import Evaluation
 from app.models.team import Team
 from app.models.user import User
+from app.schemas.evaluation import EvaluationSeries
 from app.schemas.user import UserUpdate, UserRead
-from app.core.database import get_async_session
+from app.core.database import get_async_session, get_read_session
 from app.core.auth import current_user
+from app.utils.cache import calendar_cache, leaderboard_cache
+from app.utils.services import (
+    SeriesPeriod,
+    evaluation_series,
+    get_average_score,
+    get_evaluation_histograms,
+    series_period,
+)
 
 
 router = APIRouter(prefix="/me", tags=["Пользователи"])
@@ -75,6 +82,8 @@ async def join_team_by_code(
     session.add(user)
     await session.commit()
     await session.refresh(user)
+    calendar_cache.invalidate(user_ids=[user.id], team_ids=[team.id])
+    leaderboard_cache.invalidate(team_ids=[team.id])
 
     return {"message": f"Вы успешно присоединились к команде '{team.name}'."}
 
@@ -84,24 +93,29 @@ async def get_average_evaluation(
     date_from: date = Query(..., alias="from", description="Начало периода"),
     date_to: date = Query(..., alias="to", description="Конец периода"),
     user: User = Depends(current_user),
-    session: AsyncSession = Depends(get_async_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
-    """Получить среднюю оценку за указанный период."""
+    """
+    Получить среднюю оценку за указанный период.
+    Считается по дневной сводке evaluation_daily, а не по самим оценкам.
+    """
     if date_from > date_to:
         raise HTTPException(status_code=400, detail="Некорректный период: 'from' позже 'to'")
 
-    date_to_datetime = datetime.combine(date_to, datetime.max.time())
-
-    stmt = (
-        select(func.avg(Evaluation.score))
-        .join(Task, Evaluation.task_id == Task.id)
-        .where(
-            Task.assignee_id == user.id,
-            Evaluation.created_at >= datetime.combine(date_from, datetime.min.time()),
-            Evaluation.created_at <= date_to_datetime,
-        )
-    )
-    result = await session.execute(stmt)
-    average = result.scalar()
+    average = await get_average_score(session, user.id, date_from, date_to)
 
     return {"average_score": round(average, 2) if average is not None else None}
+
+
+@router.get("/evaluations/series", response_model=EvaluationSeries)
+async def get_evaluation_series(
+    period: SeriesPeriod = Depends(series_period),
+    user: User = Depends(current_user),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """
+    Оценки своих задач по неделям или месяцам периода: число, средний балл
+    и гистограмма 1–5 на каждый шаг. Считается одним запросом в БД.
+    """
+    histograms = await get_evaluation_histograms(session, period, user_id=user.id)
+    return evaluation_series(period, histograms)
@@ -1,120 +1,361 @@
-from typing import List
+from datetime import datetime, timezone
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import delete, select, update
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, delete, insert, literal, select, union, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-
-from app.utils.services import get_task_or_404
+from sqlalchemy.orm import sessionmaker
+
+from app.utils.cache import leaderboard_cache
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_after, parse_cursor_datetime
+from app.utils.services import (
+    assignee_team_id_returning,
+    can_comment_task,
+    can_delete_task,
+    can_update_task,
+    completed_at_after,
+    get_task_or_404,
+    get_task_owner_or_404,
+    get_task_owners,
+    invalidate_task_caches,
+    parse_task_include,
+    task_load_options,
+    task_to_read,
+    to_naive_utc,
+)
 from app.core.auth import current_active_user
-from app.core.database import get_async_session
+from app.core.database import get_async_session, get_read_session, get_stream_session_factory
 from app.models.comment import Comment
 from app.models.evaluation import Evaluation
 from app.models.task import Task, TaskStatus
 from app.models.user import User, UserRole
-from app.schemas.comment import CommentCreate, CommentRead
+from app.schemas.comment import CommentCreate, CommentFormat, CommentPage, CommentRead
 from app.schemas.evaluation import EvaluationCreate, EvaluationRead
-from app.schemas.task import TaskCreate, TaskRead, TaskUpdate
+from app.schemas.task import (
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkItemResult,
+    TaskBulkResult,
+    TaskBulkStatus,
+    TaskBulkUpdate,
+    TaskCreate,
+    TaskInclude,
+    TaskOrder,
+    TaskPage,
+    TaskRead,
+    TaskRole,
+    TaskSummary,
+    TaskUpdate,
+)
 
 router = APIRouter(prefix="/tasks", tags=["Задачи"])
 
 
+def _completed_at(task_status: TaskStatus) -> Optional[datetime]:
+    """completed_at новой задачи: сразу выполненная получает текущий момент (наивный UTC)."""
+    return to_naive_utc(datetime.now(timezone.utc)) if task_status == TaskStatus.DONE else None
+
+
 # -------------------------------------------------------------------
 # Эндпоинты по задачам
 # -------------------------------------------------------------------
 
-@router.get("/", response_model=List[TaskRead])
+@router.get("/", response_model=TaskPage)
 async def list_tasks(
+    limit: int = Query(50, ge=1, le=200, description="Размер страницы"),
+    after: Optional[str] = Query(None, description="Курсор next_cursor предыдущей страницы"),
+    order_by: TaskOrder = Query(TaskOrder.DEADLINE, description="Поле сортировки"),
+    task_status: Optional[TaskStatus] = Query(None, alias="status", description="Фильтр по статусу"),
+    deadline_from: Optional[datetime] = Query(None, description="Срок не раньше (включительно)"),
+    deadline_to: Optional[datetime] = Query(None, description="Срок раньше (не включительно)"),
+    role: Optional[TaskRole] = Query(None, description="Только созданные или только назначенные"),
+    include: FrozenSet[TaskInclude] = Depends(parse_task_include),
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """
-    Список задач, созданных или назначенных пользователю.
+    Список задач, созданных или назначенных пользователю, постранично.
+    Keyset-пагинация по (order_by, id): каждая страница читается
+    по составному индексу (assignee_id|creator_id, order_by, id).
+    Комментарии и оценки — только по include.
     """
     if not current_user.team_id:
-        return []
+        return TaskPage(items=[], next_cursor=None)
+
+    sort_column = Task.deadline if order_by == TaskOrder.DEADLINE else Task.created_at
+    filters = []
+    if task_status:
+        filters.append(Task.status == task_status)
+    # сроки хранятся в наивном UTC: границы со смещением приводятся к нему
+    if deadline_from:
+        filters.append(Task.deadline >= to_naive_utc(deadline_from))
+    if deadline_to:
+        filters.append(Task.deadline < to_naive_utc(deadline_to))
+    if after:
+        key, value, last_id = decode_cursor(after, 3)
+        if key != order_by.value or not isinstance(last_id, int):
+            raise HTTPException(400, detail="Некорректный курсор пагинации")
+        if value is not None:
+            value = parse_cursor_datetime(value)
+        filters.append(keyset_after(
+            sort_column, Task.id, value, last_id,
+            nullable=order_by == TaskOrder.DEADLINE,
+        ))
+
+    def page_ids(owner_column):
+        # Первые limit + 1 задач одной роли — диапазон одного индекса
+        return (
+            select(Task.id)
+            .where(owner_column == current_user.id, *filters)
+            .order_by(sort_column.asc().nulls_last(), Task.id)
+            .limit(limit + 1)
+        )
+
+    if role == TaskRole.CREATOR:
+        ids = page_ids(Task.creator_id)
+    elif role == TaskRole.ASSIGNEE:
+        ids = page_ids(Task.assignee_id)
+    else:
+        # OR по двум колонкам не ложится на индекс — объединяем две ветки
+        created = page_ids(Task.creator_id).subquery()
+        assigned = page_ids(Task.assignee_id).subquery()
+        ids = union(select(created.c.id), select(assigned.c.id))
 
     stmt = (
         select(Task)
-        .where(
-            (Task.assignee_id == current_user.id) |
-            (Task.creator_id == current_user.id)
-        )
-        .options(
-            selectinload(Task.comments),
-            selectinload(Task.evaluations)
-        )
+        .where(Task.id.in_(ids))
+        .order_by(sort_column.asc().nulls_last(), Task.id)
+        .limit(limit + 1)
+        .options(*task_load_options(include))
     )
     result = await db.execute(stmt)
-    return result.scalars().all()
+    tasks = result.scalars().all()
+
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        last = tasks[-1]
+        next_cursor = encode_cursor(order_by.value, getattr(last, sort_column.key), last.id)
+    return TaskPage(items=[task_to_read(t, include) for t in tasks], next_cursor=next_cursor)
 
 
 @router.post("/", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_in: TaskCreate,
+    include: FrozenSet[TaskInclude] = Depends(parse_task_include),
     current_user: User = Depends(current_active_user),
     db: AsyncSession = Depends(get_async_session),
 ):
     """
     Создание задачи (только для менеджера/админа в команде).
+    Ответ собирается из INSERT ... RETURNING, без повторного SELECT.
     """
-    task = Task(
-        title=task_in.title,
-        description=task_in.description,
-        deadline=task_in.deadline,
-        creator_id=current_user.id,
-        assignee_id=task_in.assignee_id,
-        status=task_in.status,
+    result = await db.execute(
+        insert(Task)
+        .values(**task_in.model_dump(), creator_id=current_user.id, completed_at=_completed_at(task_in.status))
+        .returning(Task, assignee_team_id_returning())
     )
-    db.add(task)
+    task, assignee_team_id = result.one()
     await db.commit()
+    invalidate_task_caches([(current_user.team_id, assignee_team_id, task.deadline)])
+
+    if include:
+        # Коллекции подгружаются только по запросу
+        await db.refresh(task, attribute_names=[item.value for item in include])
+    return task_to_read(task, include)
+
 
+# -------------------------------------------------------------------
+# Пакетные операции с задачами
+# (объявлены до /{task_id}, иначе путь /bulk совпадёт с ним)
+# -------------------------------------------------------------------
+
+@router.post("/bulk", response_model=TaskBulkResult, status_code=status.HTTP_201_CREATED)
+async def bulk_create_tasks(
+    bulk_in: TaskBulkCreate,
+    current_user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """
+    Создание пакета задач одним многострочным INSERT ... RETURNING
+    (на PostgreSQL; SQLite вставляет строки по одной, см. ниже).
+    """
+    rows = [
+        {
+            **item.model_dump(),
+            "deadline": to_naive_utc(item.deadline) if item.deadline else None,
+            "creator_id": current_user.id,
+            "completed_at": _completed_at(item.status),
+        }
+        for item in bulk_in.items
+    ]
+    # RETURNING не обязан сохранять порядок VALUES: sort_by_parameter_order
+    # возвращает строки в порядке items. На PostgreSQL это по-прежнему один
+    # INSERT на пакет, SQLite без сентинела вставляет по одной строке
     result = await db.execute(
-        select(Task)
-        .options(
-            selectinload(Task.comments),
-            selectinload(Task.evaluations),
-        )
-        .where(Task.id == task.id)
+        insert(Task).returning(Task, assignee_team_id_returning(), sort_by_parameter_order=True),
+        rows,
     )
-    task = result.scalar_one()
-    return task
+    created: List[Tuple[Task, Optional[int]]] = [tuple(row) for row in result.all()]
+    await db.commit()
+    invalidate_task_caches([(current_user.team_id, team_id, task.deadline) for task, team_id in created])
 
+    return TaskBulkResult(results=[
+        TaskBulkItemResult(id=task.id, status=TaskBulkStatus.CREATED, task=TaskSummary.model_validate(task))
+        for task, _ in created
+    ])
+
+
+@router.patch("/bulk", response_model=TaskBulkResult)
+async def bulk_update_tasks(
+    bulk_in: TaskBulkUpdate,
+    current_user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """
+    Изменение пакета задач с теми же правами, что и у PUT /tasks/{task_id}.
+    Все разрешённые изменения — один UPDATE ... SET col = CASE id ... RETURNING.
+    """
+    owners = await get_task_owners([item.id for item in bulk_in.items], db)
+
+    allowed: Dict[int, dict] = {}
+    for item in bulk_in.items:
+        owner = owners.get(item.id)
+        if owner and can_update_task(current_user, owner.creator_id, owner.team_id):
+            allowed.setdefault(item.id, {}).update(item.model_dump(exclude_none=True, exclude={"id"}))
+
+    updated: Dict[int, Tuple[Task, Optional[int]]] = {}
+    if allowed:
+        columns = {name for data in allowed.values() for name in data}
+        values = {}
+        for name in columns:
+            column = getattr(Task, name)
+            whens = {task_id: literal(data[name], column.type)
+                     for task_id, data in allowed.items() if name in data}
+            values[name] = case(whens, value=Task.id, else_=column)
+        if "status" in values:
+            values["completed_at"] = completed_at_after(values["status"])
+
+        if values:
+            stmt = (
+                update(Task)
+                .where(Task.id.in_(allowed))
+                .values(**values)
+                .returning(Task, assignee_team_id_returning())
+                .execution_options(synchronize_session=False, populate_existing=True)
+            )
+        else:
+            # В пакете нет ни одного изменяемого поля — только вернуть задачи
+            stmt = select(Task, assignee_team_id_returning()).where(Task.id.in_(allowed))
+        result = await db.execute(stmt)
+        updated = {task.id: (task, assignee_team_id) for task, assignee_team_id in result.all()}
+    await db.commit()
+    # Дни до и после изменения: задача могла сменить дедлайн или исполнителя
+    invalidate_task_caches([
+        row
+        for task_id, (task, assignee_team_id) in updated.items()
+        for row in (owners[task_id].calendar_row, (owners[task_id].team_id, assignee_team_id, task.deadline))
+    ])
+
+    results = []
+    for item in bulk_in.items:
+        if item.id in updated:
+            results.append(TaskBulkItemResult(
+                id=item.id, status=TaskBulkStatus.UPDATED, task=TaskSummary.model_validate(updated[item.id][0])
+            ))
+        elif item.id in owners and item.id not in allowed:
+            results.append(TaskBulkItemResult(
+                id=item.id, status=TaskBulkStatus.FORBIDDEN, detail="Нет прав на изменение задачи"
+            ))
+        else:
+            results.append(TaskBulkItemResult(
+                id=item.id, status=TaskBulkStatus.NOT_FOUND, detail="Задача не найдена"
+            ))
+    return TaskBulkResult(results=results)
+
+
+@router.delete("/bulk", response_model=TaskBulkResult)
+async def bulk_delete_tasks(
+    bulk_in: TaskBulkDelete,
+    current_user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_async_session),
+):
+    """
+    Удаление пакета задач с теми же правами, что и у DELETE /tasks/{task_id}.
+    """
+    owners = await get_task_owners(bulk_in.ids, db)
+    allowed = {
+        task_id for task_id in bulk_in.ids
+        if task_id in owners and can_delete_task(current_user, owners[task_id].creator_id)
+    }
+
+    deleted = set()
+    if allowed:
+        result = await db.scalars(delete(Task).where(Task.id.in_(allowed)).returning(Task.id))
+        deleted = set(result.all())
+    await db.commit()
+    invalidate_task_caches([owners[task_id].calendar_row for task_id in deleted])
+
+    results = []
+    for task_id in bulk_in.ids:
+        if task_id in deleted:
+            results.append(TaskBulkItemResult(id=task_id, status=TaskBulkStatus.DELETED))
+        elif task_id in owners and task_id not in allowed:
+            results.append(TaskBulkItemResult(
+                id=task_id, status=TaskBulkStatus.FORBIDDEN, detail="Нет прав на удаление задачи"
+            ))
+        else:
+            results.append(TaskBulkItemResult(
+                id=task_id, status=TaskBulkStatus.NOT_FOUND, detail="Задача не найдена"
+            ))
+    return TaskBulkResult(results=results)
+
+
+# -------------------------------------------------------------------
+# Эндпоинты по отдельной задаче
+# -------------------------------------------------------------------
 
 @router.put("/{task_id}", response_model=TaskRead)
 async def update_task(
     task_id: int,
     task_in: TaskUpdate,
+    include: FrozenSet[TaskInclude] = Depends(parse_task_include),
     current_user: User = Depends(current_active_user),
     db: AsyncSession = Depends(get_async_session),
 ):
     """
     Обновление задачи (создатель, менеджер или админ команды).
+    Для проверки прав читаются только creator_id и команда автора,
+    ответ собирается из UPDATE ... RETURNING.
     """
-    task = await get_task_or_404(task_id, db)
-
-    same_team = task.creator.team_id == current_user.team_id
-    is_author = task.creator_id == current_user.id
-    is_admin = current_user.role == UserRole.ADMIN
-    is_manager = current_user.role == UserRole.MANAGER
+    owner = await get_task_owner_or_404(task_id, db)
 
-    if not (is_admin or (is_manager and same_team) or is_author):
+    if not can_update_task(current_user, owner.creator_id, owner.team_id):
         raise HTTPException(403, detail="Нет прав на изменение задачи")
 
     data = task_in.model_dump(exclude_none=True)
-    await db.execute(update(Task).where(Task.id == task_id).values(**data))
+    if data:
+        values = dict(data)
+        if "status" in data:
+            values["completed_at"] = completed_at_after(data["status"])
+        stmt = (
+            update(Task)
+            .where(Task.id == task_id)
+            .values(**values)
+            .returning(Task, assignee_team_id_returning())
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+    else:
+        stmt = select(Task, assignee_team_id_returning()).where(Task.id == task_id)
+    task, assignee_team_id = (await db.execute(stmt)).one()
     await db.commit()
+    if data:
+        invalidate_task_caches([owner.calendar_row, (owner.team_id, assignee_team_id, task.deadline)])
 
-    result = await db.execute(
-        select(Task)
-        .options(
-            selectinload(Task.comments),
-            selectinload(Task.evaluations),
-        )
-        .where(Task.id == task_id)
-    )
-    task = result.scalar_one()
-    return task
+    if include:
+        await db.refresh(task, attribute_names=[item.value for item in include])
+    return task_to_read(task, include)
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -126,13 +367,14 @@ async def delete_task(
     """
     Удаление задачи (только автор или админ).
     """
-    task = await get_task_or_404(task_id, db)
+    owner = await get_task_owner_or_404(task_id, db)
 
-    if current_user.role != UserRole.ADMIN and task.creator_id != current_user.id:
+    if not can_delete_task(current_user, owner.creator_id):
         raise HTTPException(403, detail="Нет прав на удаление задачи")
 
     await db.execute(delete(Task).where(Task.id == task_id))
     await db.commit()
+    invalidate_task_caches([owner.calendar_row])
 
 
 # -------------------------------------------------------------------
@@ -151,11 +393,10 @@ async def add_comment(
     """
     task = await get_task_or_404(task_id, db)
 
-    if current_user.role != UserRole.ADMIN and current_user.team_id not in {
-        task.creator.team_id, task.assignee.team_id
-    }:
+    if not can_comment_task(current_user, task):
         raise HTTPException(403, detail="Нет доступа к комментированию задачи")
 
+    # comment_count задачи увеличивает триггер на comments в этой же транзакции
     comment = Comment(text=comment_in.text, author_id=current_user.id, task_id=task_id)
     db.add(comment)
     await db.commit()
@@ -163,19 +404,81 @@ async def add_comment(
     return comment
 
 
-@router.get("/{task_id}/comments", response_model=List[CommentRead])
+# Пачка серверного курсора при выгрузке комментариев потоком
+COMMENTS_STREAM_BATCH_SIZE = 500
+
+
+def _comments_after(task_id: int, cursor):
+    """Комментарии задачи по (created_at, id), начиная после курсора."""
+    stmt = (
+        select(Comment)
+        .where(Comment.task_id == task_id)
+        .order_by(Comment.created_at, Comment.id)
+    )
+    if cursor:
+        stmt = stmt.where(keyset_after(Comment.created_at, Comment.id, *cursor))
+    return stmt
+
+
+async def _comments_ndjson(session_factory: sessionmaker, task_id: int, cursor):
+    """
+    Тело выгрузки: по строке JSON на комментарий. Строки читаются серверным
+    курсором пачками, так что весь список в памяти не держится.
+    """
+    async with session_factory() as db:
+        comments = await db.stream_scalars(
+            _comments_after(task_id, cursor).execution_options(yield_per=COMMENTS_STREAM_BATCH_SIZE)
+        )
+        async for comment in comments:
+            yield CommentRead.model_validate(comment).model_dump_json() + "\n"
+
+
+@router.get(
+    "/{task_id}/comments",
+    response_model=CommentPage,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
 async def list_comments(
     task_id: int,
+    limit: int = Query(50, ge=1, le=200, description="Размер страницы"),
+    after: Optional[str] = Query(None, description="Курсор next_cursor предыдущей страницы"),
+    fmt: CommentFormat = Query(
+        CommentFormat.JSON, alias="format", description="json — страница, ndjson — все комментарии потоком"
+    ),
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
+    session_factory: sessionmaker = Depends(get_stream_session_factory),
 ):
     """
-    Получить список комментариев по задаче.
+    Комментарии задачи по времени создания (доступ — как у добавления).
+    Keyset-пагинация по (created_at, id) по индексу (task_id, created_at, id);
+    format=ndjson выгружает все комментарии после курсора потоком, limit не действует.
     """
-    # вместо task.comments делаем явный запрос
-    stmt = select(Comment).where(Comment.task_id == task_id)
-    result = await db.execute(stmt)
-    return result.scalars().all()
+    task = await get_task_or_404(task_id, db)
+    if not can_comment_task(current_user, task):
+        raise HTTPException(403, detail="Нет доступа к комментированию задачи")
+
+    cursor = None
+    if after:
+        value, last_id = decode_cursor(after, 2)
+        if not isinstance(last_id, int):
+            raise HTTPException(400, detail="Некорректный курсор пагинации")
+        cursor = (parse_cursor_datetime(value), last_id)
+
+    if fmt == CommentFormat.NDJSON:
+        return StreamingResponse(
+            _comments_ndjson(session_factory, task_id, cursor),
+            media_type="application/x-ndjson",
+        )
+
+    result = await db.execute(_comments_after(task_id, cursor).limit(limit + 1))
+    comments = result.scalars().all()
+
+    next_cursor = None
+    if len(comments) > limit:
+        comments = comments[:limit]
+        next_cursor = encode_cursor(comments[-1].created_at, comments[-1].id)
+    return CommentPage(items=comments, next_cursor=next_cursor)
 
 
 # -------------------------------------------------------------------
@@ -200,10 +503,8 @@ async def add_evaluation(
     if current_user.role not in {UserRole.ADMIN, UserRole.MANAGER}:
         raise HTTPException(403, detail="Нет прав на выставление оценки")
 
-    exists = await db.execute(
-        select(Evaluation).where(Evaluation.task_id == task_id)
-    )
-    if exists.scalars().first():
+    # has_evaluation ведёт триггер на evaluations, отдельный запрос не нужен
+    if task.has_evaluation:
         raise HTTPException(400, detail="Оценка уже существует")
 
     evaluation = Evaluation(
@@ -214,6 +515,10 @@ async def add_evaluation(
     db.add(evaluation)
     await db.commit()
     await db.refresh(evaluation)
+    if task.assignee.team_id:
+        leaderboard_cache.invalidate(
+            team_ids=[task.assignee.team_id], days=[to_naive_utc(evaluation.created_at).date()]
+        )
     return evaluation
 
 
@@ -221,7 +526,7 @@ async def add_evaluation(
 async def list_evaluations(
     task_id: int,
     current_user: User = Depends(current_active_user),
-    db: AsyncSession = Depends(get_async_session),
+    db: AsyncSession = Depends(get_read_session),
 ):
     """
     Получить оценки по задаче.
@@ -1,13 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import update
 
-from app.utils.services import assert_team_admin_or_global_admin, get_team_or_404, get_user_or_404
+from app.utils.cache import LeaderboardKey, calendar_cache, leaderboard_cache
+from app.utils.services import (
+    SeriesPeriod,
+    assert_can_view_team_reports,
+    assert_team_admin_or_global_admin,
+    evaluation_series,
+    get_evaluation_histograms,
+    get_team_leaderboard,
+    get_team_or_404,
+    get_user_or_404,
+    series_period,
+)
 from app.core.auth import current_active_user
-from app.core.database import get_async_session
+from app.core.database import get_async_session, get_read_session, session_pinned_to_primary
 from app.models.team import Team
 from app.models.user import User, UserRole
-from app.schemas.team import TeamCreate, TeamRead, TeamMemberAdd, TeamMemberRoleUpdate
+from app.schemas.evaluation import EvaluationSeries
+from app.schemas.team import (
+    LeaderboardEntry,
+    TeamCreate,
+    TeamLeaderboard,
+    TeamMemberAdd,
+    TeamMemberRoleUpdate,
+    TeamRead,
+)
 from app.utils.codegen import generate_unique_invite_code
 
 
@@ -87,8 +108,12 @@ async def add_member(
     assert_team_admin_or_global_admin(current_user, team)
 
     user = await get_user_or_404(member_in.user_id, db)
+    previous_team_id = user.team_id
     team.members.append(user)
     await db.commit()
+    # Состав команды определяет, чьи задачи видны в её календаре
+    calendar_cache.invalidate(user_ids=[user.id], team_ids={team_id, previous_team_id} - {None})
+    leaderboard_cache.invalidate(team_ids={team_id, previous_team_id} - {None})
 
 
 @router.delete(
@@ -110,6 +135,8 @@ async def remove_member(
     if user in team.members:
         team.members.remove(user)
         await db.commit()
+        calendar_cache.invalidate(user_ids=[user.id], team_ids=[team_id])
+        leaderboard_cache.invalidate(team_ids=[team_id])
 
 
 @router.patch(
@@ -139,3 +166,81 @@ async def update_member_role(
         update(User).where(User.id == user_id).values(role=role_in.role)
     )
     await db.commit()
+
+
+@router.get(
+    "/{team_id}/leaderboard",
+    response_model=TeamLeaderboard,
+    description=(
+        "Рейтинг участников команды за период from..to (включительно, дни UTC): место, перцентиль, "
+        "средний балл и число оценок, выполненные задачи и доля выполненных в срок. "
+        "Доступно админу команды и глобальному админу"
+    )
+)
+async def team_leaderboard(
+    team_id: int,
+    response: Response,
+    date_from: date = Query(..., alias="from", description="Начало периода"),
+    date_to: date = Query(..., alias="to", description="Конец периода (включительно)"),
+    current_user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_read_session),
+):
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="Некорректный период: 'from' позже 'to'")
+
+    team = await get_team_or_404(team_id, db, with_members=False)
+    assert_can_view_team_reports(current_user, team)
+
+    key = LeaderboardKey(team_id, date_from, date_to)
+    # Как и календарь: кэш заполняют и чтения с реплики, а клиент
+    # в окне read-your-writes читает мимо кэша
+    cached = None if session_pinned_to_primary(db) else leaderboard_cache.get(key)
+    response.headers["X-Leaderboard-Cache"] = "MISS" if cached is None else "HIT"
+    if cached is not None:
+        return cached
+    generation = leaderboard_cache.generation()
+
+    rows = await get_team_leaderboard(db, team_id, date_from, date_to)
+    leaderboard = TeamLeaderboard(
+        team_id=team_id,
+        date_from=date_from,
+        date_to=date_to,
+        members=[
+            LeaderboardEntry(
+                user_id=row.user_id,
+                email=row.email,
+                rank=row.rank,
+                percentile=round(row.percentile, 1),
+                average_score=round(row.average_score, 2) if row.average_score is not None else None,
+                evaluations=row.evaluations,
+                tasks_done=row.tasks_done,
+                tasks_on_time=row.tasks_on_time,
+                on_time_rate=round(row.on_time_rate, 4) if row.on_time_rate is not None else None,
+            )
+            for row in rows
+        ],
+    )
+    leaderboard_cache.set(key, leaderboard, generation)
+    return leaderboard
+
+
+@router.get(
+    "/{team_id}/evaluations/series",
+    response_model=EvaluationSeries,
+    description=(
+        "Оценки задач участников команды по неделям или месяцам периода from..to (дни UTC): "
+        "число, средний балл и гистограмма 1–5 на каждый шаг. "
+        "Доступно админу команды и глобальному админу"
+    )
+)
+async def team_evaluation_series(
+    team_id: int,
+    period: SeriesPeriod = Depends(series_period),
+    current_user: User = Depends(current_active_user),
+    db: AsyncSession = Depends(get_read_session),
+):
+    team = await get_team_or_404(team_id, db, with_members=False)
+    assert_can_view_team_reports(current_user, team)
+
+    histograms = await get_evaluation_histograms(db, period, team_id=team_id)
+    return evaluation_series(period, histograms)
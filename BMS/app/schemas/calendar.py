@@ -0,0 +1,71 @@
+import enum
+from datetime import date, datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+# -------------------------------------------------------------------
+# Pydantic-схемы календаря команды
+# -------------------------------------------------------------------
+
+class CalendarFormat(str, enum.Enum):
+    """Формат ответа календаря."""
+    TEXT = "text"
+    JSON = "json"
+
+
+class CalendarEventKind(str, enum.Enum):
+    TASK = "task"
+    MEETING = "meeting"
+
+
+class CalendarEvent(BaseModel):
+    """
+    Событие дня: задача (по дедлайну) или встреча.
+    """
+    kind: CalendarEventKind = Field(..., description="Тип события: task или meeting")
+    id: int = Field(..., description="ID задачи или встречи")
+    title: str = Field(..., description="Заголовок")
+    start_time: Optional[datetime] = Field(None, description="Дедлайн задачи или начало встречи (UTC)")
+    end_time: Optional[datetime] = Field(None, description="Окончание встречи (UTC)")
+
+
+class TeamMemberDay(BaseModel):
+    """
+    События одного участника за день.
+    """
+    user_id: int
+    email: str
+    events: List[CalendarEvent] = Field(default_factory=list, description="События по времени")
+
+
+class TeamDailyCalendar(BaseModel):
+    """
+    Дневной вид команды: строка сетки на каждого участника.
+    """
+    team_id: int
+    date: date
+    timezone: str = Field(..., description="Часовой пояс, в котором считались границы дня")
+    members: List[TeamMemberDay]
+
+
+class TeamMemberMonth(BaseModel):
+    """
+    Количество событий участника по дням месяца.
+    """
+    user_id: int
+    email: str
+    tasks: List[int] = Field(..., description="Задач в день, в порядке days")
+    meetings: List[int] = Field(..., description="Встреч в день, в порядке days")
+
+
+class TeamMonthlyCalendar(BaseModel):
+    """
+    Месячный вид команды: сетка участник × день.
+    """
+    team_id: int
+    year: int
+    month: int
+    days: List[date] = Field(..., description="Дни месяца — столбцы сетки")
+    timezone: str = Field(..., description="Часовой пояс, в котором считались границы дней")
+    members: List[TeamMemberMonth]
@@ -1,4 +1,7 @@
+import enum
 from datetime import datetime
+from typing import List, Optional
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -40,3 +43,20 @@ class CommentCreate(BaseModel):
         ...,
         description="Текст комментария"
     )
+
+
+class CommentFormat(str, enum.Enum):
+    """Формат списка комментариев."""
+    JSON = "json"
+    NDJSON = "ndjson"
+
+
+class CommentPage(BaseModel):
+    """
+    Страница комментариев задачи.
+    """
+    items: List[CommentRead]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Курсор следующей страницы (параметр after); null — страниц больше нет"
+    )
@@ -1,4 +1,7 @@
-from datetime import datetime
+import enum
+from datetime import date, datetime
+from typing import List, Optional
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -42,3 +45,37 @@ class EvaluationCreate(BaseModel):
         le=5,
         description="Оценка за задачу от 1 до 5"
     )
+
+
+# -------------------------------------------------------------------
+# Ряды оценок по периодам
+# -------------------------------------------------------------------
+
+class SeriesBucket(str, enum.Enum):
+    """Шаг ряда: неделя (с понедельника) или календарный месяц."""
+    WEEK = "week"
+    MONTH = "month"
+
+
+class EvaluationSeriesPoint(BaseModel):
+    """
+    Оценки за один шаг ряда.
+    """
+    start: date = Field(..., description="Начало шага: понедельник недели или первое число месяца")
+    count: int = Field(..., description="Число оценок")
+    average_score: Optional[float] = Field(None, description="Средний балл; null — оценок нет")
+    histogram: List[int] = Field(..., description="Число оценок 1, 2, 3, 4 и 5")
+
+
+class EvaluationSeries(BaseModel):
+    """
+    Ряд оценок за период from..to (дни UTC) с итогом за весь период.
+    Первый и последний шаги могут быть неполными: оценки вне периода не считаются.
+    """
+    date_from: date
+    date_to: date
+    bucket: SeriesBucket
+    count: int = Field(..., description="Число оценок за период")
+    average_score: Optional[float] = Field(None, description="Средний балл за период")
+    histogram: List[int] = Field(..., description="Число оценок 1, 2, 3, 4 и 5 за период")
+    points: List[EvaluationSeriesPoint]
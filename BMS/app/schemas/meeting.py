@@ -1,12 +1,53 @@
+import enum
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
+from app.models.meeting import RecurrenceFreq
+
 
 # -------------------------------------------------------------------
 # Pydantic-схемы для работы с встречами
 # -------------------------------------------------------------------
 
+# Верхняя граница числа вхождений серии с count
+RECURRENCE_MAX_COUNT = 1000
+
+
+class MeetingRecurrence(BaseModel):
+    """
+    Правило повторения встречи. Без count и until серия бессрочная.
+    Вхождения повторяются в то же время UTC: при переходе на летнее
+    время местное время встречи сдвигается.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    freq: RecurrenceFreq = Field(
+        ...,
+        description="Частота: daily, weekly или monthly"
+    )
+    interval: int = Field(
+        1,
+        ge=1,
+        le=365,
+        description="Шаг повторения: каждые N дней, недель или месяцев"
+    )
+    count: Optional[int] = Field(
+        None,
+        ge=1,
+        le=RECURRENCE_MAX_COUNT,
+        description="Число вхождений серии"
+    )
+    until: Optional[datetime] = Field(
+        None,
+        description="Вхождения начинаются не позже этого момента"
+    )
+    exceptions: List[datetime] = Field(
+        default_factory=list,
+        description="Время начала отменённых вхождений"
+    )
+
+
 class MeetingBase(BaseModel):
     """
     Общие поля для создания и обновления встречи.
@@ -36,8 +77,12 @@ class MeetingBase(BaseModel):
 class MeetingCreate(MeetingBase):
     """
     Модель для создания новой встречи.
+    С recurrence start_time/end_time задают первое вхождение серии.
     """
-    ...
+    recurrence: Optional[MeetingRecurrence] = Field(
+        None,
+        description="Правило повторения; без него — разовая встреча"
+    )
 
 
 class MeetingUpdate(BaseModel):
@@ -64,6 +109,10 @@ class MeetingUpdate(BaseModel):
         None,
         description="Обновлённый список ID участников"
     )
+    recurrence: Optional[MeetingRecurrence] = Field(
+        None,
+        description="Новое правило повторения (только для серий)"
+    )
 
 
 class MeetingRead(BaseModel):
@@ -84,3 +133,121 @@ class MeetingRead(BaseModel):
         ...,
         description="Список ID участников встречи"
     )
+    recurrence: Optional[MeetingRecurrence] = Field(
+        None,
+        description="Правило серии; для вхождения серии start_time/end_time — время вхождения"
+    )
+
+
+class MeetingPage(BaseModel):
+    """
+    Страница списка встреч.
+    """
+    items: List[MeetingRead]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Курсор следующей страницы (параметр after); null — страниц больше нет"
+    )
+
+
+class MeetingSlot(BaseModel):
+    """
+    Свободный общий слот для встречи.
+    """
+    start_time: datetime = Field(
+        ...,
+        description="Начало слота (UTC)"
+    )
+    end_time: datetime = Field(
+        ...,
+        description="Окончание слота (UTC)"
+    )
+
+
+# -------------------------------------------------------------------
+# Пакетное создание встреч
+# -------------------------------------------------------------------
+
+# Наибольшее число встреч в одном пакетном запросе
+MEETING_BULK_MAX_ITEMS = 100
+
+
+class MeetingBulkItem(MeetingBase):
+    """
+    Разовая встреча в пакете (серии создаются по одной).
+    """
+    model_config = ConfigDict(from_attributes=True, extra="forbid")
+
+
+class MeetingBulkCreate(BaseModel):
+    """
+    Пакет встреч: создаются все сразу или ни одна.
+    """
+    items: List[MeetingBulkItem] = Field(
+        ...,
+        min_length=1,
+        max_length=MEETING_BULK_MAX_ITEMS,
+        description="Новые встречи"
+    )
+
+
+class MeetingBulkStatus(str, enum.Enum):
+    """Итог проверки одной встречи пакета."""
+    CREATED = "created"
+    VALID = "valid"
+    CONFLICT = "conflict"
+
+
+class MeetingBulkConflict(BaseModel):
+    """
+    Пересечение встречи пакета у одного участника.
+    """
+    user_id: int = Field(
+        ...,
+        description="ID занятого участника"
+    )
+    start_time: datetime = Field(
+        ...,
+        description="Начало пересекающейся встречи"
+    )
+    end_time: datetime = Field(
+        ...,
+        description="Окончание пересекающейся встречи"
+    )
+    meeting_id: Optional[int] = Field(
+        None,
+        description="ID существующей встречи (или серии)"
+    )
+    item: Optional[int] = Field(
+        None,
+        description="Номер пересекающейся встречи в этом же пакете (с нуля)"
+    )
+
+
+class MeetingBulkItemResult(BaseModel):
+    """
+    Результат по одной встрече пакета (в порядке элементов запроса).
+    """
+    status: MeetingBulkStatus = Field(
+        ...,
+        description="Итог проверки"
+    )
+    conflicts: List[MeetingBulkConflict] = Field(
+        default_factory=list,
+        description="Найденные пересечения"
+    )
+    meeting: Optional[MeetingRead] = Field(
+        None,
+        description="Созданная встреча"
+    )
+
+
+class MeetingBulkResult(BaseModel):
+    """
+    Ответ пакетного создания или пробного прогона.
+    """
+    dry_run: bool = Field(
+        ...,
+        description="Пробный прогон: ничего не записано"
+    )
+    results: List[MeetingBulkItemResult]
@@ -1,3 +1,4 @@
+import enum
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, ConfigDict, Field
@@ -76,9 +77,16 @@ class TaskUpdate(BaseModel):
     )
 
 
-class TaskRead(BaseModel):
+class TaskInclude(str, enum.Enum):
+    """Связанные коллекции, которые можно запросить параметром include."""
+    COMMENTS = "comments"
+    EVALUATIONS = "evaluations"
+
+
+class TaskSummary(BaseModel):
     """
-    Модель для ответа с полной информацией о задаче.
+    Лёгкая модель ответа: только поля самой задачи, без связанных коллекций.
+    Число комментариев и оценка хранятся в строке задачи.
     """
     model_config = ConfigDict(from_attributes=True)
 
@@ -90,5 +98,141 @@ class TaskRead(BaseModel):
     assignee_id: int
     created_at: datetime
     deadline: Optional[datetime]
-    comments: List[CommentRead]
-    evaluations: List[EvaluationRead]
+    completed_at: Optional[datetime] = None
+    comment_count: int = Field(0, description="Число комментариев")
+    has_evaluation: bool = Field(False, description="Выставлена ли оценка")
+    score: Optional[int] = Field(None, description="Балл оценки; null — оценки нет")
+
+
+class TaskRead(TaskSummary):
+    """
+    Модель ответа с задачей; комментарии и оценки —
+    только если они перечислены в параметре include.
+    """
+    comments: Optional[List[CommentRead]] = Field(
+        None,
+        description="Комментарии задачи (при include=comments)"
+    )
+    evaluations: Optional[List[EvaluationRead]] = Field(
+        None,
+        description="Оценки задачи (при include=evaluations)"
+    )
+
+
+# -------------------------------------------------------------------
+# Пакетные операции
+# -------------------------------------------------------------------
+
+# Ограничение размера пакета: спринт — до нескольких сотен задач
+TASK_BULK_MAX_ITEMS = 500
+
+
+class TaskBulkCreate(BaseModel):
+    """
+    Пакет задач для создания.
+    """
+    items: List[TaskCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=TASK_BULK_MAX_ITEMS,
+        description="Создаваемые задачи"
+    )
+
+
+class TaskBulkUpdateItem(TaskUpdate):
+    """
+    Изменение одной задачи в пакете.
+    """
+    id: int = Field(
+        ...,
+        description="ID изменяемой задачи"
+    )
+
+
+class TaskBulkUpdate(BaseModel):
+    """
+    Пакет изменений задач.
+    """
+    items: List[TaskBulkUpdateItem] = Field(
+        ...,
+        min_length=1,
+        max_length=TASK_BULK_MAX_ITEMS,
+        description="Изменения задач"
+    )
+
+
+class TaskBulkDelete(BaseModel):
+    """
+    Пакет ID задач для удаления.
+    """
+    ids: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=TASK_BULK_MAX_ITEMS,
+        description="ID удаляемых задач"
+    )
+
+
+class TaskBulkStatus(str, enum.Enum):
+    """Итог обработки одного элемента пакета."""
+    CREATED = "created"
+    UPDATED = "updated"
+    DELETED = "deleted"
+    NOT_FOUND = "not_found"
+    FORBIDDEN = "forbidden"
+
+
+class TaskBulkItemResult(BaseModel):
+    """
+    Результат по одному элементу пакета (в порядке элементов запроса).
+    """
+    id: Optional[int] = Field(
+        None,
+        description="ID задачи"
+    )
+    status: TaskBulkStatus = Field(
+        ...,
+        description="Итог обработки"
+    )
+    detail: Optional[str] = Field(
+        None,
+        description="Причина отказа"
+    )
+    task: Optional[TaskSummary] = Field(
+        None,
+        description="Задача после создания или изменения"
+    )
+
+
+class TaskBulkResult(BaseModel):
+    """
+    Ответ пакетной операции.
+    """
+    results: List[TaskBulkItemResult]
+
+
+# -------------------------------------------------------------------
+# Пагинация списка задач
+# -------------------------------------------------------------------
+
+class TaskOrder(str, enum.Enum):
+    """Поле сортировки списка задач (вторичный ключ — id)."""
+    DEADLINE = "deadline"
+    CREATED_AT = "created_at"
+
+
+class TaskRole(str, enum.Enum):
+    """Роль текущего пользователя в задаче."""
+    CREATOR = "creator"
+    ASSIGNEE = "assignee"
+
+
+class TaskPage(BaseModel):
+    """
+    Страница списка задач.
+    """
+    items: List[TaskRead]
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Курсор следующей страницы (параметр after); null — страниц больше нет"
+    )
@@ -1,3 +1,4 @@
+from datetime import date
 from typing import List, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -66,3 +67,28 @@ class TeamMemberRoleUpdate(BaseModel):
         ...,
         description="Новая роль участника: MANAGER или USER"
     )
+
+
+class LeaderboardEntry(BaseModel):
+    """
+    Строка рейтинга команды: показатели участника за период.
+    """
+    user_id: int
+    email: str
+    rank: int = Field(..., description="Место: по среднему баллу, затем по числу и своевременности задач")
+    percentile: float = Field(..., description="Доля участников ниже в рейтинге, %: у первого 100")
+    average_score: Optional[float] = Field(None, description="Средний балл за период; null — оценок нет")
+    evaluations: int = Field(..., description="Число оценок за период")
+    tasks_done: int = Field(..., description="Задач выполнено за период")
+    tasks_on_time: int = Field(..., description="Из них выполнено не позже дедлайна")
+    on_time_rate: Optional[float] = Field(None, description="Доля выполненных в срок; null — задач нет")
+
+
+class TeamLeaderboard(BaseModel):
+    """
+    Рейтинг участников команды за период [date_from, date_to].
+    """
+    team_id: int
+    date_from: date
+    date_to: date
+    members: List[LeaderboardEntry]
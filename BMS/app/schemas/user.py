@@ -1,7 +1,9 @@
 from typing import Optional
 from fastapi_users import schemas
+from pydantic import field_validator
 
 from app.models.user import UserRole
+from app.utils.timezones import get_zone
 
 
 # -------------------------------------------------------------------
@@ -12,10 +14,11 @@ class UserRead(schemas.BaseUser[int]):
     """
     Ответная модель пользователя:
       - Наследует id, email, is_active, is_superuser, is_verified
-      - Добавляет role и team_id
+      - Добавляет role, team_id и timezone
     """
     role: UserRole
     team_id: Optional[int] = None
+    timezone: Optional[str] = None
 
 
 class UserCreate(schemas.BaseUserCreate):
@@ -32,6 +35,14 @@ class UserUpdate(schemas.BaseUserUpdate):
     Модель для обновления пользователя:
       - password, is_active, is_superuser, is_verified
       - Опциональная роль
+      - Опциональный часовой пояс IANA для календаря (null — UTC)
     """
     role: Optional[UserRole] = None
-    
+    timezone: Optional[str] = None
+
+    @field_validator("timezone")
+    @classmethod
+    def known_timezone(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and get_zone(value) is None:
+            raise ValueError(f"Неизвестный часовой пояс: {value}")
+        return value
@@ -0,0 +1,265 @@
+import time
+from collections import Counter, OrderedDict, defaultdict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, NamedTuple, Optional, Set, Tuple, Union
+
+from app.core.config import settings
+from app.utils.timezones import get_zone, to_local
+
+
+# -------------------------------------------------------------------
+# Кэш ответов календаря
+# -------------------------------------------------------------------
+
+# Период записи: день (дневной вид) или пара (год, месяц) (месячный вид)
+Period = Union[date, Tuple[int, int]]
+
+
+class CalendarKey(NamedTuple):
+    """
+    Ключ записи: чей календарь, по какой команде, за какой период
+    и в каком часовом поясе считались границы дней.
+    """
+    user_id: int
+    team_id: int
+    period: Period
+    tz: str = "UTC"
+
+
+def periods_of(day: date) -> Tuple[date, Tuple[int, int]]:
+    """Периоды, в которые попадает день: сам день и его месяц."""
+    return day, (day.year, day.month)
+
+
+class CalendarCache:
+    """
+    LRU-кэш с TTL в памяти процесса. Кроме самих записей ведёт индексы
+    (пользователь, период) и (команда, период) → ключи, чтобы изменение
+    встречи или задачи сбрасывало ровно затронутые дни и месяцы.
+
+    Изменение задаётся моментом (дедлайн, начало встречи): его день свой
+    в каждом поясе, поэтому для записей каждого пояса он считается отдельно.
+
+    Кэш свой у каждого процесса: при нескольких воркерах чужие изменения
+    становятся видны не позже чем через ttl секунд.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[CalendarKey, Tuple[float, Any]]" = OrderedDict()
+        self._index: Dict[Hashable, Set[CalendarKey]] = defaultdict(set)
+        self._zones: Counter = Counter()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _tags(key: CalendarKey):
+        return ("user", key.user_id, key.period), ("team", key.team_id, key.period)
+
+    def _drop(self, key: CalendarKey) -> None:
+        if self._entries.pop(key, None) is None:
+            return
+        self._zones[key.tz] -= 1
+        if not self._zones[key.tz]:
+            del self._zones[key.tz]
+        for tag in self._tags(key):
+            keys = self._index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[tag]
+
+    def get(self, key: CalendarKey) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def generation(self) -> int:
+        """Метка для set(): снимается до чтения из БД."""
+        return self._generation
+
+    def set(self, key: CalendarKey, value: Any, generation: int) -> None:
+        """
+        Сохранить значение, посчитанное после generation(). Если с тех пор
+        была инвалидация, значение могло устареть ещё до записи — не сохраняем.
+        """
+        if generation != self._generation or self.maxsize <= 0:
+            return
+        self._drop(key)
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._zones[key.tz] += 1
+        for tag in self._tags(key):
+            self._index[tag].add(key)
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate(
+        self,
+        user_ids: Iterable[int] = (),
+        team_ids: Iterable[int] = (),
+        days: Optional[Iterable[date]] = None,
+        moments: Optional[Iterable[datetime]] = None,
+    ) -> int:
+        """
+        Сбросить записи пользователей user_ids и команд team_ids
+        за дни days и их месяцы в любом поясе или за локальные дни
+        моментов moments в поясе каждой записи; без days и moments —
+        за все периоды. Возвращает число удалённых записей.
+        """
+        self._generation += 1
+        scopes = [("user", uid) for uid in set(user_ids)] + [("team", tid) for tid in set(team_ids)]
+        if not scopes or not self._entries:
+            return 0
+
+        if days is None and moments is None:
+            wanted = set(scopes)
+            keys = {
+                key for key in self._entries
+                if ("user", key.user_id) in wanted or ("team", key.team_id) in wanted
+            }
+        else:
+            # (пояс или None для любого, период)
+            wanted = {(None, period) for day in set(days or ()) for period in periods_of(day)}
+            for zone in list(self._zones) if moments is not None else ():
+                tz = get_zone(zone)
+                wanted |= {(zone, period) for moment in set(moments)
+                           for period in periods_of(to_local(moment, tz).date())}
+            keys = set()
+            for scope in scopes:
+                for zone, period in wanted:
+                    keys |= {key for key in self._index.get((*scope, period), ())
+                             if zone is None or key.tz == zone}
+
+        for key in keys:
+            self._drop(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._index.clear()
+        self._zones.clear()
+        self._generation += 1
+        self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+
+calendar_cache = CalendarCache(
+    maxsize=settings.CALENDAR_CACHE_SIZE,
+    ttl=settings.CALENDAR_CACHE_TTL_SECONDS,
+)
+
+
+# -------------------------------------------------------------------
+# Кэш рейтинга команд
+# -------------------------------------------------------------------
+
+class LeaderboardKey(NamedTuple):
+    """Ключ записи: команда и период [date_from, date_to]."""
+    team_id: int
+    date_from: date
+    date_to: date
+
+
+class LeaderboardCache:
+    """
+    LRU-кэш с TTL для рейтинга команды за период. Индекс команда → ключи
+    позволяет сбросить при новой оценке только периоды, в которые попал её день.
+    Как и календарь, кэш свой у каждого процесса.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[LeaderboardKey, Tuple[float, Any]]" = OrderedDict()
+        self._by_team: Dict[int, Set[LeaderboardKey]] = defaultdict(set)
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: LeaderboardKey) -> None:
+        self._entries.pop(key, None)
+        keys = self._by_team.get(key.team_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_team[key.team_id]
+
+    def get(self, key: LeaderboardKey) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def generation(self) -> int:
+        """Метка для set(): снимается до чтения из БД."""
+        return self._generation
+
+    def set(self, key: LeaderboardKey, value: Any, generation: int) -> None:
+        """Сохранить значение, если после generation() не было инвалидаций."""
+        if generation != self._generation or self.maxsize <= 0:
+            return
+        self._drop(key)
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._by_team[key.team_id].add(key)
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate(self, team_ids: Iterable[int] = (), days: Optional[Iterable[date]] = None) -> int:
+        """
+        Сбросить рейтинги команд team_ids за периоды, содержащие дни days;
+        без days — за все периоды. Возвращает число удалённых записей.
+        """
+        self._generation += 1
+        days = None if days is None else set(days)
+        keys = [
+            key
+            for team_id in set(team_ids)
+            for key in self._by_team.get(team_id, ())
+            if days is None or any(key.date_from <= day <= key.date_to for day in days)
+        ]
+        for key in keys:
+            self._drop(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_team.clear()
+        self._generation += 1
+        self.hits = self.misses = 0
+
+
+leaderboard_cache = LeaderboardCache(
+    maxsize=settings.LEADERBOARD_CACHE_SIZE,
+    ttl=settings.LEADERBOARD_CACHE_TTL_SECONDS,
+)
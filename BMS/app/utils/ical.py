@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from app.models.meeting import Meeting, RecurrenceFreq
+from app.models.task import Task, TaskStatus
+from app.utils.recurrence import Recurrence
+
+
+# -------------------------------------------------------------------
+# Формирование iCalendar (RFC 5545)
+# -------------------------------------------------------------------
+
+CRLF = "\r\n"
+# Длина строки без CRLF в октетах; длинные строки переносятся
+LINE_LIMIT = 75
+
+TASK_STATUS = {
+    TaskStatus.OPEN: "NEEDS-ACTION",
+    TaskStatus.IN_PROGRESS: "IN-PROCESS",
+    TaskStatus.DONE: "COMPLETED",
+}
+
+
+def escape_text(value: str) -> str:
+    """Экранирование значения TEXT: обратная косая, ; , и переводы строк."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+        .replace("\r", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """
+    Перенос строки длиннее LINE_LIMIT октетов: продолжение начинается
+    с пробела. Многобайтные символы UTF-8 не разрываются.
+    """
+    parts, current, size = [], [], 0
+    for char in line:
+        width = len(char.encode())
+        # у строк продолжения первый октет занимает пробел
+        if size + width > LINE_LIMIT - (1 if parts else 0):
+            parts.append("".join(current))
+            current, size = [], 0
+        current.append(char)
+        size += width
+    parts.append("".join(current))
+    return (CRLF + " ").join(parts) + CRLF
+
+
+def format_utc(value: datetime) -> str:
+    """DATE-TIME в UTC: 20250601T090000Z. Наивные значения считаются UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _component(name: str, properties: List[Optional[str]]) -> str:
+    lines = [f"BEGIN:{name}", *(p for p in properties if p), f"END:{name}"]
+    return "".join(fold(line) for line in lines)
+
+
+def calendar_header(name: str) -> str:
+    return "".join(fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//BMS//Calendar//RU",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ))
+
+
+CALENDAR_FOOTER = fold("END:VCALENDAR")
+
+
+def task_vtodo(task: Task, stamp: datetime) -> str:
+    """Задача с дедлайном как VTODO."""
+    return _component("VTODO", [
+        f"UID:task-{task.id}@bms",
+        f"DTSTAMP:{format_utc(stamp)}",
+        f"CREATED:{format_utc(task.created_at)}" if task.created_at else None,
+        f"SUMMARY:{escape_text(task.title)}",
+        f"DESCRIPTION:{escape_text(task.description)}" if task.description else None,
+        f"DUE:{format_utc(task.deadline)}",
+        f"STATUS:{TASK_STATUS[task.status]}",
+    ])
+
+
+def recurrence_rule(rule: Recurrence) -> str:
+    """
+    RRULE для серии. Ежемесячная серия с 29–31 числа в коротких месяцах
+    переносится на последний день — в RFC 5545 это BYMONTHDAY=28..N;BYSETPOS=-1.
+    """
+    parts = [f"FREQ={rule.freq.name}", f"INTERVAL={rule.interval}"]
+    if rule.freq == RecurrenceFreq.MONTHLY and rule.start.day > 28:
+        days = ",".join(str(day) for day in range(28, rule.start.day + 1))
+        parts += [f"BYMONTHDAY={days}", "BYSETPOS=-1"]
+    if rule.count is not None:
+        parts.append(f"COUNT={rule.count}")
+    if rule.until is not None:
+        parts.append(f"UNTIL={format_utc(rule.until)}")
+    return "RRULE:" + ";".join(parts)
+
+
+def meeting_vevent(meeting: Meeting, rule: Optional[Recurrence], stamp: datetime) -> str:
+    """
+    Встреча как VEVENT; серия — одним VEVENT с RRULE и EXDATE.
+    DTSTART в UTC без TZID: клиент разворачивает RRULE в UTC, как и сервер,
+    и вхождения совпадают с API и после перехода на летнее время.
+    """
+    properties = [
+        f"UID:meeting-{meeting.id}@bms",
+        f"DTSTAMP:{format_utc(stamp)}",
+        f"SUMMARY:{escape_text(meeting.title)}",
+        f"DTSTART:{format_utc(meeting.start_time)}",
+        f"DTEND:{format_utc(meeting.end_time)}",
+    ]
+    if rule is not None:
+        properties.append(recurrence_rule(rule))
+        if rule.exceptions:
+            properties.append("EXDATE:" + ",".join(format_utc(d) for d in sorted(rule.exceptions)))
+    return _component("VEVENT", properties)
@@ -0,0 +1,62 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List
+
+from fastapi import HTTPException
+from sqlalchemy import or_, and_, tuple_
+from sqlalchemy.sql import ColumnElement
+
+
+# -------------------------------------------------------------------
+# Курсоры keyset-пагинации
+# -------------------------------------------------------------------
+
+def encode_cursor(*values: Any) -> str:
+    """Упаковать значения последней строки страницы в непрозрачную строку."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Распаковать курсор из encode_cursor с `size` значениями
+    или выбросить 400 ошибку.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Некорректный курсор пагинации")
+    return values
+
+
+def parse_cursor_datetime(value: Any) -> datetime:
+    """Datetime из курсора или 400 ошибка."""
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор пагинации")
+
+
+def keyset_after(
+    column: ColumnElement,
+    id_column: ColumnElement,
+    value: Any,
+    last_id: int,
+    nullable: bool = False,
+) -> ColumnElement:
+    """
+    Условие «строго после (value, last_id)» для сортировки
+    ORDER BY column ASC NULLS LAST, id ASC.
+    Сравнение кортежей (column, id) > (value, last_id) обслуживается
+    составным индексом, поэтому любая страница стоит как первая.
+    """
+    if value is None:
+        return and_(column.is_(None), id_column > last_id)
+    after = tuple_(column, id_column) > tuple_(value, last_id)
+    return or_(after, column.is_(None)) if nullable else after
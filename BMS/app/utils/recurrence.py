@@ -0,0 +1,108 @@
+import calendar as pycal
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import FrozenSet, Iterator, Optional, Tuple
+
+from app.models.meeting import RecurrenceFreq
+
+
+# -------------------------------------------------------------------
+# Арифметика повторяющихся встреч
+# -------------------------------------------------------------------
+
+def add_months(value: datetime, months: int) -> datetime:
+    """
+    Сдвинуть дату на `months` месяцев. Если такого числа в месяце нет
+    (31 апреля), берётся последний день месяца.
+    """
+    index = value.month - 1 + months
+    year, month = value.year + index // 12, index % 12 + 1
+    day = min(value.day, pycal.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+@dataclass(frozen=True)
+class Recurrence:
+    """
+    Правило серии: первое вхождение [start, end) и шаг повторения.
+    Все времена — наивные UTC, и шаг отсчитывается в UTC: у встреч нет
+    своего пояса, поэтому после перехода на летнее время серия сохраняет
+    час в UTC и сдвигается на час по местному времени.
+    N-е вхождение вычисляется напрямую от первого, поэтому ни поиск
+    вхождений в окне, ни проверка пересечения не требуют перебора серии с начала.
+    """
+    start: datetime
+    end: datetime
+    freq: RecurrenceFreq
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+    exceptions: FrozenSet[datetime] = frozenset()
+
+    @property
+    def duration(self) -> timedelta:
+        return self.end - self.start
+
+    @property
+    def min_step(self) -> timedelta:
+        """Наименьшее расстояние между началами соседних вхождений."""
+        if self.freq == RecurrenceFreq.MONTHLY:
+            return timedelta(days=28 * self.interval)
+        return self._step()
+
+    def _step(self) -> timedelta:
+        days = 7 if self.freq == RecurrenceFreq.WEEKLY else 1
+        return timedelta(days=days * self.interval)
+
+    def nth_start(self, n: int) -> datetime:
+        """Начало n-го (с нуля) вхождения без учёта count/until."""
+        if self.freq == RecurrenceFreq.MONTHLY:
+            return add_months(self.start, self.interval * n)
+        return self.start + self._step() * n
+
+    def index_at_or_before(self, moment: datetime) -> int:
+        """Номер последнего вхождения, начавшегося не позже moment (до серии — отрицательный)."""
+        if self.freq != RecurrenceFreq.MONTHLY:
+            return (moment - self.start) // self._step()
+        months = (moment.year - self.start.year) * 12 + moment.month - self.start.month
+        n = months // self.interval
+        # в том же месяце вхождение может начинаться позже moment
+        if self.nth_start(n) > moment:
+            n -= 1
+        return n
+
+    def last_index(self) -> Optional[int]:
+        """Номер последнего вхождения или None для бессрочной серии."""
+        limits = []
+        if self.count is not None:
+            limits.append(self.count - 1)
+        if self.until is not None:
+            limits.append(self.index_at_or_before(self.until))
+        return min(limits) if limits else None
+
+    def series_end(self) -> Optional[datetime]:
+        """Окончание последнего вхождения или None для бессрочной серии."""
+        last = self.last_index()
+        return None if last is None else self.nth_start(last) + self.duration
+
+    def occurrences(self, window_start: datetime, window_end: datetime) -> Iterator[Tuple[datetime, datetime]]:
+        """
+        Вхождения, пересекающиеся с [window_start, window_end), по возрастанию.
+        Первый номер вычисляется сразу, так что стоимость — O(вхождений в окне),
+        а не длины серии. Отменённые вхождения пропускаются.
+        """
+        duration = self.duration
+        last = self.last_index()
+        n = max(0, self.index_at_or_before(window_start - duration))
+        while last is None or n <= last:
+            start = self.nth_start(n)
+            if start >= window_end:
+                break
+            end = start + duration
+            if end > window_start and start not in self.exceptions:
+                yield start, end
+            n += 1
+
+    def first_overlap(self, start: datetime, end: datetime) -> Optional[Tuple[datetime, datetime]]:
+        """Первое вхождение, пересекающееся с [start, end), или None."""
+        return next(self.occurrences(start, end), None)
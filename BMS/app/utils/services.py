@@ -1,121 +1,826 @@
-from datetime import date, datetime
-from typing import List, Optional
+import heapq
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
-from fastapi import HTTPException
+from fastapi import HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import case, delete, exists, insert, literal, literal_column, select, update, and_, or_, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.sql.functions import FunctionElement
 
 from app.models.user import User, UserRole
-from app.models.task import Task
+from app.models.comment import Comment
+from app.models.evaluation import Evaluation, EvaluationDaily
+from app.models.task import Task, TaskStatus
 from app.models.team import Team
-from app.models.meeting import Meeting, meeting_participants_association
+from app.models.meeting import BOOKING_CONFLICT, Meeting, MeetingBooking, meeting_participants_association
+from app.schemas.evaluation import EvaluationSeries, EvaluationSeriesPoint, SeriesBucket
+from app.schemas.meeting import MeetingRecurrence
+from app.schemas.task import TaskInclude, TaskRead, TaskSummary
+from app.utils.cache import calendar_cache, leaderboard_cache
+from app.utils.recurrence import Recurrence
+from app.utils.timezones import UTC, get_zone, local_date, local_midnight, to_local, to_naive_utc, utc_date
+
+
+def day_bounds(start: date, end: Optional[date] = None, tz: tzinfo = UTC) -> Tuple[datetime, datetime]:
+    """
+    Границы полуинтервала [начало start, начало end) в виде timestamp.
+    Без end — ровно одни сутки. Сравнение самого столбца с границами,
+    в отличие от func.date(столбец), позволяет использовать индекс.
+    Сутки локальные для tz, границы — наивное UTC, как хранятся времена.
+    """
+    end = end or start + timedelta(days=1)
+    return local_midnight(start, tz), local_midnight(end, tz)
 
 
 async def get_tasks_for_date(
-    db: AsyncSession, team_id: int, target: date
+    db: AsyncSession, team_id: int, target: date, tz: tzinfo = UTC
 ) -> List[Task]:
     """
     Получить задачи с дедлайном на конкретную дату,
     фильтруя по команде (через assignee или creator).
+    Календарю нужны только поля самой задачи, связи не загружаются.
     """
+    day_start, next_day_start = day_bounds(target, tz=tz)
     stmt = (
         select(Task)
-        .where(Task.deadline.isnot(None))
-        .where(func.date(Task.deadline) == target)
+        .where(Task.deadline >= day_start)
+        .where(Task.deadline < next_day_start)
         .where(
             or_(
                 Task.assignee.has(team_id=team_id),
                 Task.creator.has(team_id=team_id)
             )
         )
-        .options(
-            selectinload(Task.comments),
-            selectinload(Task.evaluations),
-            selectinload(Task.creator),
-            selectinload(Task.assignee),
-        )
     )
     res = await db.execute(stmt)
     return res.scalars().all()
 
 
 async def get_meetings_for_date(
-    db: AsyncSession, user_id: int, target: date
-) -> List[Meeting]:
+    db: AsyncSession, user_id: int, target: date, tz: tzinfo = UTC
+) -> List["MeetingOccurrence"]:
     """
-    Получить встречи пользователя на конкретную дату.
+    Получить встречи пользователя на конкретную дату:
+    разовые встречи и вхождения серий, начинающиеся в этот день.
+    Календарю нужны только поля самой встречи, участники не загружаются.
     """
+    day_start, next_day_start = day_bounds(target, tz=tz)
     stmt = (
         select(Meeting)
-        .options(selectinload(Meeting.participants))
-        .where(func.date(Meeting.start_time) == target)
+        .where(Meeting.recurrence_freq.is_(None))
+        .where(Meeting.start_time >= day_start)
+        .where(Meeting.start_time < next_day_start)
         .join(Meeting.participants)
         .where(Meeting.participants.any(id=user_id))
     )
     res = await db.execute(stmt)
-    return res.scalars().all()
+    occurrences = [MeetingOccurrence(m, m.start_time, m.end_time) for m in res.scalars().all()]
 
+    for series in await get_user_series(db, [user_id], day_start, next_day_start):
+        occurrences.extend(
+            MeetingOccurrence(series, start, end)
+            for start, end in meeting_recurrence(series).occurrences(day_start, next_day_start)
+            if start >= day_start
+        )
+    return occurrences
 
-async def get_meeting_or_404(meeting_id: int, db: AsyncSession) -> Meeting:
+
+def _as_date(value) -> date:
     """
-    Получить встречу по ID или выбросить 404 ошибку.
+    Привести результат func.date к date:
+    PostgreSQL возвращает date, SQLite — строку YYYY-MM-DD.
     """
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _dialect(db: AsyncSession) -> str:
+    return db.get_bind().dialect.name
+
+
+async def count_tasks_by_day(
+    db: AsyncSession, team_id: int, start: date, end: date, tz: tzinfo = UTC
+) -> Dict[date, int]:
+    """
+    Количество задач команды по дням дедлайна в полуинтервале [start, end).
+    Один сгруппированный запрос вместо запроса на каждый день;
+    дни локальные для tz и группируются в самой БД (local_date).
+    """
+    range_start, range_end = day_bounds(start, end, tz)
+    day = local_date(Task.deadline, tz, range_start, range_end, _dialect(db)).label("day")
+    stmt = (
+        select(day, func.count(Task.id))
+        .where(Task.deadline >= range_start)
+        .where(Task.deadline < range_end)
+        .where(
+            or_(
+                Task.assignee.has(team_id=team_id),
+                Task.creator.has(team_id=team_id)
+            )
+        )
+        .group_by(day)
+    )
+    res = await db.execute(stmt)
+    return {_as_date(d): cnt for d, cnt in res.all()}
+
+
+async def count_meetings_by_day(
+    db: AsyncSession, user_id: int, start: date, end: date, tz: tzinfo = UTC
+) -> Dict[date, int]:
+    """
+    Количество встреч пользователя по дням начала в полуинтервале [start, end).
+    Разовые встречи считает сгруппированный запрос по броням — диапазон
+    читается из индекса (user_id, start_time, meeting_id) без обращения
+    к meetings; вхождения серий разворачиваются только внутри диапазона.
+    """
+    range_start, range_end = day_bounds(start, end, tz)
+    day = local_date(MeetingBooking.start_time, tz, range_start, range_end, _dialect(db)).label("day")
+    stmt = (
+        select(day, func.count(MeetingBooking.meeting_id))
+        .where(MeetingBooking.user_id == user_id)
+        .where(MeetingBooking.start_time >= range_start)
+        .where(MeetingBooking.start_time < range_end)
+        .group_by(day)
+    )
+    res = await db.execute(stmt)
+    counts = Counter({_as_date(d): cnt for d, cnt in res.all()})
+
+    for series in await get_user_series(db, [user_id], range_start, range_end):
+        counts.update(
+            to_local(occ_start, tz).date()
+            for occ_start, _ in meeting_recurrence(series).occurrences(range_start, range_end)
+            if occ_start >= range_start
+        )
+    return dict(counts)
+
+
+# -------------------------------------------------------------------
+# Календарь команды: события всех участников набором запросов
+# -------------------------------------------------------------------
+
+async def get_team_events_for_date(
+    db: AsyncSession, user_ids: List[int], target: date, tz: tzinfo = UTC
+) -> Tuple[Dict[int, List[Task]], Dict[int, List["MeetingOccurrence"]]]:
+    """
+    Задачи (по исполнителю) и встречи всех user_ids на дату,
+    разложенные по пользователям. Три запроса при любом размере команды: задачи, брони разовых встреч
+    и серии с участниками.
+    """
+    day_start, next_day_start = day_bounds(target, tz=tz)
+    tasks: Dict[int, List[Task]] = defaultdict(list)
+    meetings: Dict[int, List[MeetingOccurrence]] = defaultdict(list)
+    if not user_ids:
+        return tasks, meetings
+
     res = await db.execute(
-        select(Meeting)
-        .options(selectinload(Meeting.participants))
-        .where(Meeting.id == meeting_id)
+        select(Task)
+        .where(Task.assignee_id.in_(user_ids))
+        .where(Task.deadline >= day_start)
+        .where(Task.deadline < next_day_start)
+    )
+    for task in res.scalars().all():
+        tasks[task.assignee_id].append(task)
+
+    res = await db.execute(
+        select(MeetingBooking.user_id, Meeting)
+        .join(Meeting, Meeting.id == MeetingBooking.meeting_id)
+        .where(MeetingBooking.user_id.in_(user_ids))
+        .where(MeetingBooking.start_time >= day_start)
+        .where(MeetingBooking.start_time < next_day_start)
+    )
+    for user_id, meeting in res.all():
+        meetings[user_id].append(MeetingOccurrence(meeting, meeting.start_time, meeting.end_time))
+
+    expanded: Dict[int, List[MeetingOccurrence]] = {}
+    for series, user_id in await get_series_participants(db, user_ids, day_start, next_day_start):
+        if series.id not in expanded:
+            expanded[series.id] = [
+                MeetingOccurrence(series, start, end)
+                for start, end in meeting_recurrence(series).occurrences(day_start, next_day_start)
+                if start >= day_start
+            ]
+        meetings[user_id].extend(expanded[series.id])
+    return tasks, meetings
+
+
+async def count_team_events_by_day(
+    db: AsyncSession, user_ids: List[int], start: date, end: date, tz: tzinfo = UTC
+) -> Tuple[Dict[Tuple[int, date], int], Dict[Tuple[int, date], int]]:
+    """
+    Количество задач (по исполнителю) и встреч по парам (пользователь, день)
+    в [start, end). Задачи и разовые встречи считают запросы с GROUP BY пользователь, день;
+    серии разворачиваются один раз и засчитываются каждому участнику.
+    """
+    range_start, range_end = day_bounds(start, end, tz)
+    dialect = _dialect(db)
+    task_counts: Counter = Counter()
+    meeting_counts: Counter = Counter()
+    if not user_ids:
+        return task_counts, meeting_counts
+
+    day = local_date(Task.deadline, tz, range_start, range_end, dialect).label("day")
+    res = await db.execute(
+        select(Task.assignee_id, day, func.count(Task.id))
+        .where(Task.assignee_id.in_(user_ids))
+        .where(Task.deadline >= range_start)
+        .where(Task.deadline < range_end)
+        .group_by(Task.assignee_id, day)
     )
-    meeting = res.scalars().first()
+    task_counts.update({(user_id, _as_date(d)): cnt for user_id, d, cnt in res.all()})
+
+    day = local_date(MeetingBooking.start_time, tz, range_start, range_end, dialect).label("day")
+    res = await db.execute(
+        select(MeetingBooking.user_id, day, func.count())
+        .where(MeetingBooking.user_id.in_(user_ids))
+        .where(MeetingBooking.start_time >= range_start)
+        .where(MeetingBooking.start_time < range_end)
+        .group_by(MeetingBooking.user_id, day)
+    )
+    meeting_counts.update({(user_id, _as_date(d)): cnt for user_id, d, cnt in res.all()})
+
+    expanded: Dict[int, Counter] = {}
+    for series, user_id in await get_series_participants(db, user_ids, range_start, range_end):
+        if series.id not in expanded:
+            expanded[series.id] = Counter(
+                to_local(occ_start, tz).date()
+                for occ_start, _ in meeting_recurrence(series).occurrences(range_start, range_end)
+                if occ_start >= range_start
+            )
+        meeting_counts.update({(user_id, d): cnt for d, cnt in expanded[series.id].items()})
+    return task_counts, meeting_counts
+
+
+# -------------------------------------------------------------------
+# Сброс кэшей календаря и рейтинга после изменений
+# -------------------------------------------------------------------
+
+def invalidate_task_caches(rows: Iterable[Tuple[Optional[int], Optional[int], Optional[datetime]]]) -> None:
+    """
+    Сбросить в кэше календаря дни дедлайнов задач у команд автора
+    и исполнителя, а в кэше рейтинга — рейтинги команд исполнителей.
+    rows — тройки (команда автора, команда исполнителя, deadline) до и
+    после изменения: команды берутся из TaskOwner и RETURNING
+    (см. assignee_team_id_returning), отдельного запроса нет.
+    Вызывается после commit.
+    """
+    # Даже если сбрасывать нечего, чтение, начатое до commit, не должно попасть в кэш
+    calendar_cache.invalidate()
+    leaderboard_cache.invalidate()
+    rows = list(rows)
+
+    moments_by_team: Dict[int, Set[datetime]] = defaultdict(set)
+    for creator_team_id, assignee_team_id, deadline in rows:
+        if deadline is None:
+            continue
+        for team_id in (creator_team_id, assignee_team_id):
+            if team_id:
+                moments_by_team[team_id].add(to_naive_utc(deadline))
+    for team_id, moments in moments_by_team.items():
+        calendar_cache.invalidate(team_ids=[team_id], moments=moments)
+
+    # Выполнение, смена исполнителя и удаление меняют счётчики задач за любой период
+    leaderboard_cache.invalidate(team_ids={team_id for _, team_id, _ in rows if team_id})
+
+
+def invalidate_meeting_calendar(user_ids: Iterable[int], starts: Iterable[Optional[datetime]]) -> None:
+    """
+    Сбросить в кэше календаря дни начала встречи у её участников.
+    None среди starts — серия: её вхождения разбросаны по всем периодам,
+    и записи участников сбрасываются целиком.
+    """
+    starts = list(starts)
+    if None in starts:
+        calendar_cache.invalidate(user_ids=user_ids)
+    else:
+        calendar_cache.invalidate(user_ids=user_ids, moments=[to_naive_utc(start) for start in starts])
+
+
+async def get_meeting_or_404(meeting_id: int, db: AsyncSession) -> Meeting:
+    """
+    Получить встречу по ID или выбросить 404 ошибку.
+    Участники не загружаются — их ID даёт meeting_participant_ids().
+    """
+    meeting = await db.get(Meeting, meeting_id)
     if not meeting:
         raise HTTPException(status_code=404, detail="Встреча не найдена")
     return meeting
 
 
+class id_list(FunctionElement):
+    """
+    Агрегат «все ID группы одним значением»:
+    array_agg в PostgreSQL, group_concat в SQLite.
+    """
+    name = "id_list"
+    inherit_cache = True
+
+
+@compiles(id_list)
+def _id_list_default(element, compiler, **kw):
+    return "group_concat(%s)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(id_list, "postgresql")
+def _id_list_postgresql(element, compiler, **kw):
+    return "array_agg(%s)" % compiler.process(element.clauses, **kw)
+
+
+def meeting_participant_ids():
+    """
+    Коррелированный подзапрос: ID участников встречи одним значением,
+    прямо из meeting_participants по первичному ключу — без загрузки User.
+    Разбирается parse_id_list.
+    """
+    participants = meeting_participants_association.alias("mp")
+    return (
+        select(id_list(participants.c.user_id))
+        .where(participants.c.meeting_id == Meeting.id)
+        .correlate(Meeting)
+        .scalar_subquery()
+        .label("participant_ids")
+    )
+
+
+def parse_id_list(value) -> List[int]:
+    """Список ID из id_list: массив (PostgreSQL), строка через запятую (SQLite) или NULL."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return sorted(int(v) for v in value)
+
+
 async def check_time_conflicts(
     user_ids: List[int],
     start: datetime,
     end: datetime,
     db: AsyncSession,
     exclude_meeting_id: Optional[int] = None,
+    include_bookings: bool = True,
 ) -> None:
     """
     Проверяет пересечения по времени для списка пользователей.
     Если хотя бы у одного есть пересечение — выбрасывает ошибку.
+    Брони разовых встреч читаются по индексу (user_id, start_time); саму
+    гарантию для них даёт ограничение на meeting_bookings, поэтому перед
+    вставкой достаточно include_bookings=False. У серий проверяется только
+    вхождение, попадающее в [start, end), — серия не разворачивается.
     """
-    stmt = (
-        select(meeting_participants_association.c.user_id)
-        .join(Meeting, meeting_participants_association.c.meeting_id == Meeting.id)
-        .where(meeting_participants_association.c.user_id.in_(user_ids))
-        .where(and_(
-            Meeting.start_time < end,
-            Meeting.end_time > start
-        ))
-    )
+    busy_user_ids: Set[int] = set()
 
-    if exclude_meeting_id:
-        stmt = stmt.where(Meeting.id != exclude_meeting_id)
+    if include_bookings:
+        stmt = (
+            select(MeetingBooking.user_id)
+            .where(MeetingBooking.user_id.in_(user_ids))
+            .where(and_(
+                MeetingBooking.start_time < end,
+                MeetingBooking.end_time > start
+            ))
+        )
 
-    result = await db.execute(stmt)
-    busy_user_ids = result.scalars().all()
+        if exclude_meeting_id:
+            stmt = stmt.where(MeetingBooking.meeting_id != exclude_meeting_id)
+
+        result = await db.execute(stmt)
+        busy_user_ids.update(result.scalars().all())
+
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    overlaps: Dict[int, bool] = {}
+    for series, user_id in await get_series_participants(db, user_ids, start, end, exclude_meeting_id):
+        if series.id not in overlaps:
+            overlaps[series.id] = meeting_recurrence(series).first_overlap(start, end) is not None
+        if overlaps[series.id]:
+            busy_user_ids.add(user_id)
 
+    raise_if_busy(busy_user_ids)
+
+
+def raise_if_busy(busy_user_ids: Iterable[int]) -> None:
+    """400 ошибка со списком занятых пользователей, если он не пуст."""
+    busy_user_ids = sorted(set(busy_user_ids))
     if busy_user_ids:
-        ids_str = ', '.join(map(str, set(busy_user_ids)))
+        ids_str = ', '.join(map(str, busy_user_ids))
         raise HTTPException(
             status_code=400,
             detail=f"Пользователи с ID {ids_str} уже заняты в это время"
         )
 
 
-async def get_team_or_404(team_id: int, db: AsyncSession) -> Team:
+# SQLSTATE exclusion_violation в PostgreSQL
+EXCLUSION_VIOLATION = "23P01"
+
+
+def is_booking_conflict(exc: IntegrityError) -> bool:
     """
-    Получить команду по ID или выбросить 404 ошибку.
+    Ошибка целостности вызвана пересечением броней участников
+    (ограничение исключения в PostgreSQL или триггер в SQLite).
+    """
+    return (
+        getattr(exc.orig, "sqlstate", None) == EXCLUSION_VIOLATION
+        or BOOKING_CONFLICT in str(exc.orig)
+    )
+
+
+# -------------------------------------------------------------------
+# Повторяющиеся встречи
+# -------------------------------------------------------------------
+
+# Насколько вперёд сверяются друг с другом бессрочные серии
+RECURRENCE_CHECK_HORIZON = timedelta(days=366)
+
+
+@dataclass
+class MeetingOccurrence:
+    """Встреча в окне: разовая встреча или одно вхождение серии."""
+    meeting: Meeting
+    start_time: datetime
+    end_time: datetime
+
+    @property
+    def id(self) -> int:
+        return self.meeting.id
+
+    @property
+    def title(self) -> str:
+        return self.meeting.title
+
+
+def meeting_recurrence(meeting: Meeting) -> Optional[Recurrence]:
+    """Правило серии из строки встречи; для разовой встречи — None."""
+    if meeting.recurrence_freq is None:
+        return None
+    return Recurrence(
+        start=to_naive_utc(meeting.start_time),
+        end=to_naive_utc(meeting.end_time),
+        freq=meeting.recurrence_freq,
+        interval=meeting.recurrence_interval,
+        count=meeting.recurrence_count,
+        until=to_naive_utc(meeting.recurrence_until) if meeting.recurrence_until else None,
+        exceptions=frozenset(
+            datetime.fromisoformat(value) for value in meeting.recurrence_exceptions or ()
+        ),
+    )
+
+
+def build_recurrence(start: datetime, end: datetime, recurrence_in: MeetingRecurrence) -> Recurrence:
+    """
+    Правило серии из запроса или 400 ошибка.
+    Вхождения одной серии не должны пересекаться между собой.
+    """
+    rule = Recurrence(
+        start=to_naive_utc(start),
+        end=to_naive_utc(end),
+        freq=recurrence_in.freq,
+        interval=recurrence_in.interval,
+        count=recurrence_in.count,
+        until=to_naive_utc(recurrence_in.until) if recurrence_in.until else None,
+        exceptions=frozenset(to_naive_utc(value) for value in recurrence_in.exceptions),
+    )
+    if rule.end <= rule.start:
+        raise HTTPException(status_code=400, detail="Встреча должна заканчиваться позже, чем начинается")
+    if rule.duration > rule.min_step:
+        raise HTTPException(status_code=400, detail="Встреча серии длиннее шага повторения")
+    if rule.until is not None and rule.until < rule.start:
+        raise HTTPException(status_code=400, detail="Серия заканчивается раньше первой встречи")
+    return rule
+
+
+def recurrence_columns(rule: Optional[Recurrence]) -> dict:
+    """Значения полей recurrence_* и series_end строки встречи."""
+    if rule is None:
+        return {
+            "recurrence_freq": None,
+            "recurrence_interval": 1,
+            "recurrence_count": None,
+            "recurrence_until": None,
+            "recurrence_exceptions": None,
+            "series_end": None,
+        }
+    return {
+        "recurrence_freq": rule.freq,
+        "recurrence_interval": rule.interval,
+        "recurrence_count": rule.count,
+        "recurrence_until": rule.until,
+        "recurrence_exceptions": sorted(value.isoformat() for value in rule.exceptions),
+        "series_end": rule.series_end(),
+    }
+
+
+def recurrence_read(rule: Optional[Recurrence]) -> Optional[MeetingRecurrence]:
+    """Правило серии для ответа API; для разовой встречи — None."""
+    if rule is None:
+        return None
+    return MeetingRecurrence(
+        freq=rule.freq,
+        interval=rule.interval,
+        count=rule.count,
+        until=rule.until,
+        exceptions=sorted(rule.exceptions),
+    )
+
+
+def series_in_window(start: datetime, end: datetime):
+    """
+    Условие «серия, вхождения которой могут попасть в [start, end)»:
+    первое вхождение до конца окна, последнее — после его начала.
+    """
+    return and_(
+        Meeting.recurrence_freq.is_not(None),
+        Meeting.start_time < end,
+        or_(Meeting.series_end.is_(None), Meeting.series_end > start),
+    )
+
+
+async def get_user_series(
+    db: AsyncSession,
+    user_ids: List[int],
+    start: datetime,
+    end: datetime,
+) -> List[Meeting]:
+    """
+    Серии с участием хотя бы одного из пользователей, способные
+    попасть в [start, end). Одна строка на серию, вхождения не хранятся.
+    """
+    stmt = (
+        select(Meeting)
+        .where(Meeting.id.in_(
+            select(meeting_participants_association.c.meeting_id)
+            .where(meeting_participants_association.c.user_id.in_(user_ids))
+        ))
+        .where(series_in_window(start, end))
+    )
+    res = await db.execute(stmt)
+    return res.scalars().all()
+
+
+async def get_series_participants(
+    db: AsyncSession,
+    user_ids: List[int],
+    start: datetime,
+    end: datetime,
+    exclude_meeting_id: Optional[int] = None,
+) -> List[Tuple[Meeting, int]]:
+    """Пары (серия, участник из user_ids) для серий, способных попасть в [start, end)."""
+    stmt = (
+        select(Meeting, meeting_participants_association.c.user_id)
+        .join(
+            meeting_participants_association,
+            meeting_participants_association.c.meeting_id == Meeting.id
+        )
+        .where(meeting_participants_association.c.user_id.in_(user_ids))
+        .where(series_in_window(start, end))
+    )
+    if exclude_meeting_id:
+        stmt = stmt.where(Meeting.id != exclude_meeting_id)
+    res = await db.execute(stmt)
+    return res.all()
+
+
+async def check_series_conflicts(
+    user_ids: List[int],
+    rule: Recurrence,
+    db: AsyncSession,
+    exclude_meeting_id: Optional[int] = None,
+) -> None:
+    """
+    Проверить новую или изменённую серию на пересечения у участников.
+    Каждая бронь разовой встречи сверяется с серией за O(1): вычисляется
+    единственное вхождение, которое может её задеть. Чужие серии сверяются
+    по вхождениям в их общем промежутке, бессрочные — не дальше
+    RECURRENCE_CHECK_HORIZON от начала.
+    """
+    horizon = rule.series_end() or rule.start + RECURRENCE_CHECK_HORIZON
+    busy_user_ids: Set[int] = set()
+
+    result = await db.execute(
+        select(MeetingBooking.user_id, MeetingBooking.start_time, MeetingBooking.end_time)
+        .where(MeetingBooking.user_id.in_(user_ids))
+        .where(and_(
+            MeetingBooking.start_time < horizon,
+            MeetingBooking.end_time > rule.start
+        ))
+    )
+    for user_id, start, end in result.all():
+        if user_id not in busy_user_ids and rule.first_overlap(to_naive_utc(start), to_naive_utc(end)):
+            busy_user_ids.add(user_id)
+
+    overlaps: Dict[int, bool] = {}
+    for series, user_id in await get_series_participants(db, user_ids, rule.start, horizon, exclude_meeting_id):
+        if series.id not in overlaps:
+            other = meeting_recurrence(series)
+            common_start = max(rule.start, other.start)
+            common_end = min(horizon, other.series_end() or horizon)
+            overlaps[series.id] = any(
+                other.first_overlap(start, end) is not None
+                for start, end in rule.occurrences(common_start, common_end)
+            )
+        if overlaps[series.id]:
+            busy_user_ids.add(user_id)
+
+    raise_if_busy(busy_user_ids)
+
+
+async def get_busy_intervals(
+    user_ids: List[int], start: datetime, end: datetime, db: AsyncSession
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Интервалы занятости пользователей, пересекающиеся с [start, end):
+    брони разовых встреч по индексу и вхождения серий только внутри окна
+    (та же семантика, что у check_time_conflicts).
     """
     result = await db.execute(
-        select(Team)
-        .options(selectinload(Team.members))
-        .where(Team.id == team_id)
+        select(MeetingBooking.start_time, MeetingBooking.end_time)
+        .where(MeetingBooking.user_id.in_(user_ids))
+        .where(and_(
+            MeetingBooking.start_time < end,
+            MeetingBooking.end_time > start
+        ))
     )
+    busy = [(to_naive_utc(s), to_naive_utc(e)) for s, e in result.all()]
+
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    for series in await get_user_series(db, user_ids, start, end):
+        busy.extend(meeting_recurrence(series).occurrences(start, end))
+    return busy
+
+
+async def get_busy_by_user(
+    user_ids: Iterable[int], start: datetime, end: datetime, db: AsyncSession
+) -> Dict[int, List[Tuple[datetime, datetime, int]]]:
+    """
+    Занятость каждого пользователя в [start, end) как (начало, конец, ID встречи):
+    один запрос броней и один — серий, вхождения которых считаются только в окне.
+    """
+    user_ids = list(user_ids)
+    busy: Dict[int, List[Tuple[datetime, datetime, int]]] = defaultdict(list)
+
+    result = await db.execute(
+        select(MeetingBooking.user_id, MeetingBooking.start_time, MeetingBooking.end_time, MeetingBooking.meeting_id)
+        .where(MeetingBooking.user_id.in_(user_ids))
+        .where(and_(
+            MeetingBooking.start_time < end,
+            MeetingBooking.end_time > start
+        ))
+    )
+    for user_id, s, e, meeting_id in result.all():
+        busy[user_id].append((to_naive_utc(s), to_naive_utc(e), meeting_id))
+
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    occurrences: Dict[int, List[Tuple[datetime, datetime]]] = {}
+    for series, user_id in await get_series_participants(db, user_ids, start, end):
+        if series.id not in occurrences:
+            occurrences[series.id] = list(meeting_recurrence(series).occurrences(start, end))
+        busy[user_id].extend((s, e, series.id) for s, e in occurrences[series.id])
+    return busy
+
+
+def find_overlaps(intervals: Iterable[Tuple[datetime, datetime, Hashable]]) -> List[Tuple[Any, Any]]:
+    """
+    Все пары пересекающихся интервалов (начало, конец, ключ):
+    сортировка по началу и один проход с кучей ещё не закончившихся.
+    O(n log n + число пар). Интервалы встык не пересекаются.
+    """
+    pairs: List[Tuple[Any, Any]] = []
+    active: List[Tuple[datetime, int, Hashable]] = []
+    for order, (start, end, key) in enumerate(sorted(intervals, key=lambda i: (i[0], i[1]))):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        pairs.extend((other, key) for _, _, other in active)
+        heapq.heappush(active, (end, order, key))
+    return pairs
+
+
+def merge_intervals(intervals: Iterable[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """
+    Объединить пересекающиеся интервалы: сортировка по началу и один проход.
+    Интервалы встык не сливаются — встреча сразу после другой не конфликт.
+    """
+    merged: List[List[datetime]] = []
+    for start, end in sorted(intervals):
+        if merged and start < merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def off_hours(
+    zones: Iterable[tzinfo],
+    window_start: datetime,
+    window_end: datetime,
+    work_start: time,
+    work_end: time,
+    include_weekends: bool = False,
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Нерабочее время на [window_start, window_end) как интервалы занятости
+    в наивном UTC: для каждого пояса свои локальные рабочие часы и выходные.
+    Границы считаются от локальной даты, как local_midnight, поэтому
+    переход на летнее время сдвигает их вместе с поясом.
+    """
+    def at(day: date, moment: time, tz: tzinfo) -> datetime:
+        return to_naive_utc(datetime.combine(day, moment, tzinfo=tz))
+
+    intervals = []
+    for tz in set(zones):
+        day = to_local(window_start, tz).date()
+        while day <= to_local(window_end, tz).date():
+            day_start, next_day = local_midnight(day, tz), local_midnight(day + timedelta(days=1), tz)
+            if include_weekends or day.weekday() < 5:
+                intervals += [(day_start, at(day, work_start, tz)), (at(day, work_end, tz), next_day)]
+            else:
+                intervals.append((day_start, next_day))
+            day += timedelta(days=1)
+    return [(start, end) for start, end in intervals if start < end]
+
+
+async def get_user_zones(user_ids: List[int], db: AsyncSession) -> Set[tzinfo]:
+    """
+    Часовые пояса пользователей из профиля (без пояса или с неизвестным — UTC).
+    Возвращаются различные пояса: рабочие часы считаются один раз на пояс.
+    """
+    result = await db.execute(select(User.timezone).where(User.id.in_(user_ids)).distinct())
+    return {(get_zone(name) if name else None) or UTC for name in result.scalars().all()} or {UTC}
+
+
+def _work_days(
+    window_start: datetime, window_end: datetime, work_start: time, work_end: time, include_weekends: bool
+) -> Iterator[Tuple[datetime, datetime]]:
+    """Рабочие часы каждого рабочего дня окна (даты и часы в UTC)."""
+    day = window_start.date()
+    while day <= window_end.date():
+        if include_weekends or day.weekday() < 5:
+            yield (max(datetime.combine(day, work_start), window_start),
+                   min(datetime.combine(day, work_end), window_end))
+        day += timedelta(days=1)
+
+
+def find_free_slots(
+    busy: Iterable[Tuple[datetime, datetime]],
+    window_start: datetime,
+    window_end: datetime,
+    duration: timedelta,
+    work_start: Optional[time],
+    work_end: Optional[time],
+    limit: int,
+    include_weekends: bool = False,
+    step: timedelta = timedelta(minutes=15),
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Первые `limit` общих свободных слотов длиной `duration` внутри окна
+    и рабочих часов. Начало слота выравнивается на сетку `step`,
+    слоты в одном окне свободы идут подряд без перекрытий.
+    Рабочие дни и занятость обходятся одним проходом: O(дней + интервалов).
+    work_start=None — рабочие часы уже переданы в busy (см. off_hours),
+    и всё окно ищется целиком, в том числе через полночь UTC.
+    """
+    merged = merge_intervals(busy)
+    if work_start is None:
+        segments = iter([(window_start, window_end)])
+    else:
+        segments = _work_days(window_start, window_end, work_start, work_end, include_weekends)
+    slots: List[Tuple[datetime, datetime]] = []
+    i = 0
+    for free_from, day_end in segments:
+        if len(slots) >= limit:
+            break
+        # Интервалы, закончившиеся до начала дня, больше не нужны
+        while i < len(merged) and merged[i][1] <= free_from:
+            i += 1
+        j = i
+        while free_from < day_end and len(slots) < limit:
+            # выравнивание на сетку от полуночи
+            offset = (free_from - datetime.combine(free_from.date(), time.min)) % step
+            if offset:
+                free_from += step - offset
+            gap_end = day_end
+            if j < len(merged) and merged[j][0] < day_end:
+                gap_end = min(gap_end, merged[j][0])
+            if free_from + duration <= gap_end:
+                slots.append((free_from, free_from + duration))
+                free_from += duration
+                continue
+            if gap_end == day_end:
+                break
+            # слот не помещается до следующей встречи — перепрыгиваем её
+            free_from = max(free_from, merged[j][1])
+            j += 1
+    return slots
+
+
+async def get_team_or_404(team_id: int, db: AsyncSession, with_members: bool = True) -> Team:
+    """
+    Получить команду по ID или выбросить 404 ошибку.
+    with_members=False — без загрузки участников (для больших команд).
+    """
+    stmt = select(Team).where(Team.id == team_id)
+    if with_members:
+        stmt = stmt.options(selectinload(Team.members))
+    result = await db.execute(stmt)
     team = result.scalars().first()
     if not team:
         raise HTTPException(status_code=404, detail="Команда не найдена")
@@ -124,17 +829,18 @@ async def get_team_or_404(team_id: int, db: AsyncSession) -> Team:
 
 async def get_task_or_404(task_id: int, db: AsyncSession) -> Task:
     """
-    Получить задачу с комментариями и оценками по ID или выбросить 404 ошибку.
+    Получить задачу с создателем и исполнителем (для проверки прав)
+    по ID или выбросить 404 ошибку. Комментарии и оценки не загружаются.
     """
     result = await db.execute(
         select(Task)
         .options(
-            selectinload(Task.comments),
-            selectinload(Task.evaluations),
             selectinload(Task.creator),
             selectinload(Task.assignee),
         )
         .where(Task.id == task_id)
+        # счётчики меняют триггеры: задача из identity map могла устареть
+        .execution_options(populate_existing=True)
     )
     task = result.scalars().first()
     if not task:
@@ -142,6 +848,148 @@ async def get_task_or_404(task_id: int, db: AsyncSession) -> Task:
     return task
 
 
+class TaskOwner(NamedTuple):
+    """
+    Поля задачи для проверки прав и сброса кэшей:
+    автор и исполнитель с их командами и дедлайн до изменения.
+    """
+    creator_id: int
+    team_id: Optional[int]
+    assignee_id: int
+    assignee_team_id: Optional[int]
+    deadline: Optional[datetime]
+
+    @property
+    def calendar_row(self) -> Tuple[Optional[int], Optional[int], Optional[datetime]]:
+        """Строка для invalidate_task_caches."""
+        return self.team_id, self.assignee_team_id, self.deadline
+
+
+def _task_owner_select():
+    assignee = aliased(User, name="assignee")
+    return (
+        select(Task.id, Task.creator_id, User.team_id, Task.assignee_id, assignee.team_id, Task.deadline)
+        .join(User, Task.creator_id == User.id)
+        .outerjoin(assignee, Task.assignee_id == assignee.id)
+    )
+
+
+def assignee_team_id_returning():
+    """
+    Команда исполнителя для RETURNING в INSERT/UPDATE задач — подзапрос
+    по первичному ключу users. Ссылки записаны явно: в RETURNING SQLite
+    колонки выводятся без имени таблицы, а INSERT не коррелирует подзапрос.
+    """
+    assignee = aliased(User, name="assignee")
+    return (
+        select(assignee.team_id)
+        .where(literal_column("assignee.id") == literal_column("tasks.assignee_id"))
+        .scalar_subquery()
+        .label("assignee_team_id")
+    )
+
+
+async def get_task_owners(task_ids: List[int], db: AsyncSession) -> Dict[int, TaskOwner]:
+    """
+    ID задачи -> TaskOwner: всё, что нужно для проверки прав,
+    одним запросом без загрузки самих задач. Отсутствующих задач в словаре нет.
+    """
+    result = await db.execute(_task_owner_select().where(Task.id.in_(set(task_ids))))
+    return {task_id: TaskOwner(*owner) for task_id, *owner in result.all()}
+
+
+async def get_task_owner_or_404(task_id: int, db: AsyncSession) -> TaskOwner:
+    """
+    TaskOwner задачи или 404 ошибка.
+    """
+    result = await db.execute(_task_owner_select().where(Task.id == task_id))
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    return TaskOwner(*row[1:])
+
+
+def can_update_task(current_user: User, creator_id: int, creator_team_id: Optional[int]) -> bool:
+    """
+    Изменять задачу могут её автор, админ и менеджер команды автора.
+    """
+    is_admin = current_user.role == UserRole.ADMIN
+    is_manager = current_user.role == UserRole.MANAGER
+    same_team = creator_team_id == current_user.team_id
+    return is_admin or (is_manager and same_team) or creator_id == current_user.id
+
+
+def can_delete_task(current_user: User, creator_id: int) -> bool:
+    """
+    Удалять задачу могут только её автор и админ.
+    """
+    return current_user.role == UserRole.ADMIN or creator_id == current_user.id
+
+
+def can_comment_task(current_user: User, task: Task) -> bool:
+    """
+    Читать и писать комментарии к задаче могут админ и участники
+    команды её автора или исполнителя.
+    """
+    teams = {task.creator.team_id, task.assignee.team_id if task.assignee else None}
+    return current_user.role == UserRole.ADMIN or current_user.team_id in teams
+
+
+def parse_task_include(
+    include: Optional[str] = Query(
+        None,
+        description="Связанные коллекции через запятую: comments, evaluations",
+    ),
+) -> FrozenSet[TaskInclude]:
+    """
+    Зависимость: разобрать параметр include или выбросить 400 ошибку.
+    """
+    if not include:
+        return frozenset()
+    try:
+        return frozenset(TaskInclude(part.strip()) for part in include.split(",") if part.strip())
+    except ValueError:
+        allowed = ", ".join(item.value for item in TaskInclude)
+        raise HTTPException(status_code=400, detail=f"Параметр include допускает только: {allowed}")
+
+
+def task_load_options(include: FrozenSet[TaskInclude]) -> list:
+    """
+    Опции selectinload только для запрошенных коллекций.
+    """
+    options = []
+    if TaskInclude.COMMENTS in include:
+        options.append(selectinload(Task.comments))
+    if TaskInclude.EVALUATIONS in include:
+        options.append(selectinload(Task.evaluations))
+    return options
+
+
+def completed_at_after(new_status) -> Any:
+    """
+    Значение completed_at для UPDATE, задающего статус new_status (TaskStatus
+    или SQL-выражение, как CASE пакетного изменения): при переходе в DONE —
+    текущий момент (наивный UTC, как в _completed_at при создании), у уже
+    выполненной задачи — прежнее значение, иначе NULL.
+    """
+    done_at = func.coalesce(Task.completed_at, to_naive_utc(datetime.now(timezone.utc)))
+    if isinstance(new_status, TaskStatus):
+        return done_at if new_status == TaskStatus.DONE else None
+    return case((new_status == TaskStatus.DONE, done_at), else_=None)
+
+
+def task_to_read(task: Task, include: FrozenSet[TaskInclude]) -> TaskRead:
+    """
+    Собрать ответ по задаче, обращаясь только к запрошенным коллекциям
+    (остальные не загружены, и ленивая загрузка в async-сессии недопустима).
+    """
+    return TaskRead(
+        **TaskSummary.model_validate(task).model_dump(),
+        comments=task.comments if TaskInclude.COMMENTS in include else None,
+        evaluations=task.evaluations if TaskInclude.EVALUATIONS in include else None,
+    )
+
+
 def assert_team_admin_or_global_admin(current_user: User, team: Team) -> None:
     """
     Проверить, что текущий пользователь - глобальный админ
@@ -151,6 +999,19 @@ def assert_team_admin_or_global_admin(current_user: User, team: Team) -> None:
         raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения операции")
 
 
+def assert_can_view_team_reports(current_user: User, team: Team) -> None:
+    """
+    Проверить доступ к отчётам команды (календарь, рейтинг, динамика оценок):
+    их видит админ этой команды и любой глобальный админ. Иначе 403 ошибка.
+    """
+    # Нарочно шире assert_team_admin_or_global_admin: состав и роли команды
+    # меняет только глобальный админ, который ею управляет, а отчёты лишь
+    # читают данные и нужны тому, кто ведёт команду, — обычно это менеджер
+    # с admin_id команды, у которого нет роли ADMIN
+    if current_user.role != UserRole.ADMIN and team.admin_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Недостаточно прав для выполнения операции")
+
+
 async def get_user_or_404(user_id: int, db: AsyncSession) -> User:
     """
     Получить пользователя по ID или выбросить 404 ошибку.
@@ -160,3 +1021,277 @@ async def get_user_or_404(user_id: int, db: AsyncSession) -> User:
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
     return user
+
+
+# -------------------------------------------------------------------
+# Сводка оценок по дням
+# -------------------------------------------------------------------
+
+def _ratio(numerator, denominator):
+    """
+    numerator / denominator без целочисленного деления. 1.0 литералом, а не
+    параметром: в PostgreSQL деление остаётся numeric, как у avg(score),
+    а в SQLite — вещественным, так что среднее по сводке совпадает
+    с усреднением исходных оценок до последнего знака.
+    """
+    return numerator * literal_column("1.0") / denominator
+
+
+async def get_average_score(db: AsyncSession, user_id: int, start: date, end: date) -> Optional[Any]:
+    """
+    Средний балл задач исполнителя по оценкам, созданным в дни [start, end] (UTC).
+    Читает не больше одной строки evaluation_daily на день периода.
+    """
+    stmt = (
+        select(_ratio(func.sum(EvaluationDaily.score_sum), func.sum(EvaluationDaily.score_count)))
+        .where(EvaluationDaily.user_id == user_id)
+        .where(EvaluationDaily.day >= start)
+        .where(EvaluationDaily.day <= end)
+        .having(func.sum(EvaluationDaily.score_count) > 0)
+    )
+    return (await db.execute(stmt)).scalar()
+
+
+async def rebuild_evaluation_daily(db: AsyncSession) -> int:
+    """
+    Перестроить evaluation_daily из оценок и задач целиком, например после
+    загрузки данных в обход триггеров. Возвращает число строк сводки; commit за вызывающим.
+    """
+    day = utc_date(Evaluation.created_at, _dialect(db))
+    await db.execute(delete(EvaluationDaily))
+    result = await db.execute(
+        insert(EvaluationDaily).from_select(
+            ["user_id", "day", "score_sum", "score_count"],
+            select(Task.assignee_id, day, func.sum(Evaluation.score), func.count(Evaluation.id))
+            .join(Task, Task.id == Evaluation.task_id)
+            .where(Task.assignee_id.is_not(None))
+            .group_by(Task.assignee_id, day)
+        )
+    )
+    return result.rowcount
+
+
+async def rebuild_task_counters(db: AsyncSession) -> int:
+    """
+    Пересчитать comment_count, has_evaluation и score задач по comments
+    и evaluations (обычно их ведут триггеры). Меняются только расходящиеся
+    строки; возвращает их число, commit за вызывающим.
+    """
+    comment_count = select(func.count(Comment.id)).where(Comment.task_id == Task.id).scalar_subquery()
+    score = select(Evaluation.score).where(Evaluation.task_id == Task.id).scalar_subquery()
+    has_evaluation = exists().where(Evaluation.task_id == Task.id)
+    result = await db.execute(
+        update(Task)
+        .where(or_(
+            Task.comment_count != comment_count,
+            Task.has_evaluation != has_evaluation,
+            Task.score.is_distinct_from(score),
+        ))
+        .values(comment_count=comment_count, has_evaluation=has_evaluation, score=score)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+class LeaderboardRow(NamedTuple):
+    user_id: int
+    email: str
+    average_score: Optional[Any]
+    evaluations: int
+    tasks_done: int
+    tasks_on_time: int
+    on_time_rate: Optional[Any]
+    rank: int
+    percentile: Any
+
+
+async def get_team_leaderboard(db: AsyncSession, team_id: int, start: date, end: date) -> List[LeaderboardRow]:
+    """
+    Рейтинг участников команды за дни [start, end] (UTC) одним запросом.
+    Средний балл — по сводке evaluation_daily, выполненные задачи — по индексу
+    (assignee_id, completed_at); задача без дедлайна считается выполненной в срок.
+    Места и перцентиль считают оконные функции по порядку: средний балл,
+    число выполненных задач, доля выполненных в срок (пустые значения — в конце).
+    """
+    members = select(User.id).where(User.team_id == team_id)
+
+    scores = (
+        select(
+            EvaluationDaily.user_id,
+            func.sum(EvaluationDaily.score_sum).label("score_sum"),
+            func.sum(EvaluationDaily.score_count).label("score_count"),
+        )
+        .where(EvaluationDaily.user_id.in_(members))
+        .where(EvaluationDaily.day >= start)
+        .where(EvaluationDaily.day <= end)
+        .group_by(EvaluationDaily.user_id)
+        .having(func.sum(EvaluationDaily.score_count) > 0)
+        .subquery()
+    )
+
+    range_start, range_end = day_bounds(start, end + timedelta(days=1))
+    on_time = or_(Task.deadline.is_(None), Task.completed_at <= Task.deadline)
+    done = (
+        select(
+            Task.assignee_id.label("user_id"),
+            func.count(Task.id).label("tasks_done"),
+            func.sum(case((on_time, 1), else_=0)).label("tasks_on_time"),
+        )
+        .where(Task.assignee_id.in_(members))
+        .where(Task.completed_at >= range_start)
+        .where(Task.completed_at < range_end)
+        .group_by(Task.assignee_id)
+        .subquery()
+    )
+
+    average = _ratio(scores.c.score_sum, scores.c.score_count)
+    tasks_done = func.coalesce(done.c.tasks_done, 0)
+    tasks_on_time = func.coalesce(done.c.tasks_on_time, 0)
+    on_time_rate = case((tasks_done > 0, _ratio(tasks_on_time, tasks_done)), else_=None)
+    order = [average.desc().nulls_last(), tasks_done.desc(), on_time_rate.desc().nulls_last()]
+
+    stmt = (
+        select(
+            User.id,
+            User.email,
+            average,
+            func.coalesce(scores.c.score_count, 0),
+            tasks_done,
+            tasks_on_time,
+            on_time_rate,
+            func.rank().over(order_by=order),
+            # доля участников, стоящих ниже: у первого 100, у последнего 0
+            literal(100) * (literal(1) - func.percent_rank().over(order_by=order)),
+        )
+        .outerjoin(scores, scores.c.user_id == User.id)
+        .outerjoin(done, done.c.user_id == User.id)
+        .where(User.team_id == team_id)
+        .order_by(*order, User.id)
+    )
+    return [LeaderboardRow(*row) for row in (await db.execute(stmt)).all()]
+
+
+# -------------------------------------------------------------------
+# Ряды оценок по неделям и месяцам
+# -------------------------------------------------------------------
+
+SERIES_MAX_DAYS = 5 * 366
+
+
+class SeriesPeriod(NamedTuple):
+    date_from: date
+    date_to: date
+    bucket: SeriesBucket
+
+
+def series_period(
+    date_from: date = Query(..., alias="from", description="Начало периода"),
+    date_to: date = Query(..., alias="to", description="Конец периода (включительно)"),
+    bucket: SeriesBucket = Query(SeriesBucket.WEEK, description="Шаг ряда: week или month"),
+) -> SeriesPeriod:
+    """
+    Зависимость: период и шаг ряда оценок или 400 ошибка.
+    """
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="Некорректный период: 'from' позже 'to'")
+    if (date_to - date_from).days >= SERIES_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Период не длиннее {SERIES_MAX_DAYS} дней")
+    return SeriesPeriod(date_from, date_to, bucket)
+
+
+def bucket_start(day: date, bucket: SeriesBucket) -> date:
+    """Начало шага, в который попадает день: понедельник или первое число."""
+    if bucket == SeriesBucket.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def _next_bucket(start: date, bucket: SeriesBucket) -> date:
+    if bucket == SeriesBucket.WEEK:
+        return start + timedelta(days=7)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+async def get_evaluation_histograms(
+    db: AsyncSession,
+    period: SeriesPeriod,
+    *,
+    user_id: Optional[int] = None,
+    team_id: Optional[int] = None,
+) -> List[Tuple[date, List[int]]]:
+    """
+    Число оценок 1–5 по шагам периода (дни UTC) для задач исполнителя user_id
+    или текущих участников команды team_id — одним запросом с GROUP BY (шаг, балл).
+    PostgreSQL округляет момент до шага сам: date_trunc('week' | 'month', ...).
+    В SQLite date_trunc нет: группировка идёт по дню, и дни сводятся в шаги
+    здесь же — из БД приходит не больше пяти строк на день периода.
+    Шаги без оценок возвращаются с нулевой гистограммой.
+    """
+    if user_id is not None:
+        assignees = Task.assignee_id == user_id
+    else:
+        assignees = Task.assignee_id.in_(select(User.id).where(User.team_id == team_id))
+
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        # шаг литералом: с параметрами SELECT и GROUP BY не совпали бы дословно
+        key = func.date(func.date_trunc(
+            literal_column(f"'{period.bucket.value}'"),
+            func.timezone(literal_column("'UTC'"), Evaluation.created_at),
+        ))
+    else:
+        key = utc_date(Evaluation.created_at, dialect)
+
+    range_start, range_end = day_bounds(period.date_from, period.date_to + timedelta(days=1))
+    stmt = (
+        select(key, Evaluation.score, func.count(Evaluation.id))
+        .join(Task, Task.id == Evaluation.task_id)
+        .where(assignees)
+        .where(Evaluation.created_at >= range_start)
+        .where(Evaluation.created_at < range_end)
+        .group_by(key, Evaluation.score)
+    )
+
+    histograms: Dict[date, List[int]] = {}
+    start = bucket_start(period.date_from, period.bucket)
+    while start <= period.date_to:
+        histograms[start] = [0] * 5
+        start = _next_bucket(start, period.bucket)
+
+    for day, score, count in (await db.execute(stmt)).all():
+        if isinstance(day, str):  # SQLite возвращает date() строкой
+            day = date.fromisoformat(day)
+        histograms[bucket_start(day, period.bucket)][score - 1] += count
+    return list(histograms.items())
+
+
+def _histogram_average(histogram: List[int]) -> Optional[float]:
+    count = sum(histogram)
+    if not count:
+        return None
+    return round(sum(score * n for score, n in enumerate(histogram, start=1)) / count, 2)
+
+
+def evaluation_series(period: SeriesPeriod, histograms: List[Tuple[date, List[int]]]) -> EvaluationSeries:
+    """
+    Ответ ряда оценок: точки по шагам и итог за период. Среднее
+    считается по гистограмме — сумма баллов из БД отдельно не нужна.
+    """
+    total = [sum(column) for column in zip(*(histogram for _, histogram in histograms))] or [0] * 5
+    return EvaluationSeries(
+        date_from=period.date_from,
+        date_to=period.date_to,
+        bucket=period.bucket,
+        count=sum(total),
+        average_score=_histogram_average(total),
+        histogram=total,
+        points=[
+            EvaluationSeriesPoint(
+                start=start,
+                count=sum(histogram),
+                average_score=_histogram_average(histogram),
+                histogram=histogram,
+            )
+            for start, histogram in histograms
+        ],
+    )
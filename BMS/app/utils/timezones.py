@@ -0,0 +1,123 @@
+import re
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import HTTPException
+from sqlalchemy import case, func, literal, literal_column
+from sqlalchemy.sql import ColumnElement
+
+
+# -------------------------------------------------------------------
+# Часовые пояса календаря
+# -------------------------------------------------------------------
+
+UTC = ZoneInfo("UTC")
+
+# Имена IANA; только такие попадают в текст SQL (см. local_date)
+_ZONE_NAME = re.compile(r"^[A-Za-z0-9_+\-/]+$")
+
+
+@lru_cache(maxsize=1024)
+def get_zone(name: str) -> Optional[ZoneInfo]:
+    """ZoneInfo по имени IANA или None, если такого пояса нет."""
+    if not _ZONE_NAME.match(name):
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def parse_timezone(name: str) -> ZoneInfo:
+    """ZoneInfo по имени IANA или 400 ошибка."""
+    zone = get_zone(name)
+    if zone is None:
+        raise HTTPException(status_code=400, detail=f"Неизвестный часовой пояс: {name}")
+    return zone
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """
+    Привести datetime к наивному UTC, в котором хранятся и сравниваются
+    времена встреч (SQLite возвращает наивные значения, PostgreSQL — с зоной).
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def to_local(value: datetime, tz: tzinfo) -> datetime:
+    """Локальное время в tz; наивные значения считаются UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(tz)
+
+
+def local_midnight(day: date, tz: tzinfo) -> datetime:
+    """Начало локальных суток day в tz как наивное UTC."""
+    return to_naive_utc(datetime.combine(day, time.min, tzinfo=tz))
+
+
+def offset_segments(tz: tzinfo, start: datetime, end: datetime) -> List[Tuple[Optional[datetime], int]]:
+    """
+    Смещение tz от UTC в секундах на [start, end) (наивное UTC) по отрезкам:
+    (момент смены смещения или None для последнего отрезка, смещение).
+    Переходы ищутся шагом в час и уточняются делением пополам до секунды.
+    """
+    def offset(moment: datetime) -> int:
+        return int(moment.replace(tzinfo=timezone.utc).astimezone(tz).utcoffset().total_seconds())
+
+    segments = []
+    current, cursor = offset(start), start
+    while cursor < end:
+        step = min(cursor + timedelta(hours=1), end)
+        if offset(step) != current:
+            low, high = cursor, step
+            while high - low > timedelta(seconds=1):
+                middle = low + (high - low) / 2
+                if offset(middle) == current:
+                    low = middle
+                else:
+                    high = middle
+            segments.append((high.replace(microsecond=0), current))
+            current = offset(high)
+        cursor = step
+    segments.append((None, current))
+    return segments
+
+
+def utc_date(column: ColumnElement, dialect: str):
+    """Дата UTC столбца-момента, не зависящая от часового пояса сессии БД."""
+    if dialect == "postgresql":
+        return func.date(func.timezone(literal_column("'UTC'"), column))
+    return func.date(column)
+
+
+def local_date(column: ColumnElement, tz: ZoneInfo, start: datetime, end: datetime, dialect: str):
+    """
+    Локальная дата столбца-момента в tz для значений из [start, end).
+    PostgreSQL переводит сам: date(timezone('Europe/Moscow', column)).
+    SQLite часовых поясов не знает: смещения на окне вычисляются здесь,
+    и выражение — date(column, '+N seconds') или CASE по моментам перехода
+    на летнее/зимнее время. Имя пояса и смещения попадают в текст SQL,
+    чтобы одинаковое выражение в SELECT и GROUP BY совпадало дословно.
+    """
+    if not _ZONE_NAME.match(tz.key):
+        raise ValueError(f"Недопустимое имя часового пояса: {tz.key}")
+    if tz.key == "UTC":
+        return utc_date(column, dialect)
+    if dialect == "postgresql":
+        return func.date(func.timezone(literal_column(f"'{tz.key}'"), column))
+
+    def shifted(seconds: int):
+        return func.date(column, literal_column(f"'{seconds:+d} seconds'"))
+
+    segments = offset_segments(tz, start, end)
+    if len(segments) == 1:
+        return shifted(segments[0][1])
+    return case(
+        *[(column < literal(switch_at), shifted(seconds)) for switch_at, seconds in segments[:-1]],
+        else_=shifted(segments[-1][1]),
+    )
@@ -0,0 +1,81 @@
+"""
+Поиск общего свободного слота: перебор с проверкой конфликтов
+против одного запроса занятости и прохода по отсортированным интервалам.
+
+Запуск из каталога BMS:
+    python -m benchmarks.bench_availability
+"""
+import asyncio
+from datetime import datetime, time, timedelta
+
+from fastapi import HTTPException
+
+from app.utils.services import check_time_conflicts, find_free_slots, get_busy_intervals
+from benchmarks.common import make_engine, make_sessionmaker, measure, report, reset_schema, seed_team
+
+
+START = datetime(2025, 6, 2)  # понедельник
+DAYS = 14
+DURATION = timedelta(minutes=30)
+LIMITS = (5, 40)
+STEP = timedelta(minutes=15)
+
+
+async def guess_and_retry(db, user_ids: list, limit: int) -> list:
+    """Прежний путь: пробовать время за временем, пока check_time_conflicts не перестанет отказывать."""
+    slots = []
+    for d in range(DAYS):
+        day = START + timedelta(days=d)
+        if day.weekday() >= 5:
+            continue
+        t, day_end = day.replace(hour=9), day.replace(hour=18)
+        while t + DURATION <= day_end and len(slots) < limit:
+            try:
+                await check_time_conflicts(user_ids, t, t + DURATION, db)
+            except HTTPException:
+                t += STEP
+                continue
+            slots.append((t, t + DURATION))
+            t += DURATION
+    return slots
+
+
+async def sweep(db, user_ids: list, limit: int) -> list:
+    """Новый путь: один запрос занятости и один проход в памяти."""
+    end = START + timedelta(days=DAYS)
+    busy = await get_busy_intervals(user_ids, START, end, db)
+    return find_free_slots(busy, START, end, DURATION, time(9), time(18), limit)
+
+
+async def main() -> None:
+    engine = make_engine()
+    Session = make_sessionmaker(engine)
+    await reset_schema(engine)
+
+    async with Session() as db:
+        seeded = await seed_team(db, members=99, tasks=0, meetings=1_500, start=START, days=DAYS)
+        # фон: другие команды, чтобы брони не помещались в одну страницу индекса
+        for n in range(3):
+            await seed_team(db, name=f"Other{n}", members=99, tasks=0, meetings=2_000,
+                            start=START - timedelta(days=60), days=120, seed=n)
+    user_ids = [seeded.manager_id, *seeded.member_ids]
+
+    for limit in LIMITS:
+        async with Session() as db:
+            with measure(engine) as old:
+                old_slots = await guess_and_retry(db, user_ids, limit)
+        async with Session() as db:
+            with measure(engine) as new:
+                new_slots = await sweep(db, user_ids, limit)
+
+        assert old_slots == new_slots, "Результаты путей расходятся"
+        report(
+            f"{limit} общих слотов по {DURATION.seconds // 60} мин для {len(user_ids)} "
+            f"пользователей за {DAYS} дней (найдено {len(new_slots)})",
+            [("перебор с проверкой", old), ("занятость + проход", new)],
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+Комментарии задачи-инцидента с десятками тысяч комментариев: весь список
+одним запросом против keyset-страниц по (created_at, id) и выгрузки NDJSON.
+
+Запуск из каталога BMS:
+    python -m benchmarks.bench_comments
+"""
+import asyncio
+import tracemalloc
+
+from sqlalchemy import func, select, update
+
+from app.models.comment import Comment
+from app.routers.tasks import _comments_after, _comments_ndjson
+from app.schemas.comment import CommentRead
+from benchmarks.common import make_engine, make_sessionmaker, measure, report, reset_schema, seed_team
+
+
+COMMENTS = 50_000
+PAGE = 50
+
+
+async def load_all(Session, task_id: int) -> int:
+    """Прежний путь: все комментарии задачи списком без порядка и лимита."""
+    async with Session() as db:
+        comments = (await db.execute(select(Comment).where(Comment.task_id == task_id))).scalars().all()
+        return len([CommentRead.model_validate(c).model_dump_json() for c in comments])
+
+
+async def load_page(Session, task_id: int, cursor=None) -> int:
+    """Новый путь: одна страница по индексу (task_id, created_at, id)."""
+    async with Session() as db:
+        comments = (await db.execute(_comments_after(task_id, cursor).limit(PAGE + 1))).scalars().all()
+        return len(comments[:PAGE])
+
+
+async def stream_all(Session, task_id: int) -> int:
+    """Выгрузка NDJSON: серверный курсор пачками, строки сразу отдаются."""
+    lines = 0
+    async for _ in _comments_ndjson(Session, task_id, None):
+        lines += 1
+    return lines
+
+
+async def run(engine, name: str, read):
+    """Время, число запросов и пик памяти Python за прогон."""
+    tracemalloc.start()
+    with measure(engine) as m:
+        rows = await read()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (name, m), peak, rows
+
+
+async def main() -> None:
+    engine = make_engine()
+    Session = make_sessionmaker(engine)
+    await reset_schema(engine)
+
+    async with Session() as db:
+        await seed_team(db, members=5, tasks=100, meetings=0, comments=COMMENTS)
+        # все комментарии — на одной задаче
+        task_id = (await db.execute(select(func.min(Comment.task_id)))).scalar_one()
+        await db.execute(update(Comment).values(task_id=task_id))
+        await db.commit()
+        middle = (await db.execute(
+            _comments_after(task_id, None).offset(COMMENTS // 2).limit(1)
+        )).scalar_one()
+
+    results = [
+        await run(engine, "весь список", lambda: load_all(Session, task_id)),
+        await run(engine, f"страница {PAGE}, первая", lambda: load_page(Session, task_id)),
+        await run(engine, f"страница {PAGE}, середина",
+                  lambda: load_page(Session, task_id, (middle.created_at, middle.id))),
+        await run(engine, "NDJSON потоком", lambda: stream_all(Session, task_id)),
+    ]
+    assert results[0][2] == results[3][2] == COMMENTS, "Выгрузка неполная"
+
+    report(f"Комментарии задачи: {COMMENTS} шт.", [r[0] for r in results])
+    print(f"\n{'Вариант':<28}| {'Пик памяти, КБ':>14}")
+    print("-" * 45)
+    for (name, _), peak, _ in results:
+        print(f"{name:<28}| {peak / 1024:>14.0f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Ряд оценок пользователя по неделям за год: оценки по каждой задаче
+(как через GET /tasks/{id}/evaluations) против одного запроса
+с GROUP BY (шаг, балл).
+
+Запуск из каталога BMS:
+    python -m benchmarks.bench_evaluation_series
+"""
+import asyncio
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import select
+
+from app.models.evaluation import Evaluation
+from app.models.task import Task, TaskStatus
+from app.schemas.evaluation import SeriesBucket
+from app.utils.services import SeriesPeriod, bucket_start, get_evaluation_histograms
+from benchmarks.common import make_engine, make_sessionmaker, measure, report, reset_schema, seed_team
+
+
+PERIOD = SeriesPeriod(date(2025, 1, 1), date(2025, 12, 31), SeriesBucket.WEEK)
+
+
+async def per_task(db, user_id: int) -> dict:
+    """Прежний путь: список задач, затем оценки каждой задачи отдельным запросом."""
+    task_ids = (await db.execute(
+        select(Task.id).where(Task.assignee_id == user_id, Task.status == TaskStatus.DONE)
+    )).scalars().all()
+    histograms = defaultdict(lambda: [0] * 5)
+    for task_id in task_ids:
+        for evaluation in (await db.execute(
+            select(Evaluation).where(Evaluation.task_id == task_id)
+        )).scalars():
+            day = evaluation.created_at.date()
+            if PERIOD.date_from <= day <= PERIOD.date_to:
+                histograms[bucket_start(day, PERIOD.bucket)][evaluation.score - 1] += 1
+    return dict(histograms)
+
+
+async def grouped(db, user_id: int) -> dict:
+    """Новый путь: гистограммы по неделям одним запросом."""
+    return {start: histogram for start, histogram in await get_evaluation_histograms(db, PERIOD, user_id=user_id)
+            if any(histogram)}
+
+
+async def main() -> None:
+    engine = make_engine()
+    Session = make_sessionmaker(engine)
+    await reset_schema(engine)
+
+    async with Session() as db:
+        seeded = await seed_team(db, members=5, tasks=30_000, meetings=0, evaluations=True)
+    user_id = seeded.member_ids[0]
+
+    async with Session() as db:
+        with measure(engine) as old:
+            old_rows = await per_task(db, user_id)
+    async with Session() as db:
+        with measure(engine) as new:
+            new_rows = await grouped(db, user_id)
+    assert old_rows == new_rows, "Результаты путей расходятся"
+
+    count = sum(sum(histogram) for histogram in new_rows.values())
+    report(f"Ряд оценок по неделям: оценок {count}, недель с оценками {len(new_rows)}", [
+        ("запрос на задачу", old),
+        ("GROUP BY (шаг, балл)", new),
+    ])
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
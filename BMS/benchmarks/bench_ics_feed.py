@@ -0,0 +1,80 @@
+"""
+Лента ICS за три года: список целиком (scalars().all() и одна строка ответа)
+против потока (stream_scalars пачками и отдача по одному событию).
+
+Запуск из каталога BMS:
+    python -m benchmarks.bench_ics_feed
+"""
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime
+
+from sqlalchemy import or_, select
+
+from app.models.meeting import Meeting, MeetingBooking
+from app.models.task import Task
+from app.routers.calendar import _feed_body
+from app.utils.ical import CALENDAR_FOOTER, calendar_header, meeting_vevent, task_vtodo
+from benchmarks.common import make_engine, make_sessionmaker, reset_schema, seed_team
+
+
+START, END = datetime(2023, 1, 1), datetime(2026, 1, 1)
+
+
+async def whole(Session, user_id: int) -> int:
+    """Прежний подход: всё в памяти, затем один ответ."""
+    async with Session() as db:
+        tasks = (await db.scalars(
+            select(Task)
+            .where(or_(Task.assignee_id == user_id, Task.creator_id == user_id))
+            .where(Task.deadline >= START, Task.deadline < END)
+            .order_by(Task.deadline, Task.id)
+        )).all()
+        meetings = (await db.scalars(
+            select(Meeting)
+            .join(MeetingBooking, MeetingBooking.meeting_id == Meeting.id)
+            .where(MeetingBooking.user_id == user_id)
+            .where(MeetingBooking.start_time >= START, MeetingBooking.start_time < END)
+        )).all()
+        body = "".join([
+            calendar_header("bench"),
+            *(task_vtodo(t, START) for t in tasks),
+            *(meeting_vevent(m, None, START) for m in meetings),
+            CALENDAR_FOOTER,
+        ])
+    return len(body)
+
+
+async def streamed(Session, user_id: int) -> int:
+    """Новый подход: тело ленты отдаётся по мере чтения курсора."""
+    size = 0
+    async for chunk in _feed_body(Session, user_id, "bench", START, END, START):
+        size += len(chunk)
+    return size
+
+
+async def main() -> None:
+    engine = make_engine()
+    Session = make_sessionmaker(engine)
+    await reset_schema(engine)
+
+    async with Session() as db:
+        seeded = await seed_team(db, members=3, tasks=150_000, meetings=20_000, start=START, days=3 * 365)
+        await db.commit()
+
+    print(f"{'Вариант':<22}| {'Время, мс':>10} | {'Пик памяти, МБ':>15} | {'Ответ, МБ':>10}")
+    print("-" * 67)
+    for name, read in (("список целиком", whole), ("поток", streamed)):
+        tracemalloc.start()
+        started = time.perf_counter()
+        size = await read(Session, seeded.manager_id)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:<22}| {elapsed * 1000:>10.0f} | {peak / 2**20:>15.1f} | {size / 2**20:>10.1f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
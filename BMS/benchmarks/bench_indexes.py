@@ -0,0 +1,132 @@
+"""
+Горячие фильтры по внешним ключам: без индексов ревизии a7d3f1c02b6e и с ними.
+
+Запуск из каталога BMS (лучше на PostgreSQL, см. benchmarks/common.py):
+    python -m benchmarks.bench_indexes
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+
+from app.core.database import Base
+from app.models.comment import Comment
+from app.models.evaluation import Evaluation
+from app.models.meeting import Meeting, meeting_participants_association
+from app.models.task import Task
+from app.models.user import User
+from benchmarks.common import (
+    Measurement, make_engine, make_sessionmaker, measure, report, reset_schema, seed_team,
+)
+
+
+# Индексы, добавленные ревизией a7d3f1c02b6e (индексы задач — в редакции c4e9b7a15d23,
+# индекс комментариев — в редакции 8b3e6a0f2c71)
+NEW_INDEXES = {
+    "ix_tasks_assignee_id_deadline_id",
+    "ix_tasks_creator_id_deadline_id",
+    "ix_tasks_assignee_id_created_at_id",
+    "ix_tasks_creator_id_created_at_id",
+    "ix_comments_task_id_created_at_id",
+    "ix_evaluations_created_at",
+    "ix_users_team_id",
+    "ix_meeting_participants_user_id_meeting_id",
+}
+ROUNDS = 200
+
+
+def _indexes():
+    return [
+        index
+        for table in Base.metadata.tables.values()
+        for index in table.indexes
+        if index.name in NEW_INDEXES
+    ]
+
+
+async def set_indexes(engine, enabled: bool) -> None:
+    async with engine.begin() as conn:
+        for index in _indexes():
+            if enabled:
+                await conn.run_sync(lambda c, i=index: i.create(c, checkfirst=True))
+            else:
+                await conn.run_sync(lambda c, i=index: i.drop(c, checkfirst=True))
+        await conn.execute(text("ANALYZE"))
+
+
+def workload(team_id: int, user_ids: list, task_ids: list):
+    """Пары (название, фабрика запроса) для типичных фильтров приложения."""
+    rnd = random.Random(7)
+    since = datetime(2025, 3, 1)
+    return [
+        ("задачи исполнителя", lambda: select(Task.id).where(Task.assignee_id == rnd.choice(user_ids))),
+        ("задачи исполнителя по сроку", lambda: (
+            select(Task.id)
+            .where(Task.assignee_id == rnd.choice(user_ids))
+            .where(Task.deadline >= since, Task.deadline < since + timedelta(days=30))
+            .order_by(Task.deadline)
+        )),
+        ("задачи автора", lambda: select(Task.id).where(Task.creator_id == rnd.choice(user_ids))),
+        ("комментарии задачи", lambda: select(Comment.id).where(Comment.task_id == rnd.choice(task_ids))),
+        ("оценки за период", lambda: (
+            select(func.avg(Evaluation.score))
+            .join(Task, Evaluation.task_id == Task.id)
+            .where(Task.assignee_id == rnd.choice(user_ids))
+            .where(Evaluation.created_at >= since, Evaluation.created_at < since + timedelta(days=30))
+        )),
+        ("участники команды", lambda: select(User.id).where(User.team_id == team_id)),
+        ("встречи пользователя", lambda: (
+            select(Meeting.id)
+            .join(meeting_participants_association)
+            .where(meeting_participants_association.c.user_id == rnd.choice(user_ids))
+        )),
+    ]
+
+
+async def run(engine, Session, queries) -> list:
+    rows = []
+    async with Session() as db:
+        for name, build in queries:
+            total = Measurement()
+            for _ in range(ROUNDS):
+                with measure(engine) as m:
+                    await db.execute(build())
+                total.queries += m.queries
+                total.seconds += m.seconds
+            rows.append((name, total))
+    return rows
+
+
+async def main() -> None:
+    engine = make_engine()
+    Session = make_sessionmaker(engine)
+    await reset_schema(engine)
+
+    async with Session() as db:
+        # Несколько команд, чтобы фильтр по team_id был селективным
+        for n in range(5):
+            await seed_team(
+                db, name=f"Bench{n}", members=200, tasks=40_000, meetings=4_000,
+                comments=80_000, evaluations=True, seed=n,
+            )
+        seeded = await seed_team(db, name="Target", members=200, tasks=40_000,
+                                 meetings=4_000, comments=80_000, evaluations=True)
+        task_ids = (await db.execute(
+            select(Task.id).where(Task.creator_id == seeded.manager_id)
+        )).scalars().all()
+
+    user_ids = [seeded.manager_id, *seeded.member_ids]
+
+    await set_indexes(engine, enabled=False)
+    before = await run(engine, Session, workload(seeded.team_id, user_ids, task_ids))
+    await set_indexes(engine, enabled=True)
+    after = await run(engine, Session, workload(seeded.team_id, user_ids, task_ids))
+
+    report(f"Без индексов, {ROUNDS} запросов каждого вида", before)
+    report(f"С индексами, {ROUNDS} запросов каждого вида", after)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
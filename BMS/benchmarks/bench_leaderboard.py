@@ -0,0 +1,93 @@
+"""
+Рейтинг команды из 2 000 участников: запросы на каждого участника
+(как при обходе /me/average_evaluation) против одного запроса
+с оконными функциями и ответа из кэша.
+
+Запуск из каталога BMS:
+    python -m benchmarks.bench_leaderboard
+"""
+import asyncio
+from datetime import date, timedelta
+
+from sqlalchemy import func, or_, select
+
+from app.models.evaluation import Evaluation
+from app.models.task import Task
+from app.utils.cache import LeaderboardCache, LeaderboardKey
+from app.utils.services import day_bounds, get_team_leaderboard
+from benchmarks.common import make_engine, make_sessionmaker, measure, report, reset_schema, seed_team
+
+
+MEMBERS = 2_000
+DATE_FROM, DATE_TO = date(2025, 3, 1), date(2025, 8, 31)
+
+
+def _score(value):
+    # SQLite отдаёт отношение с литералом 1.0 как Decimal, avg() — как float
+    return None if value is None else round(float(value), 6)
+
+
+async def per_member(db, member_ids) -> dict:
+    """Прежний путь: среднее по сырым оценкам и счётчики задач на каждого участника."""
+    start, end = day_bounds(DATE_FROM, DATE_TO + timedelta(days=1))
+    result = {}
+    for user_id in member_ids:
+        average = (await db.execute(
+            select(func.avg(Evaluation.score))
+            .join(Task, Evaluation.task_id == Task.id)
+            .where(Task.assignee_id == user_id)
+            .where(Evaluation.created_at >= start, Evaluation.created_at < end)
+        )).scalar()
+        done, on_time = (await db.execute(
+            select(func.count(Task.id), func.count(Task.id).filter(
+                or_(Task.deadline.is_(None), Task.completed_at <= Task.deadline)
+            ))
+            .where(Task.assignee_id == user_id)
+            .where(Task.completed_at >= start, Task.completed_at < end)
+        )).one()
+        result[user_id] = (_score(average), done, on_time)
+    return result
+
+
+async def window(db, team_id: int) -> dict:
+    """Новый путь: один запрос с rank() и percent_rank() по сводке оценок."""
+    rows = await get_team_leaderboard(db, team_id, DATE_FROM, DATE_TO)
+    return {
+        row.user_id: (_score(row.average_score), row.tasks_done, row.tasks_on_time)
+        for row in rows
+    }
+
+
+async def main() -> None:
+    engine = make_engine()
+    Session = make_sessionmaker(engine)
+    await reset_schema(engine)
+
+    async with Session() as db:
+        seeded = await seed_team(db, members=MEMBERS, tasks=40_000, meetings=0, evaluations=True)
+    everyone = [seeded.manager_id, *seeded.member_ids]
+
+    async with Session() as db:
+        with measure(engine) as old:
+            old_rows = await per_member(db, everyone)
+    async with Session() as db:
+        with measure(engine) as new:
+            new_rows = await window(db, seeded.team_id)
+    assert old_rows == new_rows, "Результаты путей расходятся"
+
+    cache = LeaderboardCache(maxsize=10, ttl=600)
+    key = LeaderboardKey(seeded.team_id, DATE_FROM, DATE_TO)
+    cache.set(key, new_rows, cache.generation())
+    with measure(engine) as cached:
+        assert cache.get(key) == new_rows
+
+    report(f"Рейтинг команды: {len(everyone)} участников, {DATE_FROM}..{DATE_TO}", [
+        ("запросы на участника", old),
+        ("оконные функции", new),
+        ("из кэша", cached),
+    ])
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
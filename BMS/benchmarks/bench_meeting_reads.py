@@ -0,0 +1,106 @@
+"""
+Чтение встреч пользователя с тысячами встреч: selectinload(Meeting.participants)
+против ID участников агрегатом (array_agg / group_concat) и keyset-страниц.
+
+Запуск из каталога BMS:
+    python -m benchmarks.bench_meeting_reads
+"""
+import asyncio
+import tracemalloc
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from app.models.meeting import Meeting, MeetingBooking, meeting_participants_association
+from app.utils.pagination import keyset_after
+from app.utils.services import meeting_participant_ids, parse_id_list
+from benchmarks.common import make_engine, make_sessionmaker, measure, report, reset_schema, seed_team
+
+
+PAGE = 50
+ROUNDS = 5
+
+
+async def load_users(db, user_id: int) -> list:
+    """Прежний путь: встречи и полные объекты User всех участников."""
+    result = await db.execute(
+        select(Meeting)
+        .options(selectinload(Meeting.participants))
+        .join(meeting_participants_association)
+        .where(meeting_participants_association.c.user_id == user_id)
+    )
+    return [(m.id, [u.id for u in m.participants]) for m in result.scalars().all()]
+
+
+async def load_ids(db, user_id: int, limit=None, after=None) -> list:
+    """Новый путь: ID участников агрегатом в строке встречи, по индексу броней."""
+    stmt = (
+        select(Meeting, meeting_participant_ids())
+        .join(MeetingBooking, MeetingBooking.meeting_id == Meeting.id)
+        .where(MeetingBooking.user_id == user_id)
+        .order_by(MeetingBooking.start_time, MeetingBooking.meeting_id)
+    )
+    if after:
+        stmt = stmt.where(keyset_after(MeetingBooking.start_time, MeetingBooking.meeting_id, *after))
+    if limit:
+        stmt = stmt.limit(limit)
+    result = await db.execute(stmt)
+    return [(m.id, parse_id_list(ids)) for m, ids in result.all()]
+
+
+async def run(engine, Session, name: str, read):
+    """Среднее по ROUNDS прогонам в новой сессии и пик памяти Python за прогон."""
+    total, peak, rows = None, 0, None
+    for _ in range(ROUNDS):
+        async with Session() as db:
+            tracemalloc.start()
+            with measure(engine) as m:
+                rows = await read(db)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        if total is None:
+            total = m
+        else:
+            total.seconds += m.seconds
+    total.seconds /= ROUNDS
+    return (name, total), peak, rows
+
+
+async def main() -> None:
+    engine = make_engine()
+    Session = make_sessionmaker(engine)
+    await reset_schema(engine)
+
+    async with Session() as db:
+        seeded = await seed_team(db, members=30, tasks=0, meetings=20_000)
+        user_id = seeded.manager_id
+        count = (await db.execute(
+            select(func.count()).select_from(MeetingBooking).where(MeetingBooking.user_id == user_id)
+        )).scalar_one()
+        middle = (await db.execute(
+            select(MeetingBooking.start_time, MeetingBooking.meeting_id)
+            .where(MeetingBooking.user_id == user_id)
+            .order_by(MeetingBooking.start_time, MeetingBooking.meeting_id)
+            .offset(count // 2).limit(1)
+        )).one()
+
+    results = [
+        await run(engine, Session, "selectinload, все", lambda db: load_users(db, user_id)),
+        await run(engine, Session, "ID агрегатом, все", lambda db: load_ids(db, user_id)),
+        await run(engine, Session, f"страница {PAGE}, первая", lambda db: load_ids(db, user_id, PAGE)),
+        await run(engine, Session, f"страница {PAGE}, середина",
+                  lambda db: load_ids(db, user_id, PAGE, (middle.start_time, middle.meeting_id))),
+    ]
+    old_rows, new_rows = results[0][2], results[1][2]
+    assert sorted(old_rows) == sorted((mid, sorted(ids)) for mid, ids in new_rows), "Результаты путей расходятся"
+
+    report(f"Встречи пользователя: {count} шт., среднее из {ROUNDS}", [r[0] for r in results])
+    print(f"\n{'Вариант':<28}| {'Пик памяти, КБ':>14}")
+    print("-" * 45)
+    for (name, _), peak, _ in results:
+        print(f"{name:<28}| {peak / 1024:>14.0f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Месячный календарь: запрос на каждый день против сгруппированных запросов.
+
+Запуск из каталога BMS:
+    python -m benchmarks.bench_monthly_calendar
+"""
+import asyncio
+import calendar as pycal
+from datetime import date, datetime, timedelta
+
+from app.utils.services import (
+    count_meetings_by_day,
+    count_tasks_by_day,
+    get_meetings_for_date,
+    get_tasks_for_date,
+)
+from benchmarks.common import make_engine, make_sessionmaker, measure, report, reset_schema, seed_team
+
+
+YEAR, MONTH = 2025, 6
+
+
+async def per_day(db, team_id: int, user_id: int) -> dict:
+    """Прежний путь: по два запроса на каждый день месяца."""
+    _, days = pycal.monthrange(YEAR, MONTH)
+    counts = {}
+    for day in range(1, days + 1):
+        d = date(YEAR, MONTH, day)
+        tasks = await get_tasks_for_date(db, team_id, d)
+        meetings = await get_meetings_for_date(db, user_id, d)
+        counts[d] = (len(tasks), len({m.id for m in meetings}))
+    return counts
+
+
+async def aggregated(db, team_id: int, user_id: int) -> dict:
+    """Новый путь: по одному сгруппированному запросу на задачи и встречи."""
+    _, days = pycal.monthrange(YEAR, MONTH)
+    first = date(YEAR, MONTH, 1)
+    end = first + timedelta(days=days)
+    tasks = await count_tasks_by_day(db, team_id, first, end)
+    meetings = await count_meetings_by_day(db, user_id, first, end)
+    return {
+        first + timedelta(days=i): (tasks.get(first + timedelta(days=i), 0),
+                                    meetings.get(first + timedelta(days=i), 0))
+        for i in range(days)
+    }
+
+
+async def main() -> None:
+    engine = make_engine()
+    Session = make_sessionmaker(engine)
+    await reset_schema(engine)
+
+    async with Session() as db:
+        seeded = await seed_team(db, tasks=30_000, meetings=3_000, start=datetime(2025, 1, 1))
+
+    async with Session() as db:
+        with measure(engine) as old:
+            old_counts = await per_day(db, seeded.team_id, seeded.manager_id)
+    async with Session() as db:
+        with measure(engine) as new:
+            new_counts = await aggregated(db, seeded.team_id, seeded.manager_id)
+
+    assert old_counts == new_counts, "Результаты путей расходятся"
+    report(
+        f"Месячный календарь {YEAR}-{MONTH:02d}, 30 000 задач в команде",
+        [("запросы по дням", old), ("сгруппированные запросы", new)],
+    )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
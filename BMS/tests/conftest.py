@@ -6,8 +6,11 @@ import pytest_asyncio
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
-from app.core.database import get_async_session, Base  # import Base from your models
+from app.core.database import (  # import Base from your models
+    get_async_session, get_read_session, get_stream_session_factory, instrument_engine, Base,
+)
 from app.main import app
+from app.utils.cache import calendar_cache, leaderboard_cache
 
 # 2) In-memory SQLite URL
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -15,6 +18,7 @@ TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 # 3) Создаём движок и sessionmaker
 engine_test = create_async_engine(TEST_DATABASE_URL, future=True, echo=False)
 TestSessionLocal = sessionmaker(bind=engine_test, class_=AsyncSession, expire_on_commit=False)
+instrument_engine(engine_test)  # заголовки X-DB-Queries и в тестах
 
 
 @pytest_asyncio.fixture(scope="function", autouse=True)
@@ -29,6 +33,16 @@ async def init_test_db():
     await engine_test.dispose()
 
 
+@pytest_asyncio.fixture(autouse=True)
+def clear_calendar_cache():
+    """Кэши календаря и рейтинга живут в процессе — каждый тест начинает с пустых."""
+    calendar_cache.clear()
+    leaderboard_cache.clear()
+    yield
+    calendar_cache.clear()
+    leaderboard_cache.clear()
+
+
 @pytest_asyncio.fixture
 async def db_session(init_test_db) -> AsyncSession:
     """Каждый тест получает свою сессию на тот же движок."""
@@ -39,12 +53,15 @@ async def db_session(init_test_db) -> AsyncSession:
 @pytest_asyncio.fixture(autouse=True)
 def override_db_dependency(db_session: AsyncSession):
     """
-    Автоматически подменяем get_async_session → нашу in‑memory сессию.
+    Автоматически подменяем get_async_session и get_read_session → нашу in‑memory сессию.
     """
     async def _get_test_session():
         yield db_session
 
     app.dependency_overrides[get_async_session] = _get_test_session
+    app.dependency_overrides[get_read_session] = _get_test_session
+    # Потоковые ответы открывают свою сессию на тот же движок
+    app.dependency_overrides[get_stream_session_factory] = lambda: TestSessionLocal
 
 
 @pytest_asyncio.fixture
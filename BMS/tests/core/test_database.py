@@ -0,0 +1,71 @@
+# tests/core/test_database.py
+import pytest
+from types import SimpleNamespace
+
+from fastapi import status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.auth import current_active_user
+from app.core.config import ENGINE_PRESETS, Settings
+from app.core.database import QueryStats, TimedAsyncQueuePool, pool_metrics, query_stats
+from app.main import app
+from app.models.user import UserRole
+
+
+def test_engine_profile_uses_mode_preset():
+    prod = Settings(MODE="PROD")
+    assert prod.engine_profile == ENGINE_PRESETS["PROD"]
+
+    options = prod.engine_options
+    assert options["echo"] is False
+    assert options["pool_size"] == ENGINE_PRESETS["PROD"]["pool_size"]
+    assert options["connect_args"] == {
+        "prepared_statement_cache_size": ENGINE_PRESETS["PROD"]["statement_cache_size"],
+        "server_settings": {"statement_timeout": str(ENGINE_PRESETS["PROD"]["statement_timeout_ms"])},
+    }
+
+
+def test_engine_profile_env_overrides():
+    dev = Settings(MODE="dev", DB_POOL_SIZE=42, DB_ECHO=True, DB_STATEMENT_TIMEOUT_MS=0)
+    options = dev.engine_options
+    assert options["pool_size"] == 42
+    assert options["echo"] is True
+    assert "server_settings" not in options["connect_args"]
+    assert options["max_overflow"] == ENGINE_PRESETS["DEV"]["max_overflow"]
+
+
+@pytest.mark.asyncio
+async def test_pool_wait_is_measured(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedAsyncQueuePool, pool_size=1, max_overflow=0,
+    )
+    before = pool_metrics.snapshot()["checkouts"]
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    finally:
+        query_stats.reset(token)
+        await engine.dispose()
+
+    assert stats.pool_wait > 0
+    assert pool_metrics.snapshot()["checkouts"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_pool_stats_endpoint(async_client):
+    pool_metrics.observe(0.002)
+    app.dependency_overrides[current_active_user] = lambda: SimpleNamespace(id=1, role=UserRole.ADMIN)
+    resp = await async_client.get("/db/pool/stats")
+    assert resp.status_code == status.HTTP_200_OK
+    stats = resp.json()
+    assert stats["checkouts"] >= 1 and stats["wait_max_ms"] >= 2
+    assert {"wait_avg_ms", "pool_size", "checked_out"} <= stats.keys()
+
+    app.dependency_overrides[current_active_user] = lambda: SimpleNamespace(id=2, role=UserRole.MANAGER)
+    assert (await async_client.get("/db/pool/stats")).status_code == status.HTTP_403_FORBIDDEN
+
+    app.dependency_overrides.pop(current_active_user)
@@ -0,0 +1,51 @@
+# tests/core/test_middleware.py
+import logging
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.core.auth import current_active_user
+from tests.helpers import assert_query_budget
+
+
+class Dummy:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+@pytest.mark.asyncio
+async def test_sql_metrics_headers_and_log(async_client: AsyncClient, db_session, caplog):
+    app.dependency_overrides[current_active_user] = lambda: Dummy(id=1, team_id=1)
+
+    with caplog.at_level(logging.INFO, logger="app.sql"):
+        resp = await async_client.get("/calendar/monthly/2025/6")
+
+    assert resp.status_code == 200
+    # задачи, разовые встречи и серии
+    assert resp.headers["X-DB-Queries"] == "3"
+    assert resp.headers["Server-Timing"].startswith("db;dur=")
+    assert any(
+        "path=/calendar/monthly/2025/6" in r.getMessage() and "db_queries=3" in r.getMessage()
+        for r in caplog.records
+    )
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_sql_metrics_without_queries(async_client: AsyncClient):
+    resp = await async_client.get("/")
+    assert resp.headers["X-DB-Queries"] == "0"
+    assert_query_budget(resp, 0)
+
+
+@pytest.mark.asyncio
+async def test_query_budget_exceeded(async_client: AsyncClient, db_session):
+    app.dependency_overrides[current_active_user] = lambda: Dummy(id=1, team_id=1)
+
+    resp = await async_client.get("/calendar/monthly/2025/6")
+    with pytest.raises(AssertionError, match="3 SQL-запросов при бюджете 1"):
+        assert_query_budget(resp, 1)
+
+    app.dependency_overrides.pop(current_active_user)
@@ -0,0 +1,90 @@
+# tests/core/test_read_replica.py
+import pytest
+import pytest_asyncio
+from types import SimpleNamespace
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.core.database as database
+from app.core.database import PRIMARY_PIN_COOKIE, get_async_session, get_read_session, session_pinned_to_primary
+from app.core.middleware import ReadYourWritesMiddleware
+
+
+@pytest_asyncio.fixture
+async def two_databases(tmp_path, monkeypatch):
+    """Две SQLite-базы: «основная» и «реплика», каждая знает своё имя."""
+    engines = {}
+    for name in ("primary", "replica"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE whoami (name TEXT)"))
+            await conn.execute(text("INSERT INTO whoami VALUES (:name)"), {"name": name})
+        engines[name] = engine
+
+    monkeypatch.setattr(database, "AsyncSessionLocal", sessionmaker(
+        bind=engines["primary"], class_=AsyncSession, expire_on_commit=False))
+    monkeypatch.setattr(database, "AsyncReadSessionLocal", sessionmaker(
+        bind=engines["replica"], class_=AsyncSession, expire_on_commit=False))
+    yield
+    for engine in engines.values():
+        await engine.dispose()
+
+
+def make_app() -> FastAPI:
+    api = FastAPI()
+    api.add_middleware(ReadYourWritesMiddleware, sticky_seconds=30)
+
+    @api.get("/read")
+    async def read(db: AsyncSession = Depends(get_read_session)):
+        return (await db.execute(text("SELECT name FROM whoami"))).scalar()
+
+    @api.post("/write")
+    async def write(db: AsyncSession = Depends(get_async_session)):
+        return (await db.execute(text("SELECT name FROM whoami"))).scalar()
+
+    return api
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_until_client_writes(two_databases):
+    transport = ASGITransport(app=make_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/read")).json() == "replica"
+
+        resp = await client.post("/write")
+        assert resp.json() == "primary"
+        assert PRIMARY_PIN_COOKIE in resp.cookies
+
+        # Сразу после записи тот же клиент читает с основной БД
+        assert (await client.get("/read")).json() == "primary"
+
+    # Другой клиент без cookie продолжает читать с реплики
+    async with AsyncClient(transport=transport, base_url="http://test") as other:
+        assert (await other.get("/read")).json() == "replica"
+
+
+@pytest.mark.asyncio
+async def test_expired_pin_reads_replica(two_databases):
+    transport = ASGITransport(app=make_app())
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        client.cookies.set(PRIMARY_PIN_COOKIE, "1")  # давно истёкшее окно
+        assert (await client.get("/read")).json() == "replica"
+        client.cookies.set(PRIMARY_PIN_COOKIE, "garbage")
+        assert (await client.get("/read")).json() == "replica"
+
+
+def test_only_pinned_reads_bypass_caches(monkeypatch):
+    primary, replica = object(), object()
+    monkeypatch.setattr(database, "engine", primary)
+    monkeypatch.setattr(database, "read_engine", replica)
+    # кэш мог заполнить ответ отстающей реплики — записавший клиент его не читает
+    assert session_pinned_to_primary(SimpleNamespace(bind=primary))
+    assert not session_pinned_to_primary(SimpleNamespace(bind=replica))
+
+    # без реплики все чтения идут с основной БД и пользуются кэшем
+    monkeypatch.setattr(database, "read_engine", primary)
+    assert not session_pinned_to_primary(SimpleNamespace(bind=primary))
@@ -0,0 +1,48 @@
+# tests/helpers.py
+from httpx import Response
+from sqlalchemy import event
+
+from tests.conftest import engine_test
+
+
+def assert_query_budget(response: Response, budget: int) -> None:
+    """
+    Проверить, что эндпоинт уложился в бюджет SQL-запросов.
+    Число берётся из заголовка X-DB-Queries, который ставит SQLMetricsMiddleware,
+    поэтому регрессии вида N+1 ломают тест, а не прод.
+    """
+    used = int(response.headers["X-DB-Queries"])
+    request = response.request
+    assert used <= budget, (
+        f"{request.method} {request.url.path}: {used} SQL-запросов при бюджете {budget}"
+    )
+
+
+def ordered_insert_queries(rows: int) -> int:
+    """
+    Запросов на INSERT ... RETURNING с sort_by_parameter_order: на PostgreSQL
+    пакет — один запрос, SQLite без сентинела вставляет по одной строке.
+    """
+    return 1 if engine_test.dialect.name == "postgresql" else rows
+
+
+async def capture_statements(db_session, coro):
+    """Выполнить корутину и вернуть все выполненные ею SQL-выражения с параметрами."""
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine_test.sync_engine, "before_cursor_execute", _capture)
+    try:
+        await coro
+    finally:
+        event.remove(engine_test.sync_engine, "before_cursor_execute", _capture)
+    return statements
+
+
+async def explain(db_session, statement, parameters) -> str:
+    """План запроса SQLite одной строкой."""
+    conn = await db_session.connection()
+    res = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return " | ".join(row[-1] for row in res.all())
@@ -1,11 +1,19 @@
 import pytest
-from datetime import datetime, date
+from datetime import datetime, date, timezone
+from email.utils import parsedate_to_datetime
 from httpx import AsyncClient
 from fastapi import status
+from sqlalchemy import delete, select, update
 
 from app.main import app
+import app.core.database as database
 from app.core.auth import current_active_user
+from app.models.meeting import Meeting
+from app.models.task import Task
+from app.models.user import User, UserRole
 import app.routers.calendar as cal_router
+from tests.conftest import engine_test
+from tests.helpers import assert_query_budget
 
 class Dummy:
     def __init__(self, **kwargs):
@@ -37,10 +45,10 @@ async def test_daily_no_team(async_client: AsyncClient, db_session):
 @pytest.mark.asyncio
 async def test_daily_with_events(async_client: AsyncClient, db_session, monkeypatch):
     # Мокаем сервисы — теперь асинхронно
-    async def fake_tasks(db, team_id, d):
+    async def fake_tasks(db, team_id, d, tz):
         return [Dummy(title="T1", deadline=datetime.combine(d, datetime.min.time()).replace(hour=9))]
 
-    async def fake_meetings(db, user_id, d):
+    async def fake_meetings(db, user_id, d, tz):
         return [Dummy(title="M1", start_time=datetime.combine(d, datetime.min.time()).replace(hour=11, minute=30))]
 
     monkeypatch.setattr(cal_router, "get_tasks_for_date", fake_tasks)
@@ -77,18 +85,413 @@ async def test_monthly_no_team(async_client: AsyncClient, db_session):
 
 @pytest.mark.asyncio
 async def test_monthly_counts(async_client: AsyncClient, db_session, monkeypatch):
-    async def fake_tasks(db, tid, d):
-        return [Dummy()]
+    async def fake_tasks(db, tid, start, end, tz):
+        return {date(2025, 6, 3): 2}
 
-    async def fake_meetings(db, uid, d):
-        return [Dummy()]
+    async def fake_meetings(db, uid, start, end, tz):
+        return {date(2025, 6, 3): 1, date(2025, 6, 30): 4}
 
-    monkeypatch.setattr(cal_router, "get_tasks_for_date", fake_tasks)
-    monkeypatch.setattr(cal_router, "get_meetings_for_date", fake_meetings)
+    monkeypatch.setattr(cal_router, "count_tasks_by_day", fake_tasks)
+    monkeypatch.setattr(cal_router, "count_meetings_by_day", fake_meetings)
 
     user = Dummy(id=3, team_id=7)
     app.dependency_overrides[current_active_user] = lambda: user
 
     resp = await async_client.get("/calendar/monthly/2025/6")
     assert resp.status_code == 200
+    lines = resp.text.splitlines()
+    assert len(lines) == 2 + 30
+    assert lines[2 + 2] == f"{'2025-06-03':<10}| {2:^5} | {1:^6}"
+    assert lines[-1] == f"{'2025-06-30':<10}| {0:^5} | {4:^6}"
+
+    app.dependency_overrides.pop(current_active_user)
+
+@pytest.mark.asyncio
+async def test_monthly_counts_from_db(async_client: AsyncClient, db_session):
+    # Команда из двух человек: задачи и встречи на разные дни месяца
+    manager = User(email="cal-m@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   team_id=1, is_active=True, is_superuser=False, is_verified=True)
+    member = User(email="cal-u@e.com", hashed_password="x", role=UserRole.USER,
+                  team_id=1, is_active=True, is_superuser=False, is_verified=True)
+    outsider = User(email="cal-x@e.com", hashed_password="x", role=UserRole.USER,
+                    team_id=2, is_active=True, is_superuser=False, is_verified=True)
+    db_session.add_all([manager, member, outsider])
+    await db_session.commit()
+
+    db_session.add_all([
+        Task(title="a", deadline=datetime(2025, 6, 1, 9), creator_id=manager.id, assignee_id=member.id),
+        Task(title="b", deadline=datetime(2025, 6, 1, 23, 59), creator_id=manager.id, assignee_id=member.id),
+        Task(title="c", deadline=datetime(2025, 6, 15, 12), creator_id=manager.id, assignee_id=manager.id),
+        Task(title="next month", deadline=datetime(2025, 7, 1, 0), creator_id=manager.id, assignee_id=member.id),
+        Task(title="other team", deadline=datetime(2025, 6, 1, 10), creator_id=outsider.id, assignee_id=outsider.id),
+        Meeting(title="m1", start_time=datetime(2025, 6, 15, 10), end_time=datetime(2025, 6, 15, 11),
+                creator_id=manager.id, participants=[manager, member]),
+        Meeting(title="m2", start_time=datetime(2025, 6, 30, 10), end_time=datetime(2025, 6, 30, 11),
+                creator_id=manager.id, participants=[manager]),
+    ])
+    await db_session.commit()
+
+    app.dependency_overrides[current_active_user] = lambda: member
+
+    resp = await async_client.get("/calendar/monthly/2025/6")
+    assert resp.status_code == 200
+    assert_query_budget(resp, 3)
+    rows = {line.split("|")[0].strip(): line for line in resp.text.splitlines()[2:]}
+    assert rows["2025-06-01"] == f"{'2025-06-01':<10}| {2:^5} | {0:^6}"
+    assert rows["2025-06-15"] == f"{'2025-06-15':<10}| {1:^5} | {1:^6}"
+    assert rows["2025-06-30"] == f"{'2025-06-30':<10}| {0:^5} | {0:^6}"
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_calendar_days_in_user_timezone(async_client: AsyncClient, db_session):
+    team_id, manager, users = await _seed_team_calendar(db_session, 1)
+    member = users[0]
+    db_session.add_all([
+        # Нью-Йорк переходит на летнее время 9 марта в 07:00 UTC
+        Task(title="до перехода", deadline=datetime(2025, 3, 9, 4, 30), creator_id=manager.id, assignee_id=member.id),
+        Task(title="после перехода", deadline=datetime(2025, 3, 10, 3, 30), creator_id=manager.id,
+             assignee_id=member.id),
+        Meeting(title="ночная", start_time=datetime(2025, 3, 31, 22), end_time=datetime(2025, 3, 31, 23),
+                creator_id=manager.id, participants=[member]),
+    ])
+    member.timezone = "America/New_York"
+    await db_session.commit()
+    await db_session.refresh(member)
+
+    def month_rows(resp):
+        assert resp.status_code == 200
+        return {line.split("|")[0].strip(): line for line in resp.text.splitlines()[2:]}
+
+    app.dependency_overrides[current_active_user] = lambda: member
+    # Пояс из профиля: дни 8 и 9 марта по местному времени, встреча — 31-го
+    resp = await async_client.get("/calendar/monthly/2025/3")
+    assert_query_budget(resp, 3)
+    rows = month_rows(resp)
+    assert rows["2025-03-08"] == f"{'2025-03-08':<10}| {1:^5} | {0:^6}"
+    assert rows["2025-03-09"] == f"{'2025-03-09':<10}| {1:^5} | {0:^6}"
+    assert rows["2025-03-31"] == f"{'2025-03-31':<10}| {0:^5} | {1:^6}"
+
+    # Параметр tz важнее профиля; в Москве встреча уже 1 апреля
+    rows = month_rows(await async_client.get("/calendar/monthly/2025/3", params={"tz": "UTC"}))
+    assert rows["2025-03-09"] == f"{'2025-03-09':<10}| {1:^5} | {0:^6}"
+    assert rows["2025-03-10"] == f"{'2025-03-10':<10}| {1:^5} | {0:^6}"
+    rows = month_rows(await async_client.get("/calendar/monthly/2025/3", params={"tz": "Europe/Moscow"}))
+    assert rows["2025-03-31"] == f"{'2025-03-31':<10}| {0:^5} | {0:^6}"
+
+    resp = await async_client.get("/calendar/daily/2025-04-01", params={"tz": "Europe/Moscow"})
+    assert "01:00     | Встреча| ночная" in resp.text
+    resp = await async_client.get("/calendar/daily/2025-03-08")
+    assert "23:30     | Задача  | до перехода" in resp.text
+
+    app.dependency_overrides[current_active_user] = lambda: manager
+    resp = await async_client.get(f"/calendar/team/{team_id}/monthly/2025/3",
+                                  params={"format": "json", "tz": "America/New_York"})
+    body = resp.json()
+    assert body["timezone"] == "America/New_York"
+    row = next(m for m in body["members"] if m["user_id"] == member.id)
+    assert row["tasks"][7:9] == [1, 1] and row["meetings"][30] == 1
+
+    resp = await async_client.get("/calendar/daily/2025-03-08", params={"tz": "Mars/Olympus"})
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Неизвестный часовой пояс: Mars/Olympus"
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+async def _seed_team_calendar(db_session, members: int):
+    """Команда: менеджер-админ, members участников, по задаче и общей встрече на 2025-06-10."""
+    from app.models.team import Team
+    from app.models.meeting import RecurrenceFreq
+
+    manager = User(email=f"lead{members}@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(manager)
+    await db_session.flush()
+    team = Team(name=f"Cal{members}", admin_id=manager.id)
+    db_session.add(team)
+    await db_session.flush()
+    manager.team_id = team.id
+    users = [
+        User(email=f"u{members}-{i}@e.com", hashed_password="x", role=UserRole.USER,
+             team_id=team.id, is_active=True, is_superuser=False, is_verified=True)
+        for i in range(members)
+    ]
+    db_session.add_all(users)
+    await db_session.flush()
+
+    db_session.add_all([
+        Task(title=f"t{i}", deadline=datetime(2025, 6, 10, 9 + i % 8), creator_id=manager.id, assignee_id=u.id)
+        for i, u in enumerate(users)
+    ])
+    db_session.add_all([
+        Task(title="своя", deadline=datetime(2025, 6, 10, 18), creator_id=manager.id, assignee_id=manager.id),
+        Meeting(title="общая", start_time=datetime(2025, 6, 10, 12), end_time=datetime(2025, 6, 10, 13),
+                creator_id=manager.id, participants=[manager, *users]),
+        Meeting(title="планёрка", start_time=datetime(2025, 6, 2, 9), end_time=datetime(2025, 6, 2, 9, 15),
+                creator_id=manager.id, participants=[manager, users[0]],
+                recurrence_freq=RecurrenceFreq.WEEKLY, recurrence_interval=1),
+    ])
+    await db_session.commit()
+    return team.id, manager, users
+
+
+@pytest.mark.asyncio
+async def test_team_daily_grid_constant_queries(async_client: AsyncClient, db_session):
+    small_team_id, small_lead, _ = await _seed_team_calendar(db_session, 2)
+    team_id, manager, users = await _seed_team_calendar(db_session, 6)
+    manager_id, first_id = manager.id, users[0].id
+
+    app.dependency_overrides[current_active_user] = lambda: small_lead
+    small = await async_client.get(f"/calendar/team/{small_team_id}/daily/2025-06-10")
+    app.dependency_overrides[current_active_user] = lambda: manager
+    resp = await async_client.get(f"/calendar/team/{team_id}/daily/2025-06-10", params={"format": "json"})
+    assert resp.status_code == 200
+    # Число запросов не зависит от размера команды
+    assert resp.headers["X-DB-Queries"] == small.headers["X-DB-Queries"]
+    assert_query_budget(resp, 5)
+
+    grid = {m["user_id"]: m["events"] for m in resp.json()["members"]}
+    assert len(grid) == 7
+    assert [(e["kind"], e["title"]) for e in grid[manager_id]] == [("meeting", "общая"), ("task", "своя")]
+    assert [(e["kind"], e["title"]) for e in grid[first_id]] == [
+        ("task", "t0"), ("meeting", "общая"),
+    ]
+
+    # во вторник серия по понедельникам не видна, в понедельник — у обоих участников
+    resp = await async_client.get(f"/calendar/team/{team_id}/daily/2025-06-16", params={"format": "json"})
+    grid = {m["user_id"]: [e["title"] for e in m["events"]] for m in resp.json()["members"]}
+    assert grid[manager_id] == grid[first_id] == ["планёрка"]
+
+    resp = await async_client.get(f"/calendar/team/{team_id}/daily/2025-06-10")
+    assert resp.headers["content-type"].startswith("text/plain")
+    lines = resp.text.splitlines()
+    assert lines[0] == f"== lead6@e.com (ID {manager_id}) =="
+    assert f"{'09:00':<10}| Задача  | t0" in lines
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_team_monthly_grid(async_client: AsyncClient, db_session):
+    team_id, manager, users = await _seed_team_calendar(db_session, 3)
+    manager_id, first_id, second_id = manager.id, users[0].id, users[1].id
+
+    app.dependency_overrides[current_active_user] = lambda: manager
+    resp = await async_client.get(f"/calendar/team/{team_id}/monthly/2025/6", params={"format": "json"})
+    assert resp.status_code == 200
+    assert_query_budget(resp, 5)
+    data = resp.json()
+    assert len(data["days"]) == 30
+    grid = {m["user_id"]: m for m in data["members"]}
+    # серия по понедельникам: 2, 9, 16, 23, 30 июня
+    assert sum(grid[first_id]["meetings"]) == 1 + 5
+    assert sum(grid[second_id]["meetings"]) == 1
+    assert grid[first_id]["tasks"][9] == 1 and sum(grid[first_id]["tasks"]) == 1
+    assert grid[manager_id]["tasks"][9] == 1 and grid[manager_id]["meetings"][9] == 1
+
+    resp = await async_client.get(f"/calendar/team/{team_id}/monthly/2025/6")
+    lines = resp.text.splitlines()
+    assert lines[0] == f"== lead3@e.com (ID {manager_id}) =="
+    assert f"{'2025-06-10':<10}| {1:^5} | {1:^6}" in lines
+    assert len(lines) == 4 * (2 + 30 + 2) - 1
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_team_calendar_requires_team_admin(async_client: AsyncClient, db_session):
+    team_id, _, users = await _seed_team_calendar(db_session, 2)
+
+    app.dependency_overrides[current_active_user] = lambda: users[0]
+    resp = await async_client.get(f"/calendar/team/{team_id}/daily/2025-06-10")
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+    # глобальный админ не обязан быть админом команды
+    app.dependency_overrides[current_active_user] = lambda: Dummy(id=10_000, role=UserRole.ADMIN, team_id=None)
+    resp = await async_client.get(f"/calendar/team/{team_id}/monthly/2025/6")
+    assert resp.status_code == 200
+
+    resp = await async_client.get("/calendar/team/999/monthly/2025/6")
+    assert resp.status_code == status.HTTP_404_NOT_FOUND
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_calendar_cache_invalidated_by_mutations(async_client: AsyncClient, db_session):
+    team_id, manager, users = await _seed_team_calendar(db_session, 2)
+    member, other = users
+    member_id, other_id = member.id, other.id
+
+    app.dependency_overrides[current_active_user] = lambda: member
+    first = await async_client.get("/calendar/daily/2025-06-10")
+    assert first.headers["X-Calendar-Cache"] == "MISS"
+    cached = await async_client.get("/calendar/daily/2025-06-10")
+    assert cached.headers["X-Calendar-Cache"] == "HIT" and cached.text == first.text
+    assert cached.headers["X-DB-Queries"] == "0"
+    other_day = await async_client.get("/calendar/daily/2025-06-11")
+    month = await async_client.get("/calendar/monthly/2025/6")
+    assert month.headers["X-Calendar-Cache"] == "MISS"
+
+    # задача команды на 10 июня: сбрасываются день и месяц, 11 июня — нет
+    app.dependency_overrides[current_active_user] = lambda: manager
+    resp = await async_client.post("/tasks/", json={
+        "title": "новая", "assignee_id": other_id, "deadline": "2025-06-10T15:00:00",
+    })
+    assert resp.status_code == 201
+    app.dependency_overrides[current_active_user] = lambda: member
+    resp = await async_client.get("/calendar/daily/2025-06-10")
+    assert resp.headers["X-Calendar-Cache"] == "MISS" and "новая" in resp.text
+    assert (await async_client.get("/calendar/monthly/2025/6")).headers["X-Calendar-Cache"] == "MISS"
+    resp = await async_client.get("/calendar/daily/2025-06-11")
+    assert resp.headers["X-Calendar-Cache"] == "HIT" and resp.text == other_day.text
+
+    # встреча 11 июня без участия member его календарь не трогает
+    app.dependency_overrides[current_active_user] = lambda: manager
+    resp = await async_client.post("/meetings/", json={
+        "title": "один на один", "start_time": "2025-06-11T15:00:00", "end_time": "2025-06-11T16:00:00",
+        "participants": [other_id],
+    })
+    assert resp.status_code == 201
+    meeting_id = resp.json()["id"]
+    app.dependency_overrides[current_active_user] = lambda: member
+    assert (await async_client.get("/calendar/daily/2025-06-11")).headers["X-Calendar-Cache"] == "HIT"
+
+    # перенос встречи с участием member сбрасывает его день
+    app.dependency_overrides[current_active_user] = lambda: manager
+    resp = await async_client.put(f"/meetings/{meeting_id}", json={"participants": [other_id, member_id]})
+    assert resp.status_code == 200
+    app.dependency_overrides[current_active_user] = lambda: member
+    resp = await async_client.get("/calendar/daily/2025-06-11")
+    assert resp.headers["X-Calendar-Cache"] == "MISS" and "один на один" in resp.text
+
+    app.dependency_overrides[current_active_user] = lambda: Dummy(id=10_000, role=UserRole.ADMIN, team_id=None)
+    stats = (await async_client.get("/calendar/cache/stats")).json()
+    assert stats["hits"] == 3 and stats["misses"] == 6
+
+    app.dependency_overrides[current_active_user] = lambda: member
+    assert (await async_client.get("/calendar/cache/stats")).status_code == status.HTTP_403_FORBIDDEN
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_calendar_cache_with_replica(async_client: AsyncClient, db_session, monkeypatch):
+    _, _, (member,) = await _seed_team_calendar(db_session, 1)
+    app.dependency_overrides[current_active_user] = lambda: member
+
+    # реплика настроена, тестовая сессия — её: обычные чтения заполняют кэш
+    monkeypatch.setattr(database, "read_engine", engine_test)
+    assert (await async_client.get("/calendar/daily/2025-06-10")).headers["X-Calendar-Cache"] == "MISS"
+    assert (await async_client.get("/calendar/daily/2025-06-10")).headers["X-Calendar-Cache"] == "HIT"
+
+    # клиент в окне read-your-writes читает основную БД мимо кэша
+    monkeypatch.setattr(database, "read_engine", object())
+    assert (await async_client.get("/calendar/daily/2025-06-10")).headers["X-Calendar-Cache"] == "MISS"
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_ics_feed_streams_and_revalidates(async_client: AsyncClient, db_session):
+    _, manager, users = await _seed_team_calendar(db_session, 1)
+    member = users[0]
+    member_id = member.id
+    db_session.add(Task(title="отчёт; итоги", deadline=datetime(2025, 6, 20, 12), creator_id=manager.id,
+                        assignee_id=member_id, description="строка 1\nстрока 2"))
+    db_session.add(Task(title="вне окна", deadline=datetime(2025, 9, 1, 12), creator_id=manager.id,
+                        assignee_id=member_id))
+    await db_session.commit()
+    await db_session.refresh(member)
+
+    app.dependency_overrides[current_active_user] = lambda: member
+    window = {"from": "2025-06-01", "to": "2025-06-30"}
+    resp = await async_client.get("/calendar/feed.ics", params=window)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/calendar")
+    body = resp.text
+    assert body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n")
+    assert body.count("BEGIN:VTODO") == 2  # t0 и «отчёт»
+    assert r"SUMMARY:отчёт\; итоги" in body and "DESCRIPTION:строка 1\\nстрока 2" in body
+    assert "вне окна" not in body
+    assert body.count("BEGIN:VEVENT") == 2
+    assert "RRULE:FREQ=WEEKLY;INTERVAL=1" in body
+
+    etag, last_modified = resp.headers["ETag"], resp.headers["Last-Modified"]
+
+    # Неизменившаяся лента: 304 без единого запроса к БД
+    resp = await async_client.get("/calendar/feed.ics", params=window, headers={"If-None-Match": etag})
+    assert resp.status_code == 304 and resp.content == b""
+    assert resp.headers["X-DB-Queries"] == "0"
+    resp = await async_client.get("/calendar/feed.ics", params=window, headers={"If-Modified-Since": last_modified})
+    assert resp.status_code == 304
+
+    # другое окно — другой ETag
+    resp = await async_client.get("/calendar/feed.ics", params={**window, "to": "2025-07-31"},
+                                  headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+
+    # изменение задачи увеличивает версию календаря исполнителя триггером
+    app.dependency_overrides[current_active_user] = lambda: manager
+    task_id = (await async_client.post("/tasks/", json={
+        "title": "ещё", "assignee_id": member_id, "deadline": "2025-06-21T10:00:00",
+    })).json()["id"]
+    await db_session.refresh(member)
+    app.dependency_overrides[current_active_user] = lambda: member
+    resp = await async_client.get("/calendar/feed.ics", params=window, headers={"If-None-Match": etag})
+    assert resp.status_code == 200 and resp.headers["ETag"] != etag
+    assert f"UID:task-{task_id}@bms" in resp.text
+
+    # окно по умолчанию сдвигается с датой: Last-Modified не раньше начала текущих суток
+    await db_session.execute(
+        update(User).where(User.id == member_id).values(calendar_changed_at=datetime(2025, 6, 1))
+    )
+    await db_session.commit()
+    await db_session.refresh(member)
+    stale = "Sun, 01 Jun 2025 00:00:00 GMT"
+    resp = await async_client.get("/calendar/feed.ics", params=window, headers={"If-Modified-Since": stale})
+    assert resp.status_code == 304
+    resp = await async_client.get("/calendar/feed.ics", headers={"If-Modified-Since": stale})
+    assert resp.status_code == 200
+    assert parsedate_to_datetime(resp.headers["Last-Modified"]).date() == datetime.now(timezone.utc).date()
+
+    resp = await async_client.get("/calendar/feed.ics", params={"from": "2025-07-01", "to": "2025-06-01"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_calendar_version_triggers(db_session):
+    _, manager, users = await _seed_team_calendar(db_session, 2)
+    first, second = users
+    ids = [manager.id, first.id, second.id]
+
+    async def versions():
+        res = await db_session.execute(select(User.id, User.calendar_version).where(User.id.in_(ids)))
+        return dict(res.all())
+
+    before = await versions()
+    task = (await db_session.execute(select(Task).where(Task.assignee_id == first.id))).scalars().first()
+    # переназначение задевает старого и нового исполнителя и автора
+    await db_session.execute(update(Task).where(Task.id == task.id).values(assignee_id=second.id))
+    await db_session.commit()
+    after = await versions()
+    assert all(after[uid] > before[uid] for uid in ids)
+
+    # перенос встречи — всех её участников
+    before = after
+    meeting = (await db_session.execute(select(Meeting).where(Meeting.title == "планёрка"))).scalars().one()
+    await db_session.execute(update(Meeting).where(Meeting.id == meeting.id).values(title="стендап"))
+    await db_session.commit()
+    after = await versions()
+    assert after[manager.id] > before[manager.id] and after[first.id] > before[first.id]
+    assert after[second.id] == before[second.id]
 
+    before = after
+    await db_session.execute(delete(Task).where(Task.id == task.id))
+    await db_session.commit()
+    after = await versions()
+    assert after[second.id] > before[second.id] and after[first.id] == before[first.id]
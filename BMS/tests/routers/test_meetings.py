@@ -4,15 +4,19 @@ from httpx import AsyncClient
 from fastapi import status
 from datetime import datetime, timedelta
 
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 
 from app.main import app
 from app.core.auth import current_active_user
-from app.utils.services import check_time_conflicts
+from app.utils.pagination import keyset_after
+from app.utils.services import check_time_conflicts, meeting_participant_ids
 from app.models.user import User, UserRole
-from app.models.meeting import Meeting, meeting_participants_association
+from app.models.meeting import Meeting, MeetingBooking, meeting_participants_association
 from app.schemas.meeting import MeetingCreate, MeetingUpdate
+from tests.helpers import assert_query_budget, capture_statements, explain, ordered_insert_queries
 
 
 @pytest.mark.asyncio
@@ -54,7 +58,8 @@ async def test_list_meetings(async_client: AsyncClient, db_session):
     # GET /meetings/
     resp = await async_client.get("/meetings/")
     assert resp.status_code == status.HTTP_200_OK
-    data = resp.json()
+    assert_query_budget(resp, 2)
+    data = resp.json()["items"]
     # участник должен увидеть только встречу1
     ids = [m["id"] for m in data]
     assert meeting1.id in ids
@@ -148,3 +153,492 @@ async def test_create_and_update_and_delete_meeting(async_client: AsyncClient, d
     assert result.scalar_one_or_none() is None
 
     app.dependency_overrides.pop(current_active_user)
+
+
+# -------------------------------------------------------------------
+# Брони участников: пересечения отклоняет БД
+# -------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_meeting_conflicts_rejected_by_bookings(async_client: AsyncClient, db_session):
+    manager = User(email="bk@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   is_active=True, is_superuser=False, is_verified=True)
+    member = User(email="bk2@e.com", hashed_password="x", role=UserRole.USER,
+                  is_active=True, is_superuser=False, is_verified=True)
+    free = User(email="bk3@e.com", hashed_password="x", role=UserRole.USER,
+                is_active=True, is_superuser=False, is_verified=True)
+    db_session.add_all([manager, member, free])
+    await db_session.commit()
+    # откат в эндпоинте истекает объекты общей сессии — запоминаем ID заранее
+    manager_id, member_id, free_id = manager.id, member.id, free.id
+    app.dependency_overrides[current_active_user] = lambda: manager
+
+    start = datetime(2025, 9, 1, 10, 0)
+
+    def payload(title, begin, hours, participants):
+        return {"title": title, "start_time": begin.isoformat(),
+                "end_time": (begin + timedelta(hours=hours)).isoformat(),
+                "participants": participants}
+
+    resp = await async_client.post("/meetings/", json=payload("first", start, 1, [member_id]))
+    assert resp.status_code == status.HTTP_201_CREATED
+    first_id = resp.json()["id"]
+
+    # пересечение: прежняя 400 со списком занятых
+    resp = await async_client.post(
+        "/meetings/", json=payload("clash", start + timedelta(minutes=30), 1, [member_id, free_id])
+    )
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.json()["detail"] == f"Пользователи с ID {', '.join(map(str, {manager_id, member_id}))} уже заняты в это время"
+    await db_session.refresh(manager)
+
+    # встреча встык не пересекается
+    resp = await async_client.post("/meetings/", json=payload("next", start + timedelta(hours=1), 1, [free_id]))
+    assert resp.status_code == status.HTTP_201_CREATED
+    next_id = resp.json()["id"]
+
+    # перенос первой встречи на время второй — тоже 400, и ничего не изменилось
+    resp = await async_client.put(f"/meetings/{first_id}", json={
+        "start_time": (start + timedelta(hours=1, minutes=30)).isoformat(),
+        "end_time": (start + timedelta(hours=2, minutes=30)).isoformat(),
+    })
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    await db_session.refresh(manager)
+    bookings = (await db_session.execute(
+        select(MeetingBooking.user_id, MeetingBooking.start_time)
+        .where(MeetingBooking.meeting_id == first_id)
+    )).all()
+    assert sorted(bookings) == sorted([(manager_id, start), (member_id, start)])
+
+    # брони следуют за участниками и временем встречи
+    resp = await async_client.put(f"/meetings/{next_id}", json={
+        "start_time": (start + timedelta(days=1)).isoformat(),
+        "end_time": (start + timedelta(days=1, hours=1)).isoformat(),
+        "participants": [member_id],
+    })
+    assert resp.status_code == status.HTTP_200_OK
+    bookings = (await db_session.execute(
+        select(MeetingBooking.user_id, MeetingBooking.start_time)
+        .where(MeetingBooking.meeting_id == next_id)
+    )).all()
+    assert sorted(bookings) == sorted([(manager_id, start + timedelta(days=1)),
+                                       (member_id, start + timedelta(days=1))])
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_bookings_enforced_below_the_api(db_session):
+    user = User(email="raw@e.com", hashed_password="x", role=UserRole.MANAGER,
+                is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(user)
+    await db_session.commit()
+    user_id = user.id
+
+    start = datetime(2025, 9, 2, 9, 0)
+    db_session.add(Meeting(title="a", start_time=start, end_time=start + timedelta(hours=2),
+                           creator_id=user.id, participants=[user]))
+    await db_session.commit()
+
+    # вставка в обход check_time_conflicts всё равно отклоняется
+    db_session.add(Meeting(title="b", start_time=start + timedelta(hours=1),
+                           end_time=start + timedelta(hours=3),
+                           creator_id=user.id, participants=[user]))
+    with pytest.raises(IntegrityError):
+        await db_session.commit()
+    await db_session.rollback()
+
+    # проверка занятости читает брони по индексу, без полного просмотра
+    statements = await capture_statements(db_session, check_time_conflicts(
+        [user_id], start + timedelta(days=1), start + timedelta(days=1, hours=1), db_session
+    ))
+    plan = await explain(db_session, *statements[0])
+    assert "ix_meeting_bookings_user_id_start_time" in plan
+
+
+@pytest.mark.asyncio
+async def test_update_meeting_participants_constant_queries(async_client: AsyncClient, db_session):
+    manager = User(email="diff@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   is_active=True, is_superuser=False, is_verified=True)
+    users = [User(email=f"diff{i}@e.com", hashed_password="x", role=UserRole.USER,
+                  is_active=True, is_superuser=False, is_verified=True) for i in range(80)]
+    db_session.add_all([manager, *users])
+    await db_session.commit()
+    manager_id = manager.id
+    user_ids = [u.id for u in users]
+    app.dependency_overrides[current_active_user] = lambda: manager
+
+    start = datetime(2025, 10, 1, 9, 0)
+    used = {}
+    for size in (4, 40):
+        begin = start + timedelta(days=size)
+        created = await async_client.post("/meetings/", json={
+            "title": f"all hands {size}", "start_time": begin.isoformat(),
+            "end_time": (begin + timedelta(hours=1)).isoformat(),
+            "participants": user_ids[:size],
+        })
+        meeting_id = created.json()["id"]
+
+        # половина уходит, столько же новых приходит, время сдвигается
+        new_ids = user_ids[size // 2:size + size // 2]
+        resp = await async_client.put(f"/meetings/{meeting_id}", json={
+            "start_time": (begin + timedelta(hours=2)).isoformat(),
+            "end_time": (begin + timedelta(hours=3)).isoformat(),
+            "participants": new_ids,
+        })
+        assert resp.status_code == status.HTTP_200_OK
+        assert set(resp.json()["participants"]) == {manager_id, *new_ids}
+        used[size] = int(resp.headers["X-DB-Queries"])
+
+        stored = (await db_session.execute(
+            select(meeting_participants_association.c.user_id)
+            .where(meeting_participants_association.c.meeting_id == meeting_id)
+        )).scalars().all()
+        assert set(stored) == {manager_id, *new_ids}
+        booked = (await db_session.execute(
+            select(MeetingBooking.user_id).where(MeetingBooking.meeting_id == meeting_id)
+            .where(MeetingBooking.start_time == begin + timedelta(hours=2))
+        )).scalars().all()
+        assert set(booked) == {manager_id, *new_ids}
+
+    # встреча, участники, проверка новых, серии участников, DELETE, UPDATE, INSERT
+    assert used[4] == used[40] <= 7
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_meeting_availability(async_client: AsyncClient, db_session):
+    manager = User(email="av@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   is_active=True, is_superuser=False, is_verified=True)
+    # рабочий день участника 9–18 по Москве — 6–15 UTC
+    member = User(email="av2@e.com", hashed_password="x", role=UserRole.USER, timezone="Europe/Moscow",
+                  is_active=True, is_superuser=False, is_verified=True)
+    db_session.add_all([manager, member])
+    await db_session.commit()
+    manager_id, member_id = manager.id, member.id
+
+    monday = datetime(2025, 6, 2)
+    db_session.add_all([
+        Meeting(title="a", start_time=monday.replace(hour=9), end_time=monday.replace(hour=10),
+                creator_id=manager_id, participants=[manager]),
+        Meeting(title="b", start_time=monday.replace(hour=10), end_time=monday.replace(hour=11, minute=20),
+                creator_id=manager_id, participants=[member]),
+    ])
+    await db_session.commit()
+    app.dependency_overrides[current_active_user] = lambda: manager
+
+    resp = await async_client.get("/meetings/availability", params={
+        "users": f"{manager_id},{member_id}",
+        "from": monday.isoformat(), "to": (monday + timedelta(days=1)).isoformat(),
+        "duration": 45, "limit": 2,
+    })
+    assert resp.status_code == status.HTTP_200_OK
+    # пояса пользователей, брони, серии
+    assert_query_budget(resp, 3)
+    assert resp.json() == [
+        {"start_time": "2025-06-02T11:30:00", "end_time": "2025-06-02T12:15:00"},
+        {"start_time": "2025-06-02T12:15:00", "end_time": "2025-06-02T13:00:00"},
+    ]
+
+    # общие часы — 9–15 UTC: после 15:00 UTC у участника уже вечер
+    resp = await async_client.get("/meetings/availability", params={
+        "users": f"{manager_id},{member_id}",
+        "from": monday.isoformat(), "to": (monday + timedelta(days=1)).isoformat(),
+        "duration": 45, "limit": 10,
+    })
+    assert [slot["start_time"][11:16] for slot in resp.json()] == ["11:30", "12:15", "13:00", "13:45"]
+
+    # найденный слот действительно свободен для создания встречи
+    first = resp.json()[0]
+    created = await async_client.post("/meetings/", json={
+        "title": "found", "participants": [member_id], **first,
+    })
+    assert created.status_code == status.HTTP_201_CREATED
+
+    bad = await async_client.get("/meetings/availability", params={
+        "users": "x", "from": monday.isoformat(), "to": monday.isoformat(), "duration": 30,
+    })
+    assert bad.status_code == status.HTTP_400_BAD_REQUEST
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+# -------------------------------------------------------------------
+# Повторяющиеся встречи
+# -------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_recurring_meeting_stored_once_and_expanded(async_client: AsyncClient, db_session):
+    manager = User(email="rec@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   is_active=True, is_superuser=False, is_verified=True)
+    member = User(email="rec2@e.com", hashed_password="x", role=UserRole.USER,
+                  is_active=True, is_superuser=False, is_verified=True)
+    db_session.add_all([manager, member])
+    await db_session.commit()
+    manager_id, member_id = manager.id, member.id
+    app.dependency_overrides[current_active_user] = lambda: manager
+
+    # еженедельный стендап по понедельникам, без 16 июня
+    monday = datetime(2025, 6, 2, 10)
+    created = await async_client.post("/meetings/", json={
+        "title": "stand-up", "participants": [member_id],
+        "start_time": monday.isoformat(), "end_time": (monday + timedelta(minutes=30)).isoformat(),
+        "recurrence": {"freq": "weekly", "exceptions": ["2025-06-16T10:00:00"]},
+    })
+    assert created.status_code == status.HTTP_201_CREATED, created.text
+    series_id = created.json()["id"]
+    assert created.json()["recurrence"]["freq"] == "weekly"
+
+    # одна строка встречи и ни одной брони
+    assert (await db_session.execute(
+        select(func.count(Meeting.id)).where(Meeting.title == "stand-up")
+    )).scalar_one() == 1
+    assert (await db_session.execute(
+        select(func.count()).select_from(MeetingBooking).where(MeetingBooking.meeting_id == series_id)
+    )).scalar_one() == 0
+
+    resp = await async_client.get("/meetings/", params={
+        "from": "2025-06-01T00:00:00", "to": "2025-07-01T00:00:00",
+    })
+    assert resp.status_code == status.HTTP_200_OK
+    assert_query_budget(resp, 2)
+    assert [m["start_time"] for m in resp.json()["items"]] == [
+        "2025-06-02T10:00:00", "2025-06-09T10:00:00", "2025-06-23T10:00:00", "2025-06-30T10:00:00",
+    ]
+    assert {m["id"] for m in resp.json()["items"]} == {series_id}
+
+    # разовая встреча поверх вхождения отклоняется, в отменённое — проходит
+    clash = await async_client.post("/meetings/", json={
+        "title": "clash", "participants": [member_id],
+        "start_time": "2099-01-05T10:15:00", "end_time": "2099-01-05T11:00:00",
+    })
+    assert clash.status_code == status.HTTP_400_BAD_REQUEST
+    assert clash.json()["detail"] == f"Пользователи с ID {manager_id}, {member_id} уже заняты в это время"
+    await db_session.refresh(manager)
+
+    free = await async_client.post("/meetings/", json={
+        "title": "free", "participants": [member_id],
+        "start_time": "2025-06-16T10:00:00", "end_time": "2025-06-16T10:30:00",
+    })
+    assert free.status_code == status.HTTP_201_CREATED
+
+    # вторая серия, задевающая первую раз в две недели по вторникам — нет
+    tuesday = {"title": "sync", "participants": [member_id],
+               "start_time": "2025-06-03T10:00:00", "end_time": "2025-06-03T11:00:00",
+               "recurrence": {"freq": "weekly", "interval": 2}}
+    assert (await async_client.post("/meetings/", json=tuesday)).status_code == status.HTTP_201_CREATED
+    monthly = {"title": "review", "participants": [member_id],
+               "start_time": "2025-06-30T09:00:00", "end_time": "2025-06-30T10:30:00",
+               "recurrence": {"freq": "monthly", "count": 3}}
+    resp = await async_client.post("/meetings/", json=monthly)
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    await db_session.refresh(manager)
+
+    # без отмены 16 июня серия пересеклась бы с занявшей его встречей
+    shortened = {"freq": "weekly", "count": 5, "exceptions": ["2025-06-23T10:00:00"]}
+    resp = await async_client.put(f"/meetings/{series_id}", json={"recurrence": shortened})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    await db_session.refresh(manager)
+
+    # серию можно сократить и отменить ещё одно вхождение
+    shortened["exceptions"].append("2025-06-16T10:00:00")
+    resp = await async_client.put(f"/meetings/{series_id}", json={"recurrence": shortened})
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.json()["recurrence"]["count"] == 5
+    resp = await async_client.get("/meetings/", params={
+        "from": "2025-06-01T00:00:00", "to": "2025-12-01T00:00:00",
+    })
+    assert [m["start_time"] for m in resp.json()["items"] if m["id"] == series_id] == [
+        "2025-06-02T10:00:00", "2025-06-09T10:00:00", "2025-06-30T10:00:00",
+    ]
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+# -------------------------------------------------------------------
+# Пакетное создание встреч
+# -------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_bulk_create_meetings_dry_run_and_insert(async_client: AsyncClient, db_session):
+    manager = User(email="bulk-m@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   is_active=True, is_superuser=False, is_verified=True)
+    users = [User(email=f"bulk{i}@e.com", hashed_password="x", role=UserRole.USER,
+                  is_active=True, is_superuser=False, is_verified=True) for i in range(3)]
+    db_session.add_all([manager, *users])
+    await db_session.commit()
+    manager_id, (a, b, c) = manager.id, [u.id for u in users]
+
+    day = datetime(2025, 9, 1)
+    existing = Meeting(title="busy", start_time=day.replace(hour=9), end_time=day.replace(hour=10),
+                       creator_id=manager_id, participants=[users[0]])
+    db_session.add(existing)
+    await db_session.commit()
+    existing_id = existing.id
+    app.dependency_overrides[current_active_user] = lambda: manager
+
+    def item(title, participants, hour, minutes=60):
+        start = day.replace(hour=hour)
+        return {"title": title, "participants": participants, "start_time": start.isoformat(),
+                "end_time": (start + timedelta(minutes=minutes)).isoformat()}
+
+    batch = [
+        item("intro", [a], 9, 30),      # пересекается с существующей встречей a
+        item("hr", [b], 11),             # пересекается с «it» по менеджеру
+        item("it", [c], 11, 30),
+        item("lunch", [a, b, c], 13),
+    ]
+    resp = await async_client.post("/meetings/bulk", params={"dry_run": "true"}, json={"items": batch})
+    assert resp.status_code == status.HTTP_200_OK
+    report = resp.json()["results"]
+    assert [r["status"] for r in report] == ["conflict", "conflict", "conflict", "valid"]
+    assert report[0]["conflicts"] == [{
+        "user_id": a, "meeting_id": existing_id, "item": None,
+        "start_time": "2025-09-01T09:00:00", "end_time": "2025-09-01T10:00:00",
+    }]
+    assert [(x["user_id"], x["item"]) for x in report[1]["conflicts"]] == [(manager_id, 2)]
+    assert [(x["user_id"], x["item"]) for x in report[2]["conflicts"]] == [(manager_id, 1)]
+
+    # без dry_run пакет с пересечениями не создаётся целиком
+    resp = await async_client.post("/meetings/bulk", json={"items": batch})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    assert resp.json()["detail"]["results"][3]["status"] == "valid"
+    assert (await db_session.execute(
+        select(func.count(Meeting.id)).where(Meeting.creator_id == manager_id)
+    )).scalar_one() == 1
+
+    # чистые пакеты разного размера — одинаковое число запросов
+    used = {}
+    for size, track_day in ((3, day + timedelta(days=1)), (30, day + timedelta(days=2))):
+        # встречи по 20 минут подряд: у менеджера встык, без пересечений
+        items = [
+            {"title": f"track {size}.{i}", "participants": [(a, b, c)[i % 3]],
+             "start_time": (track_day + timedelta(minutes=20 * i)).isoformat(),
+             "end_time": (track_day + timedelta(minutes=20 * i + 20)).isoformat()}
+            for i in range(size)
+        ]
+        resp = await async_client.post("/meetings/bulk", json={"items": items})
+        assert resp.status_code == status.HTTP_201_CREATED, resp.text
+        used[size] = int(resp.headers["X-DB-Queries"]) - ordered_insert_queries(size)
+        created = resp.json()["results"]
+        assert [r["meeting"]["title"] for r in created] == [i["title"] for i in items]
+        assert all(r["status"] == "created" for r in created)
+        ids = [r["meeting"]["id"] for r in created]
+        booked = (await db_session.execute(
+            select(MeetingBooking.meeting_id, MeetingBooking.user_id).where(MeetingBooking.meeting_id.in_(ids))
+        )).all()
+        assert len(booked) == 2 * size
+        stored = dict((await db_session.execute(
+            select(Meeting.id, Meeting.title).where(Meeting.id.in_(ids))
+        )).all())
+        assert [stored[i] for i in ids] == [i["title"] for i in items]
+
+    # участники, брони, серии, INSERT участников — кроме INSERT встреч
+    assert used[3] == used[30] <= 4
+
+    # время со смещением сохраняется и возвращается в UTC
+    offset_day = (day + timedelta(days=3)).date().isoformat()
+    resp = await async_client.post("/meetings/bulk", json={"items": [
+        {"title": "msk", "participants": [a],
+         "start_time": f"{offset_day}T10:00:00+03:00", "end_time": f"{offset_day}T11:00:00+03:00"},
+        {"title": "utc", "participants": [b],
+         "start_time": f"{offset_day}T08:00:00", "end_time": f"{offset_day}T09:00:00"},
+    ]})
+    assert resp.status_code == status.HTTP_201_CREATED, resp.text
+    created = [r["meeting"] for r in resp.json()["results"]]
+    assert [(m["title"], m["start_time"][11:16]) for m in created] == [("msk", "07:00"), ("utc", "08:00")]
+    stored = (await db_session.execute(
+        select(Meeting.start_time).where(Meeting.id == created[0]["id"])
+    )).scalar_one()
+    assert stored.replace(tzinfo=None) == datetime(2025, 9, 4, 7)
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+# -------------------------------------------------------------------
+# Чтение встреч: ID участников и keyset-пагинация
+# -------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_list_meetings_keyset_pages_with_series(async_client: AsyncClient, db_session):
+    manager = User(email="pages@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   is_active=True, is_superuser=False, is_verified=True)
+    member = User(email="pages2@e.com", hashed_password="x", role=UserRole.USER,
+                  is_active=True, is_superuser=False, is_verified=True)
+    db_session.add_all([manager, member])
+    await db_session.commit()
+    manager_id, member_id = manager.id, member.id
+
+    day = datetime(2025, 3, 3)  # понедельник
+    # 12 разовых встреч по вечерам и ежедневная серия по утрам;
+    # две разовые встречи в одно время проверяют второй ключ курсора
+    db_session.add_all(
+        [Meeting(title=f"single {i}", start_time=day + timedelta(days=i, hours=18),
+                 end_time=day + timedelta(days=i, hours=19), creator_id=manager_id,
+                 participants=[manager, member] if i % 2 else [manager]) for i in range(12)]
+        + [Meeting(title="twin", start_time=day + timedelta(days=3, hours=20),
+                   end_time=day + timedelta(days=3, hours=21), creator_id=member_id,
+                   participants=[member]),
+           Meeting(title="twin", start_time=day + timedelta(days=3, hours=20),
+                   end_time=day + timedelta(days=3, hours=21), creator_id=manager_id,
+                   participants=[manager])]
+    )
+    await db_session.commit()
+    app.dependency_overrides[current_active_user] = lambda: manager
+    await async_client.post("/meetings/", json={
+        "title": "daily", "participants": [member_id],
+        "start_time": (day + timedelta(hours=9)).isoformat(),
+        "end_time": (day + timedelta(hours=9, minutes=15)).isoformat(),
+        "recurrence": {"freq": "daily"},
+    })
+
+    window = {"from": (day + timedelta(days=2)).isoformat(), "to": (day + timedelta(days=9)).isoformat()}
+    seen, after, pages = [], None, 0
+    while True:
+        params = {**window, "limit": 4, **({"after": after} if after else {})}
+        resp = await async_client.get("/meetings/", params=params)
+        assert resp.status_code == status.HTTP_200_OK
+        assert_query_budget(resp, 2)
+        page = resp.json()
+        seen += page["items"]
+        pages += 1
+        after = page["next_cursor"]
+        if not after:
+            break
+
+    # 7 дней серии + 7 вечеров + одна «twin» менеджера, без повторов и по порядку
+    keys = [(m["start_time"], m["id"]) for m in seen]
+    assert keys == sorted(keys) and len(set(keys)) == len(keys) == 15
+    assert pages == 4
+    assert [m["title"] for m in seen].count("daily") == 7
+    evening = next(m for m in seen if m["title"] == "single 3")
+    assert evening["participants"] == sorted([manager_id, member_id])
+
+    # без окна серия — одна запись
+    resp = await async_client.get("/meetings/", params={"limit": 200})
+    assert [m["title"] for m in resp.json()["items"]].count("daily") == 1
+    assert resp.json()["next_cursor"] is None
+
+    resp = await async_client.get("/meetings/", params={"after": "broken"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_list_meetings_page_uses_bookings_index(db_session):
+    # тот же запрос страницы, что строит list_meetings
+    stmt = (
+        select(Meeting, meeting_participant_ids())
+        .join(MeetingBooking, MeetingBooking.meeting_id == Meeting.id)
+        .where(MeetingBooking.user_id == 1)
+        .where(keyset_after(MeetingBooking.start_time, MeetingBooking.meeting_id, datetime(2025, 1, 1), 5))
+        .order_by(MeetingBooking.start_time, MeetingBooking.meeting_id)
+        .limit(51)
+    )
+    statements = await capture_statements(db_session, db_session.execute(stmt))
+    assert "group_concat" in statements[0][0]
+    plan = await explain(db_session, *statements[0])
+    assert "ix_meeting_bookings_user_id_start_time_meeting_id" in plan
+    assert "TEMP B-TREE" not in plan
@@ -1,8 +1,16 @@
+import random
+
 import pytest
 from httpx import AsyncClient, ASGITransport
 from datetime import date, datetime, timedelta
+from sqlalchemy import delete, func, select
 
 from app.main import app
+from app.core.auth import current_active_user, current_user
+from app.models.evaluation import Evaluation, EvaluationDaily
+from app.models.task import Task, TaskStatus
+from app.models.user import User, UserRole
+from app.utils.services import rebuild_evaluation_daily
 
 
 @pytest.fixture
@@ -92,3 +100,167 @@ async def test_delete_profile(registered_user):
         # Попробуем получить профиль после удаления — ожидаем 401
         resp2 = await ac.get("/me/")
         assert resp2.status_code == 401
+
+async def _raw_average(db_session, user_id: int, date_from: date, date_to: date):
+    """Эталон: среднее по самим оценкам, как считалось до сводки."""
+    average = (await db_session.execute(
+        select(func.avg(Evaluation.score))
+        .join(Task, Evaluation.task_id == Task.id)
+        .where(
+            Task.assignee_id == user_id,
+            Evaluation.created_at >= datetime.combine(date_from, datetime.min.time()),
+            Evaluation.created_at <= datetime.combine(date_to, datetime.max.time()),
+        )
+    )).scalar()
+    return round(average, 2) if average is not None else None
+
+
+async def _rollup_rows(db_session):
+    rows = await db_session.execute(
+        select(EvaluationDaily.user_id, EvaluationDaily.day, EvaluationDaily.score_sum, EvaluationDaily.score_count)
+        .where(EvaluationDaily.score_count > 0)
+    )
+    return sorted(rows.all())
+
+
+@pytest.mark.asyncio
+async def test_average_evaluation_rollup_matches_raw(async_client: AsyncClient, db_session):
+    rnd = random.Random(21)
+    users = [
+        User(email=f"rollup{i}@e.com", hashed_password="x", role=UserRole.MANAGER if i == 0 else UserRole.USER,
+             is_active=True, is_superuser=False, is_verified=True)
+        for i in range(3)
+    ]
+    db_session.add_all(users)
+    await db_session.flush()
+    user_ids = [u.id for u in users]
+    tasks = [
+        Task(title=f"t{i}", status=TaskStatus.DONE, creator_id=user_ids[0], assignee_id=rnd.choice(user_ids))
+        for i in range(60)
+    ]
+    db_session.add_all(tasks)
+    await db_session.commit()
+
+    start = datetime(2025, 1, 1)
+    live_tasks = {t.id: t for t in tasks}
+    evaluations = {}
+    for step in range(300):
+        action = rnd.random()
+        unrated = [tid for tid in live_tasks if tid not in evaluations]
+        if action < 0.45 and unrated:
+            task_id = rnd.choice(unrated)
+            evaluations[task_id] = Evaluation(
+                score=rnd.randint(1, 5), task_id=task_id, evaluator_id=user_ids[0],
+                created_at=start + timedelta(seconds=rnd.randrange(60 * 86400)),
+            )
+            db_session.add(evaluations[task_id])
+        elif action < 0.6 and evaluations:
+            evaluation = evaluations[rnd.choice(list(evaluations))]
+            evaluation.score = rnd.randint(1, 5)
+            evaluation.created_at = start + timedelta(seconds=rnd.randrange(60 * 86400))
+        elif action < 0.7 and evaluations:
+            await db_session.delete(evaluations.pop(rnd.choice(list(evaluations))))
+        elif action < 0.9:
+            rnd.choice(list(live_tasks.values())).assignee_id = rnd.choice(user_ids)
+        elif len(live_tasks) > 20:
+            task_id = rnd.choice(list(live_tasks))
+            await db_session.execute(delete(Task).where(Task.id == task_id))
+            del live_tasks[task_id]
+            evaluations.pop(task_id, None)
+        if step % 10 == 0:
+            await db_session.commit()
+        else:
+            await db_session.flush()
+    await db_session.commit()
+
+    # оценка через эндпоинт тоже попадает в сводку
+    task_id = next(tid for tid in live_tasks if tid not in evaluations)
+    app.dependency_overrides[current_active_user] = lambda: users[0]
+    resp = await async_client.post(f"/tasks/{task_id}/evaluations", json={"score": 5})
+    assert resp.status_code == 201
+
+    for user in users:
+        app.dependency_overrides[current_user] = lambda: user
+        for _ in range(30):
+            date_from = start.date() + timedelta(days=rnd.randint(-5, 60))
+            date_to = date_from + timedelta(days=rnd.randint(0, 40))
+            if rnd.random() < 0.1:
+                date_to = date.today()
+            resp = await async_client.get("/me/average_evaluation", params={"from": date_from, "to": date_to})
+            assert resp.status_code == 200
+            expected = await _raw_average(db_session, user.id, date_from, date_to)
+            assert resp.json()["average_score"] == expected, (user.id, date_from, date_to)
+
+    # перестроение даёт ту же сводку, что и триггеры
+    incremental = await _rollup_rows(db_session)
+    assert await rebuild_evaluation_daily(db_session) == len(incremental)
+    await db_session.commit()
+    assert await _rollup_rows(db_session) == incremental
+
+    app.dependency_overrides.pop(current_user)
+    app.dependency_overrides.pop(current_active_user)
+
+@pytest.mark.asyncio
+async def test_evaluation_series_matches_raw(async_client: AsyncClient, db_session):
+    from tests.helpers import assert_query_budget
+
+    rnd = random.Random(23)
+    manager, user = [
+        User(email=f"series{i}@e.com", hashed_password="x", role=UserRole.MANAGER if i == 0 else UserRole.USER,
+             is_active=True, is_superuser=False, is_verified=True)
+        for i in range(2)
+    ]
+    db_session.add_all([manager, user])
+    await db_session.flush()
+    for i in range(200):
+        task = Task(title=f"s{i}", status=TaskStatus.DONE, creator_id=manager.id,
+                    assignee_id=rnd.choice([manager.id, user.id]))
+        db_session.add(task)
+        await db_session.flush()
+        created_at = datetime(2025, 1, 1) + timedelta(seconds=rnd.randrange(180 * 86400))
+        db_session.add(Evaluation(score=rnd.randint(1, 5), task_id=task.id, evaluator_id=manager.id,
+                                  created_at=created_at))
+    await db_session.commit()
+    raw = (await db_session.execute(
+        select(Evaluation.created_at, Evaluation.score)
+        .join(Task, Evaluation.task_id == Task.id)
+        .where(Task.assignee_id == user.id)
+    )).all()
+
+    app.dependency_overrides[current_user] = lambda: user
+    for bucket, start_of in (
+        ("week", lambda d: d - timedelta(days=d.weekday())),
+        ("month", lambda d: d.replace(day=1)),
+    ):
+        date_from, date_to = date(2025, 1, 15), date(2025, 5, 20)
+        resp = await async_client.get("/me/evaluations/series",
+                                      params={"from": date_from, "to": date_to, "bucket": bucket})
+        assert resp.status_code == 200
+        assert_query_budget(resp, 1)
+        series = resp.json()
+
+        expected = {}
+        for created_at, score in raw:
+            if date_from <= created_at.date() <= date_to:
+                expected.setdefault(start_of(created_at.date()), [0] * 5)[score - 1] += 1
+        points = series["points"]
+        # шаги идут подряд, включая пустые
+        assert points[0]["start"] == start_of(date_from).isoformat()
+        assert points[-1]["start"] == start_of(date_to).isoformat()
+        assert len({p["start"] for p in points}) == len(points)
+        for point in points:
+            histogram = expected.get(date.fromisoformat(point["start"]), [0] * 5)
+            assert point["histogram"] == histogram, (bucket, point["start"])
+            assert point["count"] == sum(histogram)
+        total = [sum(column) for column in zip(*(p["histogram"] for p in points))]
+        assert series["histogram"] == total and series["count"] == sum(total)
+        in_period = [score for created_at, score in raw if date_from <= created_at.date() <= date_to]
+        assert series["average_score"] == round(sum(in_period) / len(in_period), 2)
+
+    resp = await async_client.get("/me/evaluations/series", params={"from": "2025-02-01", "to": "2025-01-01"})
+    assert resp.status_code == 400
+    resp = await async_client.get("/me/evaluations/series",
+                                  params={"from": "2025-01-01", "to": "2025-01-31", "bucket": "day"})
+    assert resp.status_code == 422
+
+    app.dependency_overrides.pop(current_user)
@@ -1,7 +1,9 @@
 import pytest
+import json
 from datetime import datetime, timedelta
 from httpx import AsyncClient
 from fastapi import status
+from sqlalchemy import delete, update
 from sqlalchemy.future import select
 
 from app.main import app
@@ -11,6 +13,8 @@ from app.models.team import Team
 from app.models.task import Task, TaskStatus
 from app.models.comment import Comment
 from app.models.evaluation import Evaluation
+from app.utils.services import rebuild_task_counters
+from tests.helpers import assert_query_budget, capture_statements, explain, ordered_insert_queries
 
 
 @pytest.mark.asyncio
@@ -144,7 +148,7 @@ async def test_comments_and_evaluations(async_client: AsyncClient, db_session):
     assert resp_c.json()["text"] == "Hello"
 
     resp_list = await async_client.get(f"/tasks/{task.id}/comments")
-    assert any(c["text"] == "Hello" for c in resp_list.json())
+    assert any(c["text"] == "Hello" for c in resp_list.json()["items"])
 
     # member не может ставить оценку
     resp_ev_forbid = await async_client.post(
@@ -164,3 +168,408 @@ async def test_comments_and_evaluations(async_client: AsyncClient, db_session):
     assert any(e["score"] == 4 for e in resp_ev_list.json())
 
     app.dependency_overrides.pop(current_active_user)
+
+# -------------------------------------------------------------------
+# Список задач: keyset-пагинация и фильтры
+# -------------------------------------------------------------------
+
+async def _seed_listing(db_session):
+    me = User(
+        email="pager@example.com", hashed_password="x",
+        role=UserRole.MANAGER, team_id=1,
+        is_active=True, is_superuser=False, is_verified=True
+    )
+    other = User(
+        email="other@example.com", hashed_password="x",
+        role=UserRole.USER, team_id=1,
+        is_active=True, is_superuser=False, is_verified=True
+    )
+    db_session.add_all([me, other])
+    await db_session.commit()
+
+    start = datetime(2025, 6, 1)
+    tasks = []
+    for i in range(12):
+        mine_as_creator = i % 2 == 0
+        tasks.append(Task(
+            title=f"t{i}",
+            # каждая четвёртая без срока, у пары задач — одинаковый срок
+            deadline=None if i % 4 == 3 else start + timedelta(days=i // 2),
+            creator_id=me.id if mine_as_creator else other.id,
+            assignee_id=other.id if mine_as_creator else me.id,
+            status=TaskStatus.DONE if i % 3 == 0 else TaskStatus.OPEN,
+        ))
+    # чужая задача не должна попасть в выдачу
+    tasks.append(Task(title="foreign", creator_id=other.id, assignee_id=other.id))
+    db_session.add_all(tasks)
+    await db_session.commit()
+    return me
+
+
+async def _walk(async_client, **params):
+    items, cursor, pages = [], None, 0
+    while True:
+        query = dict(params, **({"after": cursor} if cursor else {}))
+        resp = await async_client.get("/tasks/", params=query)
+        assert resp.status_code == status.HTTP_200_OK, resp.json()
+        page = resp.json()
+        items += page["items"]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_keyset_pages(async_client: AsyncClient, db_session):
+    me = await _seed_listing(db_session)
+    app.dependency_overrides[current_active_user] = lambda: me
+
+    items, pages = await _walk(async_client, limit=5)
+    titles = [t["title"] for t in items]
+    assert len(titles) == len(set(titles)) == 12
+    assert pages == 3
+    # сортировка по (deadline NULLS LAST, id)
+    deadlines = [t["deadline"] for t in items]
+    dated = [d for d in deadlines if d is not None]
+    assert dated == sorted(dated)
+    assert deadlines[len(dated):] == [None] * (12 - len(dated))
+
+    by_created, _ = await _walk(async_client, limit=4, order_by="created_at")
+    assert [t["id"] for t in by_created] == sorted(t["id"] for t in items)
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_filters(async_client: AsyncClient, db_session):
+    me = await _seed_listing(db_session)
+    app.dependency_overrides[current_active_user] = lambda: me
+
+    created, _ = await _walk(async_client, limit=2, role="creator")
+    assert {t["creator_id"] for t in created} == {me.id}
+    assert len(created) == 6
+
+    assigned, _ = await _walk(async_client, role="assignee", status="done")
+    assert {t["assignee_id"] for t in assigned} == {me.id}
+    assert {t["status"] for t in assigned} == {"done"}
+
+    window, _ = await _walk(
+        async_client, limit=1,
+        deadline_from="2025-06-02T00:00:00", deadline_to="2025-06-04T00:00:00",
+    )
+    assert sorted(t["title"] for t in window) == ["t2", "t4", "t5"]
+    # те же границы со смещением приводятся к UTC
+    shifted, _ = await _walk(
+        async_client,
+        deadline_from="2025-06-02T03:00:00+03:00", deadline_to="2025-06-04T03:00:00+03:00",
+    )
+    assert sorted(t["title"] for t in shifted) == ["t2", "t4", "t5"]
+
+    resp = await async_client.get("/tasks/", params={"after": "not-a-cursor"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+    first = (await async_client.get("/tasks/", params={"limit": 1})).json()
+    resp = await async_client.get(
+        "/tasks/", params={"after": first["next_cursor"], "order_by": "created_at"}
+    )
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_uses_keyset_index(async_client: AsyncClient, db_session):
+    me = await _seed_listing(db_session)
+    app.dependency_overrides[current_active_user] = lambda: me
+
+    first = (await async_client.get("/tasks/", params={"limit": 3, "role": "assignee"})).json()
+    statements = await capture_statements(db_session, async_client.get(
+        "/tasks/", params={"limit": 3, "role": "assignee", "after": first["next_cursor"]}
+    ))
+    statement, parameters = statements[0]
+    plan = await explain(db_session, statement, parameters)
+    assert "ix_tasks_assignee_id_deadline_id" in plan
+    assert "SCAN tasks" not in plan
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_task_include_is_opt_in(async_client: AsyncClient, db_session):
+    me = await _seed_listing(db_session)
+    task = (await db_session.execute(select(Task).where(Task.creator_id == me.id))).scalars().first()
+    db_session.add(Comment(text="c", author_id=me.id, task_id=task.id))
+    await db_session.commit()
+    app.dependency_overrides[current_active_user] = lambda: me
+
+    # по умолчанию — один запрос и без коллекций
+    resp = await async_client.get("/tasks/", params={"limit": 50})
+    assert_query_budget(resp, 1)
+    assert all(t["comments"] is None and t["evaluations"] is None for t in resp.json()["items"])
+
+    resp = await async_client.get("/tasks/", params={"include": "comments,evaluations"})
+    assert_query_budget(resp, 3)
+    items = {t["id"]: t for t in resp.json()["items"]}
+    assert [c["text"] for c in items[task.id]["comments"]] == ["c"]
+    assert items[task.id]["evaluations"] == []
+
+    resp = await async_client.get("/tasks/", params={"include": "creator"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    # мутации отдают ту же лёгкую форму, пока коллекции не запрошены
+    upd = await async_client.put(f"/tasks/{task.id}", json={"title": "lean"})
+    assert upd.status_code == status.HTTP_200_OK
+    assert upd.json()["title"] == "lean" and upd.json()["comments"] is None
+
+    upd = await async_client.put(
+        f"/tasks/{task.id}", params={"include": "comments"}, json={"status": "done"}
+    )
+    assert [c["text"] for c in upd.json()["comments"]] == ["c"]
+    assert upd.json()["evaluations"] is None
+
+    created = await async_client.post(
+        "/tasks/", params={"include": "evaluations"},
+        json={"title": "new", "assignee_id": me.id},
+    )
+    assert created.status_code == status.HTTP_201_CREATED
+    assert created.json()["evaluations"] == [] and created.json()["comments"] is None
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+# -------------------------------------------------------------------
+# Пакетные операции
+# -------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_bulk_create_update_delete(async_client: AsyncClient, db_session):
+    me = await _seed_listing(db_session)
+    stranger = User(
+        email="stranger@example.com", hashed_password="x",
+        role=UserRole.MANAGER, team_id=2,
+        is_active=True, is_superuser=False, is_verified=True
+    )
+    db_session.add(stranger)
+    await db_session.commit()
+    app.dependency_overrides[current_active_user] = lambda: me
+
+    # создание: один INSERT ... RETURNING на весь пакет (на PostgreSQL)
+    items = [{"title": f"sprint {i}", "assignee_id": me.id,
+              "deadline": f"2025-07-{i + 1:02d}T10:00:00"} for i in range(30)]
+    # срок со смещением хранится и возвращается в UTC
+    items[5]["deadline"] = "2025-07-06T10:00:00+03:00"
+    resp = await async_client.post("/tasks/bulk", json={"items": items})
+    assert resp.status_code == status.HTTP_201_CREATED
+    assert_query_budget(resp, ordered_insert_queries(len(items)))
+    created = resp.json()["results"]
+    assert [r["task"]["title"] for r in created] == [i["title"] for i in items]
+    assert created[5]["task"]["deadline"].startswith("2025-07-06T07:00")
+    stored = (await db_session.execute(
+        select(Task.deadline).where(Task.id == created[5]["id"])
+    )).scalar_one()
+    assert stored.replace(tzinfo=None) == datetime(2025, 7, 6, 7)
+    assert {r["status"] for r in created} == {"created"}
+    ids = [r["id"] for r in created]
+
+    foreign = (await db_session.execute(
+        select(Task.id).where(Task.title == "foreign")
+    )).scalar_one()
+
+    # изменение: права как у PUT, разные значения в разных строках
+    resp = await async_client.patch("/tasks/bulk", json={"items": [
+        {"id": ids[0], "status": "done"},
+        {"id": ids[1], "title": "renamed", "deadline": "2025-08-01T09:00:00"},
+        {"id": foreign, "title": "hijack"},
+        {"id": 999999, "title": "ghost"},
+    ]})
+    assert resp.status_code == status.HTTP_200_OK
+    assert_query_budget(resp, 2)
+    results = resp.json()["results"]
+    assert [r["status"] for r in results] == ["updated", "updated", "updated", "not_found"]
+    assert results[0]["task"]["status"] == "done" and results[0]["task"]["title"] == "sprint 0"
+    assert results[1]["task"]["title"] == "renamed"
+    assert results[1]["task"]["deadline"].startswith("2025-08-01T09:00")
+
+    app.dependency_overrides[current_active_user] = lambda: stranger
+    resp = await async_client.patch("/tasks/bulk", json={"items": [{"id": ids[2], "title": "x"}]})
+    assert resp.json()["results"][0]["status"] == "forbidden"
+    resp = await async_client.request("DELETE", "/tasks/bulk", json={"ids": ids[:2]})
+    assert {r["status"] for r in resp.json()["results"]} == {"forbidden"}
+
+    # удаление: автор удаляет свои, чужую (созданную другим) — нет
+    app.dependency_overrides[current_active_user] = lambda: me
+    resp = await async_client.request("DELETE", "/tasks/bulk", json={"ids": ids + [foreign, 999999]})
+    assert resp.status_code == status.HTTP_200_OK
+    assert_query_budget(resp, 2)
+    statuses = [r["status"] for r in resp.json()["results"]]
+    assert statuses == ["deleted"] * len(ids) + ["forbidden", "not_found"]
+
+    left = (await db_session.execute(select(Task.id).where(Task.id.in_(ids)))).all()
+    assert left == []
+    renamed = await db_session.get(Task, foreign)
+    await db_session.refresh(renamed)
+    assert renamed.title == "hijack"  # менеджер команды автора может менять
+
+    resp = await async_client.post("/tasks/bulk", json={"items": []})
+    assert resp.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_task_mutations_query_budget(async_client: AsyncClient, db_session):
+    me = await _seed_listing(db_session)
+    app.dependency_overrides[current_active_user] = lambda: me
+
+    async def warm_calendar():
+        await async_client.get("/calendar/daily/2025-06-20")
+        cached = await async_client.get("/calendar/daily/2025-06-20")
+        assert cached.headers["X-Calendar-Cache"] == "HIT"
+
+    # кэш прогрет: команды для сброса приходят из RETURNING, без лишнего запроса
+    await warm_calendar()
+    created = await async_client.post(
+        "/tasks/", json={"title": "budget", "assignee_id": me.id, "deadline": "2025-06-20T10:00:00"}
+    )
+    assert created.status_code == status.HTTP_201_CREATED
+    assert_query_budget(created, 1)
+    task_id = created.json()["id"]
+    resp = await async_client.get("/calendar/daily/2025-06-20")
+    assert resp.headers["X-Calendar-Cache"] == "MISS" and "budget" in resp.text
+
+    # права (creator_id, команды автора и исполнителя) + UPDATE ... RETURNING
+    await warm_calendar()
+    updated = await async_client.put(f"/tasks/{task_id}", json={"status": "in_progress"})
+    assert updated.json()["status"] == "in_progress"
+    assert updated.json()["title"] == "budget"
+    assert_query_budget(updated, 2)
+    assert (await async_client.get("/calendar/daily/2025-06-20")).headers["X-Calendar-Cache"] == "MISS"
+
+    missing = await async_client.put("/tasks/999999", json={"title": "x"})
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+    await warm_calendar()
+    deleted = await async_client.delete(f"/tasks/{task_id}")
+    assert deleted.status_code == status.HTTP_204_NO_CONTENT
+    assert_query_budget(deleted, 2)
+    resp = await async_client.get("/calendar/daily/2025-06-20")
+    assert resp.headers["X-Calendar-Cache"] == "MISS" and "budget" not in resp.text
+
+    app.dependency_overrides.pop(current_active_user)
+
+@pytest.mark.asyncio
+async def test_task_counters(async_client: AsyncClient, db_session):
+    manager = User(email="cnt-m@example.com", hashed_password="x", role=UserRole.MANAGER, team_id=7,
+                   is_active=True, is_superuser=False, is_verified=True)
+    member = User(email="cnt-u@example.com", hashed_password="x", role=UserRole.USER, team_id=7,
+                  is_active=True, is_superuser=False, is_verified=True)
+    db_session.add_all([manager, member])
+    await db_session.commit()
+    task = Task(title="counted", creator_id=manager.id, assignee_id=member.id, status=TaskStatus.DONE)
+    other = Task(title="quiet", creator_id=manager.id, assignee_id=member.id)
+    db_session.add_all([task, other])
+    await db_session.commit()
+
+    app.dependency_overrides[current_active_user] = lambda: member
+    for text in ("первый", "второй"):
+        resp = await async_client.post(f"/tasks/{task.id}/comments", json={"text": text})
+        assert resp.status_code == status.HTTP_201_CREATED
+    app.dependency_overrides[current_active_user] = lambda: manager
+    resp = await async_client.post(f"/tasks/{task.id}/evaluations", json={"score": 4})
+    assert resp.status_code == status.HTTP_201_CREATED
+    # повторная оценка отклоняется по has_evaluation, без запроса к evaluations
+    resp = await async_client.post(f"/tasks/{task.id}/evaluations", json={"score": 5})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    async def counters():
+        resp = await async_client.get("/tasks/")
+        return {
+            item["title"]: (item["comment_count"], item["has_evaluation"], item["score"])
+            for item in resp.json()["items"]
+        }
+
+    statements = await capture_statements(db_session, counters())
+    assert not any("comments" in sql or "evaluations" in sql for sql, _ in statements)
+    assert await counters() == {"counted": (2, True, 4), "quiet": (0, False, None)}
+
+    # удаление в обход эндпоинтов (админка, каскад) тоже уменьшает счётчики
+    comment_id = (await db_session.execute(
+        select(Comment.id).where(Comment.task_id == task.id).limit(1)
+    )).scalar_one()
+    await db_session.execute(delete(Comment).where(Comment.id == comment_id))
+    await db_session.execute(delete(Evaluation).where(Evaluation.task_id == task.id))
+    await db_session.commit()
+    # сессия теста общая с приложением: строки задач изменили триггеры
+    db_session.expire(task)
+    assert await counters() == {"counted": (1, False, None), "quiet": (0, False, None)}
+
+    # перестроение чинит разошедшиеся строки и не трогает остальные
+    await db_session.execute(update(Task).where(Task.id == task.id).values(comment_count=10, score=3))
+    assert await rebuild_task_counters(db_session) == 1
+    await db_session.commit()
+    db_session.expire(task)
+    assert await counters() == {"counted": (1, False, None), "quiet": (0, False, None)}
+
+    app.dependency_overrides.pop(current_active_user)
+
+@pytest.mark.asyncio
+async def test_list_comments_keyset_and_stream(async_client: AsyncClient, db_session):
+    member = User(email="cm-u@example.com", hashed_password="x", role=UserRole.USER, team_id=8,
+                  is_active=True, is_superuser=False, is_verified=True)
+    outsider = User(email="cm-o@example.com", hashed_password="x", role=UserRole.USER, team_id=9,
+                    is_active=True, is_superuser=False, is_verified=True)
+    db_session.add_all([member, outsider])
+    await db_session.commit()
+    task = Task(title="инцидент", creator_id=member.id, assignee_id=member.id)
+    db_session.add(task)
+    await db_session.commit()
+    start = datetime(2025, 6, 1, 9)
+    # у пар комментариев одинаковое время: порядок внутри пары — по id
+    db_session.add_all([
+        Comment(text=f"c{i}", task_id=task.id, author_id=member.id, created_at=start + timedelta(minutes=i // 2))
+        for i in range(7)
+    ])
+    await db_session.commit()
+    expected = [f"c{i}" for i in range(7)]
+
+    app.dependency_overrides[current_active_user] = lambda: member
+    texts, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 3, **({"after": cursor} if cursor else {})}
+        resp = await async_client.get(f"/tasks/{task.id}/comments", params=params)
+        assert resp.status_code == status.HTTP_200_OK
+        texts += [c["text"] for c in resp.json()["items"]]
+        pages += 1
+        cursor = resp.json()["next_cursor"]
+        if cursor is None:
+            break
+    assert texts == expected and pages == 3
+
+    first = (await async_client.get(f"/tasks/{task.id}/comments", params={"limit": 3})).json()
+    statements = await capture_statements(db_session, async_client.get(
+        f"/tasks/{task.id}/comments", params={"limit": 3, "after": first["next_cursor"]}
+    ))
+    statement, parameters = next((s, p) for s, p in statements if "FROM comments" in s)
+    plan = await explain(db_session, statement, parameters)
+    assert "ix_comments_task_id_created_at_id" in plan and "TEMP B-TREE" not in plan
+
+    # выгрузка потоком: все комментарии или продолжение после курсора
+    resp = await async_client.get(f"/tasks/{task.id}/comments", params={"format": "ndjson"})
+    assert resp.status_code == status.HTTP_200_OK
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["text"] for line in resp.text.splitlines()] == expected
+    resp = await async_client.get(f"/tasks/{task.id}/comments",
+                                  params={"format": "ndjson", "after": first["next_cursor"]})
+    assert [json.loads(line)["text"] for line in resp.text.splitlines()] == expected[3:]
+
+    resp = await async_client.get(f"/tasks/{task.id}/comments", params={"after": "мусор"})
+    assert resp.status_code == status.HTTP_400_BAD_REQUEST
+
+    # чужая команда не видит комментарии ни страницей, ни потоком
+    app.dependency_overrides[current_active_user] = lambda: outsider
+    for params in ({}, {"format": "ndjson"}):
+        resp = await async_client.get(f"/tasks/{task.id}/comments", params=params)
+        assert resp.status_code == status.HTTP_403_FORBIDDEN
+        assert resp.json()["detail"] == "Нет доступа к комментированию задачи"
+
+    app.dependency_overrides.pop(current_active_user)
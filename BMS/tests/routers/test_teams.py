@@ -1,12 +1,18 @@
 import pytest
+from datetime import date, datetime, timedelta
 from httpx import AsyncClient
 from fastapi import status
 
 from app.main import app
+import app.core.database as database
 from app.core.auth import current_active_user
+from app.models.evaluation import Evaluation
+from app.models.task import Task, TaskStatus
 from app.models.user import User, UserRole
 from app.models.team import Team
 from app.schemas.team import TeamCreate, TeamMemberAdd, TeamMemberRoleUpdate
+from app.utils.cache import leaderboard_cache
+from tests.conftest import engine_test
 
 
 @pytest.mark.asyncio
@@ -92,3 +98,226 @@ async def test_read_team_and_members(async_client: AsyncClient, db_session):
 
     app.dependency_overrides.pop(current_active_user)
 
+
+@pytest.mark.asyncio
+async def test_team_management_requires_global_admin_owning_team(async_client: AsyncClient, db_session):
+    def _user(email, role):
+        return User(email=email, hashed_password="x", role=role,
+                    is_active=True, is_superuser=False, is_verified=True)
+
+    owner = _user("owner@e.com", UserRole.ADMIN)
+    other_admin = _user("other@e.com", UserRole.ADMIN)
+    manager = _user("lead@e.com", UserRole.MANAGER)
+    member = _user("member@e.com", UserRole.USER)
+    db_session.add_all([owner, other_admin, manager, member])
+    await db_session.commit()
+    own_team = Team(name="Owned", invite_code="OWNED1", admin_id=owner.id)
+    led_team = Team(name="Led", invite_code="LED001", admin_id=manager.id)
+    db_session.add_all([own_team, led_team])
+    await db_session.commit()
+
+    async def _calls(team_id):
+        return [
+            (await async_client.get(f"/teams/{team_id}")).status_code,
+            (await async_client.post(f"/teams/{team_id}/members", json={"user_id": member.id})).status_code,
+            (await async_client.patch(
+                f"/teams/{team_id}/members/{member.id}/role", json={"role": "manager"}
+            )).status_code,
+            (await async_client.delete(f"/teams/{team_id}/members/{member.id}")).status_code,
+        ]
+
+    # глобальный админ, не управляющий командой, и админ команды без роли ADMIN — запрещено
+    for user, team in ((other_admin, own_team), (manager, led_team)):
+        app.dependency_overrides[current_active_user] = lambda user=user: user
+        assert await _calls(team.id) == [status.HTTP_403_FORBIDDEN] * 4
+
+    # глобальный админ — администратор этой команды: чтение, добавление, роль, удаление
+    app.dependency_overrides[current_active_user] = lambda: owner
+    assert await _calls(own_team.id) == [
+        status.HTTP_200_OK,
+        status.HTTP_204_NO_CONTENT,
+        status.HTTP_204_NO_CONTENT,
+        status.HTTP_204_NO_CONTENT,
+    ]
+
+    app.dependency_overrides.pop(current_active_user)
+
+
+@pytest.mark.asyncio
+async def test_manager_team_admin_views_reports_but_cannot_manage(async_client: AsyncClient, db_session):
+    manager = User(email="rep-m@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   is_active=True, is_superuser=False, is_verified=True)
+    member = User(email="rep-u@e.com", hashed_password="x", role=UserRole.USER,
+                  is_active=True, is_superuser=False, is_verified=True)
+    db_session.add_all([manager, member])
+    await db_session.commit()
+    team = Team(name="Отчёты", invite_code="REPORT1", admin_id=manager.id)
+    db_session.add(team)
+    await db_session.commit()
+    app.dependency_overrides[current_active_user] = lambda: manager
+
+    period = {"from": "2025-06-01", "to": "2025-06-30"}
+    for url, params in (
+        (f"/teams/{team.id}/leaderboard", period),
+        (f"/teams/{team.id}/evaluations/series", period),
+        (f"/calendar/team/{team.id}/daily/2025-06-10", None),
+        (f"/calendar/team/{team.id}/monthly/2025/6", None),
+    ):
+        assert (await async_client.get(url, params=params)).status_code == status.HTTP_200_OK, url
+
+    resp = await async_client.post(f"/teams/{team.id}/members", json={"user_id": member.id})
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+    resp = await async_client.patch(f"/teams/{team.id}/members/{member.id}/role", json={"role": "manager"})
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+    app.dependency_overrides.pop(current_active_user)
+
+@pytest.mark.asyncio
+async def test_team_leaderboard(async_client: AsyncClient, db_session, monkeypatch):
+    from tests.helpers import assert_query_budget
+
+    manager = User(email="lb-m@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(manager)
+    await db_session.flush()
+    team = Team(name="Рейтинг", invite_code="LEADERBD", admin_id=manager.id)
+    db_session.add(team)
+    await db_session.flush()
+    manager.team_id = team.id
+    a, b, c, d = members = [
+        User(email=f"lb-{name}@e.com", hashed_password="x", role=UserRole.USER, team_id=team.id,
+             is_active=True, is_superuser=False, is_verified=True)
+        for name in "abcd"
+    ]
+    db_session.add_all(members)
+    await db_session.flush()
+
+    def done(user, completed, deadline=None, score=None, rated=None):
+        task = Task(title="t", status=TaskStatus.DONE, creator_id=manager.id, assignee_id=user.id,
+                    deadline=deadline, completed_at=completed)
+        db_session.add(task)
+        return task, score, rated or completed
+
+    june = datetime(2025, 6, 10, 12)
+    rated = [
+        done(a, june, deadline=june + timedelta(days=1), score=5),
+        done(a, june, deadline=june - timedelta(days=1), score=4),
+        done(b, june, score=5),
+        done(c, june, deadline=june - timedelta(hours=1), score=3),
+        # оценка вне периода не учитывается
+        done(c, datetime(2025, 5, 1), score=1, rated=datetime(2025, 5, 2)),
+    ]
+    pending = Task(title="в работе", status=TaskStatus.IN_PROGRESS, creator_id=manager.id, assignee_id=a.id)
+    db_session.add(pending)
+    await db_session.flush()
+    db_session.add_all([
+        Evaluation(score=score, task_id=task.id, evaluator_id=manager.id, created_at=created_at)
+        for task, score, created_at in rated
+    ])
+    await db_session.commit()
+    ids = {user.id: name for user, name in zip(members, "abcd")}
+
+    app.dependency_overrides[current_active_user] = lambda: manager
+    period = {"from": "2025-06-01", "to": (date.today() + timedelta(days=1)).isoformat()}
+    resp = await async_client.get(f"/teams/{team.id}/leaderboard", params=period)
+    assert resp.status_code == 200
+    assert resp.headers["X-Leaderboard-Cache"] == "MISS"
+    assert_query_budget(resp, 2)
+    board = resp.json()["members"]
+    assert [ids.get(row["user_id"]) for row in board] == ["b", "a", "c", None, "d"]
+    assert [row["rank"] for row in board] == [1, 2, 3, 4, 4]
+    assert [row["percentile"] for row in board] == [100.0, 75.0, 50.0, 25.0, 25.0]
+    assert board[1] == {
+        "user_id": a.id, "email": "lb-a@e.com", "rank": 2, "percentile": 75.0, "average_score": 4.5,
+        "evaluations": 2, "tasks_done": 2, "tasks_on_time": 1, "on_time_rate": 0.5,
+    }
+    assert board[2]["average_score"] == 3.0 and board[2]["on_time_rate"] == 0.0
+    assert board[4]["average_score"] is None and board[4]["on_time_rate"] is None
+
+    resp = await async_client.get(f"/teams/{team.id}/leaderboard", params=period)
+    assert resp.headers["X-Leaderboard-Cache"] == "HIT" and resp.json()["members"] == board
+    assert_query_budget(resp, 1)
+
+    # с репликой обычные чтения тоже заполняют кэш, записавший клиент читает мимо него
+    leaderboard_cache.clear()
+    with monkeypatch.context() as patch:
+        patch.setattr(database, "read_engine", engine_test)
+        for expected in ("MISS", "HIT"):
+            resp = await async_client.get(f"/teams/{team.id}/leaderboard", params=period)
+            assert resp.headers["X-Leaderboard-Cache"] == expected
+        patch.setattr(database, "read_engine", object())
+        resp = await async_client.get(f"/teams/{team.id}/leaderboard", params=period)
+        assert resp.headers["X-Leaderboard-Cache"] == "MISS"
+
+    # выполнение задачи и новая оценка сбрасывают рейтинг команды
+    resp = await async_client.put(f"/tasks/{pending.id}", json={"status": "done"})
+    assert resp.status_code == 200 and resp.json()["completed_at"] is not None
+    resp = await async_client.post(f"/tasks/{pending.id}/evaluations", json={"score": 5})
+    assert resp.status_code == 201
+    resp = await async_client.get(f"/teams/{team.id}/leaderboard", params=period)
+    assert resp.headers["X-Leaderboard-Cache"] == "MISS"
+    row = resp.json()["members"][1]
+    assert row["user_id"] == a.id and row["average_score"] == 4.67 and row["tasks_done"] == 3
+
+    app.dependency_overrides[current_active_user] = lambda: b
+    resp = await async_client.get(f"/teams/{team.id}/leaderboard", params=period)
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+    app.dependency_overrides.pop(current_active_user)
+
+@pytest.mark.asyncio
+async def test_team_evaluation_series(async_client: AsyncClient, db_session):
+    manager = User(email="ts-m@e.com", hashed_password="x", role=UserRole.MANAGER,
+                   is_active=True, is_superuser=False, is_verified=True)
+    outsider = User(email="ts-o@e.com", hashed_password="x", role=UserRole.USER,
+                    is_active=True, is_superuser=False, is_verified=True)
+    db_session.add_all([manager, outsider])
+    await db_session.flush()
+    team = Team(name="Ряды", invite_code="SERIES01", admin_id=manager.id)
+    db_session.add(team)
+    await db_session.flush()
+    member = User(email="ts-a@e.com", hashed_password="x", role=UserRole.USER, team_id=team.id,
+                  is_active=True, is_superuser=False, is_verified=True)
+    manager.team_id = team.id
+    db_session.add(member)
+    await db_session.flush()
+
+    rated = [
+        (member, 5, datetime(2025, 6, 2, 9)),
+        (member, 3, datetime(2025, 6, 30, 23, 59)),
+        (manager, 4, datetime(2025, 6, 15)),
+        (member, 1, datetime(2025, 7, 1)),
+        # задачи не участников команды в ряд не попадают
+        (outsider, 2, datetime(2025, 6, 10)),
+    ]
+    for user, score, created_at in rated:
+        task = Task(title="t", status=TaskStatus.DONE, creator_id=manager.id, assignee_id=user.id)
+        db_session.add(task)
+        await db_session.flush()
+        db_session.add(Evaluation(score=score, task_id=task.id, evaluator_id=manager.id, created_at=created_at))
+    await db_session.commit()
+
+    app.dependency_overrides[current_active_user] = lambda: manager
+    resp = await async_client.get(f"/teams/{team.id}/evaluations/series",
+                                  params={"from": "2025-06-01", "to": "2025-07-31", "bucket": "month"})
+    assert resp.status_code == 200
+    series = resp.json()
+    assert series["count"] == 4 and series["average_score"] == 3.25
+    assert series["points"] == [
+        {"start": "2025-06-01", "count": 3, "average_score": 4.0, "histogram": [0, 0, 1, 1, 1]},
+        {"start": "2025-07-01", "count": 1, "average_score": 1.0, "histogram": [1, 0, 0, 0, 0]},
+    ]
+
+    resp = await async_client.get(f"/teams/{team.id}/evaluations/series",
+                                  params={"from": "2025-06-01", "to": "2025-06-30"})
+    weeks = resp.json()["points"]
+    assert [p["start"] for p in weeks] == ["2025-05-26", "2025-06-02", "2025-06-09", "2025-06-16", "2025-06-23",
+                                           "2025-06-30"]
+    assert [p["count"] for p in weeks] == [0, 1, 1, 0, 0, 1]
+
+    app.dependency_overrides[current_active_user] = lambda: member
+    resp = await async_client.get(f"/teams/{team.id}/evaluations/series",
+                                  params={"from": "2025-06-01", "to": "2025-06-30"})
+    assert resp.status_code == status.HTTP_403_FORBIDDEN
+
+    app.dependency_overrides.pop(current_active_user)
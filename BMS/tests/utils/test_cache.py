@@ -0,0 +1,77 @@
+# tests/utils/test_cache.py
+from datetime import date, datetime
+
+from app.utils.cache import CalendarCache, CalendarKey
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _filled(cache: CalendarCache, *keys: CalendarKey) -> None:
+    for key in keys:
+        cache.set(key, f"v{key}", cache.generation())
+
+
+def test_lru_and_ttl():
+    clock = Clock()
+    cache = CalendarCache(maxsize=2, ttl=60, clock=clock)
+    a, b, c = (CalendarKey(uid, 1, date(2025, 6, 1)) for uid in (1, 2, 3))
+    _filled(cache, a, b)
+    assert cache.get(a) is not None  # a становится свежее b
+    _filled(cache, c)
+    assert cache.get(b) is None and cache.get(a) is not None and len(cache) == 2
+
+    clock.now = 61
+    assert cache.get(a) is None and len(cache) == 1
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 2
+
+
+def test_invalidate_drops_only_affected_days_and_months():
+    cache = CalendarCache(maxsize=100, ttl=60)
+    day, other_day = date(2025, 6, 10), date(2025, 6, 11)
+    mine = CalendarKey(1, 7, day)
+    mine_other_day = CalendarKey(1, 7, other_day)
+    mine_month = CalendarKey(1, 7, (2025, 6))
+    mine_next_month = CalendarKey(1, 7, (2025, 7))
+    teammate = CalendarKey(2, 7, day)
+    stranger = CalendarKey(3, 8, day)
+    _filled(cache, mine, mine_other_day, mine_month, mine_next_month, teammate, stranger)
+
+    # встреча пользователя 1: его день и месяц
+    assert cache.invalidate(user_ids=[1], days=[day]) == 2
+    assert cache.get(mine) is None and cache.get(mine_month) is None
+    assert cache.get(mine_other_day) and cache.get(mine_next_month) and cache.get(teammate)
+
+    # задача команды 7: все её участники за этот день
+    assert cache.invalidate(team_ids=[7], days=[day]) == 1
+    assert cache.get(teammate) is None and cache.get(stranger)
+
+    # серия: все периоды пользователя
+    assert cache.invalidate(user_ids=[1]) == 2
+    assert len(cache) == 1
+
+
+def test_value_computed_before_invalidation_is_not_stored():
+    cache = CalendarCache(maxsize=10, ttl=60)
+    key = CalendarKey(1, 1, date(2025, 6, 1))
+    generation = cache.generation()
+    cache.invalidate(user_ids=[1], days=[date(2025, 6, 1)])
+    cache.set(key, "устарело", generation)
+    assert cache.get(key) is None
+
+
+def test_invalidate_by_moment_uses_each_entry_timezone():
+    cache = CalendarCache(maxsize=10, ttl=60)
+    utc = CalendarKey(1, 7, date(2025, 6, 10))
+    moscow = CalendarKey(1, 7, date(2025, 6, 11), "Europe/Moscow")
+    moscow_before = CalendarKey(1, 7, date(2025, 6, 10), "Europe/Moscow")
+    _filled(cache, utc, moscow, moscow_before)
+
+    # 22:00 UTC 10 июня — в Москве уже 11-е
+    assert cache.invalidate(user_ids=[1], moments=[datetime(2025, 6, 10, 22)]) == 2
+    assert cache.get(moscow_before) is not None and len(cache) == 1
@@ -0,0 +1,43 @@
+# tests/utils/test_ical.py
+from datetime import datetime, timedelta, timezone
+
+from app.models.meeting import Meeting, RecurrenceFreq
+from app.utils.ical import escape_text, fold, format_utc, meeting_vevent, recurrence_rule
+from app.utils.recurrence import Recurrence
+
+
+def test_escape_and_fold():
+    assert escape_text("a;b,c\\d\nе") == r"a\;b\,c\\d\nе"
+    line = "SUMMARY:" + "ы" * 100
+    folded = fold(line)
+    parts = folded.split("\r\n")
+    assert parts[-1] == ""
+    assert all(len(p.encode()) <= 75 for p in parts)
+    assert all(p.startswith(" ") for p in parts[1:-1])
+    # перенос не разрывает символы и ничего не теряет
+    assert "".join(p[1:] if i else p for i, p in enumerate(parts[:-1])) == line
+
+
+def test_format_utc_and_rrule():
+    moscow = timezone(timedelta(hours=3))
+    assert format_utc(datetime(2025, 6, 1, 12, tzinfo=moscow)) == "20250601T090000Z"
+    assert format_utc(datetime(2025, 6, 1, 9)) == "20250601T090000Z"
+
+    start = datetime(2025, 1, 31, 9)
+    rule = Recurrence(start=start, end=start + timedelta(hours=1), freq=RecurrenceFreq.MONTHLY, count=6)
+    assert recurrence_rule(rule) == "RRULE:FREQ=MONTHLY;INTERVAL=1;BYMONTHDAY=28,29,30,31;BYSETPOS=-1;COUNT=6"
+    rule = Recurrence(start=start, end=start + timedelta(hours=1), freq=RecurrenceFreq.WEEKLY, interval=2,
+                      until=datetime(2025, 6, 1))
+    assert recurrence_rule(rule) == "RRULE:FREQ=WEEKLY;INTERVAL=2;UNTIL=20250601T000000Z"
+
+
+def test_series_steps_in_utc_across_dst():
+    # 30 марта Европа переходит на летнее время; серия остаётся в 09:00 UTC
+    start = datetime(2025, 3, 24, 9)
+    rule = Recurrence(start=start, end=start + timedelta(hours=1), freq=RecurrenceFreq.WEEKLY, count=2)
+    assert [s for s, _ in rule.occurrences(start, datetime(2025, 4, 7))] == [start, datetime(2025, 3, 31, 9)]
+
+    meeting = Meeting(id=1, title="Планёрка", start_time=start, end_time=start + timedelta(hours=1))
+    body = meeting_vevent(meeting, rule, stamp=start)
+    assert "DTSTART:20250324T090000Z\r\n" in body
+    assert "TZID" not in body
@@ -0,0 +1,83 @@
+# tests/utils/test_recurrence.py
+import random
+from datetime import datetime, timedelta
+
+from app.models.meeting import RecurrenceFreq
+from app.utils.recurrence import Recurrence, add_months
+
+
+def _weekly(**kwargs) -> Recurrence:
+    start = datetime(2025, 6, 2, 10)  # понедельник
+    return Recurrence(start=start, end=start + timedelta(minutes=30), freq=RecurrenceFreq.WEEKLY, **kwargs)
+
+
+def _brute_force(rule: Recurrence, window_start: datetime, window_end: datetime):
+    """Эталон: перебор серии с первого вхождения."""
+    n, result = 0, []
+    while True:
+        start = rule.nth_start(n)
+        if (rule.count is not None and n >= rule.count) or (rule.until and start > rule.until) or start >= window_end:
+            return result
+        if start + rule.duration > window_start and start not in rule.exceptions:
+            result.append((start, start + rule.duration))
+        n += 1
+
+
+def test_add_months_clamps_to_month_end():
+    assert add_months(datetime(2025, 1, 31, 9), 1) == datetime(2025, 2, 28, 9)
+    assert add_months(datetime(2025, 1, 31, 9), 3) == datetime(2025, 4, 30, 9)
+    assert add_months(datetime(2025, 11, 15), 3) == datetime(2026, 2, 15)
+
+
+def test_weekly_window_count_and_exceptions():
+    rule = _weekly(count=4, exceptions=frozenset({datetime(2025, 6, 9, 10)}))
+    assert list(rule.occurrences(datetime(2025, 6, 1), datetime(2025, 8, 1))) == [
+        (datetime(2025, 6, 2, 10), datetime(2025, 6, 2, 10, 30)),
+        (datetime(2025, 6, 16, 10), datetime(2025, 6, 16, 10, 30)),
+        (datetime(2025, 6, 23, 10), datetime(2025, 6, 23, 10, 30)),
+    ]
+    assert rule.series_end() == datetime(2025, 6, 23, 10, 30)
+    # вхождение, начавшееся до окна, но ещё идущее, попадает в окно
+    assert rule.first_overlap(datetime(2025, 6, 16, 10, 15), datetime(2025, 6, 16, 11)) == (
+        datetime(2025, 6, 16, 10), datetime(2025, 6, 16, 10, 30)
+    )
+    assert rule.first_overlap(datetime(2025, 6, 16, 10, 30), datetime(2025, 6, 16, 11)) is None
+
+
+def test_far_window_is_computed_not_iterated():
+    rule = Recurrence(start=datetime(2025, 1, 1, 9), end=datetime(2025, 1, 1, 9, 15),
+                      freq=RecurrenceFreq.DAILY)
+    # 400 лет ежедневной бессрочной серии — всё равно одно вхождение в окне
+    window = (datetime(2425, 3, 1), datetime(2425, 3, 2))
+    assert rule.index_at_or_before(window[0]) > 140_000
+    assert list(rule.occurrences(*window)) == [(datetime(2425, 3, 1, 9), datetime(2425, 3, 1, 9, 15))]
+    assert rule.series_end() is None
+
+
+def test_until_limits_monthly_series():
+    rule = Recurrence(start=datetime(2025, 1, 31, 12), end=datetime(2025, 1, 31, 13),
+                      freq=RecurrenceFreq.MONTHLY, until=datetime(2025, 4, 30, 11))
+    starts = [s for s, _ in rule.occurrences(datetime(2025, 1, 1), datetime(2026, 1, 1))]
+    assert starts == [datetime(2025, 1, 31, 12), datetime(2025, 2, 28, 12), datetime(2025, 3, 31, 12)]
+    assert rule.series_end() == datetime(2025, 3, 31, 13)
+
+
+def test_occurrences_match_brute_force():
+    rnd = random.Random(14)
+    base = datetime(2025, 1, 31, 8)
+    for _ in range(300):
+        freq = rnd.choice(list(RecurrenceFreq))
+        interval = rnd.randint(1, 3)
+        start = base + timedelta(days=rnd.randint(0, 40), minutes=15 * rnd.randint(0, 40))
+        rule = Recurrence(start=start, end=start + timedelta(minutes=15 * rnd.randint(1, 8)),
+                          freq=freq, interval=interval)
+        skipped = frozenset(rule.nth_start(rnd.randint(0, 20)) for _ in range(3))
+        rule = Recurrence(
+            start=rule.start, end=rule.end, freq=freq, interval=interval,
+            count=rnd.choice([None, rnd.randint(1, 30)]),
+            until=rnd.choice([None, start + timedelta(days=rnd.randint(0, 400))]),
+            exceptions=skipped,
+        )
+        window_start = base + timedelta(days=rnd.randint(-10, 500), hours=rnd.randint(0, 23))
+        window_end = window_start + timedelta(hours=rnd.randint(1, 24 * 60))
+        assert list(rule.occurrences(window_start, window_end)) == _brute_force(rule, window_start, window_end)
@@ -0,0 +1,192 @@
+# tests/utils/test_services.py
+import pytest
+import pytest_asyncio
+from datetime import date, datetime, time, timedelta
+
+from app.models.meeting import Meeting, RecurrenceFreq
+from app.models.task import Task
+from app.models.user import User, UserRole
+from app.utils.services import (
+    count_meetings_by_day,
+    count_tasks_by_day,
+    day_bounds,
+    find_free_slots,
+    find_overlaps,
+    get_meetings_for_date,
+    get_tasks_for_date,
+    merge_intervals,
+    off_hours,
+    recurrence_columns,
+)
+from app.utils.recurrence import Recurrence
+from app.utils.timezones import UTC, get_zone
+from tests.helpers import capture_statements, explain
+
+
+@pytest_asyncio.fixture
+async def team_with_events(db_session):
+    user = User(email="idx@e.com", hashed_password="x", role=UserRole.MANAGER,
+                team_id=1, is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(user)
+    await db_session.commit()
+
+    start = datetime(2025, 6, 1)
+    db_session.add_all(
+        [Task(title=f"t{i}", deadline=start + timedelta(hours=7 * i),
+              creator_id=user.id, assignee_id=user.id) for i in range(50)]
+        + [Meeting(title=f"m{i}", start_time=start + timedelta(hours=5 * i),
+                   end_time=start + timedelta(hours=5 * i + 1),
+                   creator_id=user.id, participants=[user]) for i in range(50)]
+    )
+    await db_session.commit()
+    return user
+
+
+def test_day_bounds_half_open():
+    assert day_bounds(date(2025, 6, 30)) == (datetime(2025, 6, 30), datetime(2025, 7, 1))
+    assert day_bounds(date(2025, 6, 1), date(2025, 7, 1)) == (datetime(2025, 6, 1), datetime(2025, 7, 1))
+
+
+@pytest.mark.asyncio
+async def test_tasks_for_date_range_and_index(db_session, team_with_events):
+    target = date(2025, 6, 2)
+    tasks = await get_tasks_for_date(db_session, 1, target)
+    assert tasks and all(t.deadline.date() == target for t in tasks)
+
+    statements = await capture_statements(db_session, get_tasks_for_date(db_session, 1, target))
+    plan = await explain(db_session, *statements[0])
+    assert "INDEX ix_tasks_deadline (deadline>? AND deadline<?)" in plan
+
+
+@pytest.mark.asyncio
+async def test_meetings_for_date_range_and_index(db_session, team_with_events):
+    target = date(2025, 6, 2)
+    meetings = await get_meetings_for_date(db_session, team_with_events.id, target)
+    assert meetings and all(m.start_time.date() == target for m in meetings)
+
+    statements = await capture_statements(
+        db_session, get_meetings_for_date(db_session, team_with_events.id, target)
+    )
+    plan = await explain(db_session, *statements[0])
+    assert "INDEX ix_meetings_start_time (start_time>? AND start_time<?)" in plan
+
+
+@pytest.mark.asyncio
+async def test_monthly_counts_use_date_indexes(db_session, team_with_events):
+    start, end = date(2025, 6, 1), date(2025, 7, 1)
+
+    statements = await capture_statements(db_session, count_tasks_by_day(db_session, 1, start, end))
+    assert "INDEX ix_tasks_deadline (deadline>? AND deadline<?)" in await explain(db_session, *statements[0])
+
+    statements = await capture_statements(
+        db_session, count_meetings_by_day(db_session, team_with_events.id, start, end)
+    )
+    plan = await explain(db_session, *statements[0])
+    assert (
+        "INDEX ix_meeting_bookings_user_id_start_time_meeting_id (user_id=? AND start_time>? AND start_time<?)"
+        in plan
+    )
+
+
+def _at(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2025, 6, day, hour, minute)  # 2025-06-02 — понедельник
+
+
+def test_merge_intervals_sweep():
+    busy = [(_at(2, 13), _at(2, 14)), (_at(2, 10), _at(2, 11)), (_at(2, 10, 30), _at(2, 12)),
+            (_at(2, 12), _at(2, 12, 30))]
+    assert merge_intervals(busy) == [
+        (_at(2, 10), _at(2, 12)),
+        (_at(2, 12), _at(2, 12, 30)),  # встык — не пересечение
+        (_at(2, 13), _at(2, 14)),
+    ]
+
+
+def test_find_free_slots_respects_busy_and_hours():
+    busy = [(_at(2, 9, 30), _at(2, 10, 10)), (_at(2, 11), _at(2, 12)), (_at(2, 10, 30), _at(2, 11, 30))]
+    slots = find_free_slots(
+        busy, _at(2, 0), _at(5, 0), timedelta(minutes=60),
+        time(9), time(18), limit=4,
+    )
+    assert slots == [
+        (_at(2, 12), _at(2, 13)),  # 09:00–09:30 и 10:15–10:30 слишком коротки
+        (_at(2, 13), _at(2, 14)),
+        (_at(2, 14), _at(2, 15)),
+        (_at(2, 15), _at(2, 16)),
+    ]
+
+
+def test_find_free_slots_skips_weekends_and_multi_day_busy():
+    # пятница занята до понедельника 10:00, поиск с пятницы
+    busy = [(_at(6, 8), _at(9, 10))]
+    slots = find_free_slots(busy, _at(6, 0), _at(13, 0), timedelta(minutes=30),
+                            time(9), time(18), limit=1)
+    assert slots == [(_at(9, 10), _at(9, 10, 30))]
+
+    slots = find_free_slots([], _at(7, 0), _at(9, 0), timedelta(minutes=30),
+                            time(9), time(18), limit=1, include_weekends=True)
+    assert slots == [(_at(7, 9), _at(7, 9, 30))]
+
+    # окно обрезает рабочий день; слоты не выходят за его конец
+    assert find_free_slots([], _at(2, 17, 40), _at(2, 23), timedelta(minutes=30),
+                           time(9), time(18), limit=5) == []
+
+
+def test_off_hours_follow_each_users_zone():
+    moscow = get_zone("Europe/Moscow")
+    busy = off_hours({UTC, moscow}, _at(2, 0), _at(3, 0), time(9), time(18))
+    slots = find_free_slots(busy, _at(2, 0), _at(3, 0), timedelta(hours=1), None, None, limit=10)
+    # 9–18 UTC и 9–18 МСК (6–15 UTC) пересекаются в 9–15 UTC
+    assert slots == [(_at(2, h), _at(2, h + 1)) for h in range(9, 15)]
+
+    # Берлин переходит на летнее время 30 марта: 9:00 в пятницу — 08:00 UTC, в понедельник — 07:00 UTC
+    berlin = get_zone("Europe/Berlin")
+    busy = off_hours({berlin}, datetime(2025, 3, 28), datetime(2025, 4, 1), time(9), time(18))
+    slots = find_free_slots(busy, datetime(2025, 3, 28), datetime(2025, 4, 1), timedelta(hours=9),
+                            None, None, limit=2)
+    assert slots == [(datetime(2025, 3, 28, 8), datetime(2025, 3, 28, 17)),
+                     (datetime(2025, 3, 31, 7), datetime(2025, 3, 31, 16))]
+
+
+
+@pytest.mark.asyncio
+async def test_calendar_expands_series_inside_window(db_session):
+    user = User(email="series@e.com", hashed_password="x", role=UserRole.MANAGER,
+                team_id=1, is_active=True, is_superuser=False, is_verified=True)
+    db_session.add(user)
+    await db_session.commit()
+
+    # ежедневная серия с 28 мая на 10 вхождений, без 3 июня
+    rule = Recurrence(start=datetime(2025, 5, 28, 23, 30), end=datetime(2025, 5, 29, 0, 30),
+                      freq=RecurrenceFreq.DAILY, count=10,
+                      exceptions=frozenset({datetime(2025, 6, 3, 23, 30)}))
+    db_session.add_all([
+        Meeting(title="daily", start_time=rule.start, end_time=rule.end, creator_id=user.id,
+                participants=[user], **recurrence_columns(rule)),
+        Meeting(title="single", start_time=datetime(2025, 6, 2, 9), end_time=datetime(2025, 6, 2, 10),
+                creator_id=user.id, participants=[user]),
+    ])
+    await db_session.commit()
+
+    day = await get_meetings_for_date(db_session, user.id, date(2025, 6, 2))
+    assert sorted((m.title, m.start_time) for m in day) == [
+        ("daily", datetime(2025, 6, 2, 23, 30)), ("single", datetime(2025, 6, 2, 9)),
+    ]
+    assert await get_meetings_for_date(db_session, user.id, date(2025, 6, 3)) == []
+
+    # вхождение 31 мая, идущее и 1 июня, считается по дню начала
+    counts = await count_meetings_by_day(db_session, user.id, date(2025, 6, 1), date(2025, 7, 1))
+    assert counts == {date(2025, 6, 1): 1, date(2025, 6, 2): 2, date(2025, 6, 4): 1,
+                      date(2025, 6, 5): 1, date(2025, 6, 6): 1}
+
+
+def test_find_overlaps_reports_every_pair_once():
+    intervals = [
+        (_at(2, 9), _at(2, 12), "long"),
+        (_at(2, 10), _at(2, 11), "inner"),
+        (_at(2, 10, 30), _at(2, 13), "late"),
+        (_at(2, 13), _at(2, 14), "touching"),  # встык с «late» — не пересечение
+    ]
+    pairs = {frozenset(p) for p in find_overlaps(intervals)}
+    assert pairs == {frozenset({"long", "inner"}), frozenset({"long", "late"}), frozenset({"inner", "late"})}
+    assert len(find_overlaps(intervals)) == 3
@@ -0,0 +1,41 @@
+# tests/utils/test_timezones.py
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import DateTime, literal, literal_column, select, union_all
+
+from app.utils.timezones import get_zone, local_date, local_midnight, offset_segments, to_local
+
+
+def test_offset_segments_find_dst_switches():
+    ny = get_zone("America/New_York")
+    segments = offset_segments(ny, datetime(2025, 3, 1), datetime(2025, 12, 1))
+    assert segments == [
+        (datetime(2025, 3, 9, 7), -5 * 3600),
+        (datetime(2025, 11, 2, 6), -4 * 3600),
+        (None, -5 * 3600),
+    ]
+    assert local_midnight(date(2025, 3, 10), ny) == datetime(2025, 3, 10, 4)
+    assert offset_segments(get_zone("Asia/Tokyo"), datetime(2025, 1, 1), datetime(2026, 1, 1)) == [(None, 9 * 3600)]
+    assert get_zone("Mars/Olympus") is None and get_zone("'; drop table users; --") is None
+
+
+@pytest.mark.asyncio
+async def test_sqlite_local_date_matches_zoneinfo(db_session):
+    rnd = random.Random(20)
+    start, end = datetime(2025, 1, 1), datetime(2026, 1, 1)
+    for name in ("Europe/Moscow", "America/New_York", "Australia/Lord_Howe", "Asia/Kathmandu"):
+        tz = get_zone(name)
+        moments = [start + timedelta(seconds=rnd.randrange(365 * 86400)) for _ in range(50)]
+        # и по моменту вплотную к каждому переходу
+        for switch_at, _ in offset_segments(tz, start, end)[:-1]:
+            moments += [switch_at - timedelta(seconds=1), switch_at]
+        column = literal_column("moment", DateTime())
+        stmt = select(column, local_date(column, tz, start, end, "sqlite")).select_from(
+            union_all(*(select(literal(moment, DateTime()).label("moment")) for moment in moments)).subquery()
+        )
+        rows = (await db_session.execute(stmt)).all()
+        assert len(rows) == len(moments)
+        for moment, value in rows:
+            assert value == to_local(moment, tz).date().isoformat(), (name, moment)